@@ -0,0 +1,364 @@
+"""
+Headless command line interface of Skylark (doesn't import PyQt6).
+
+    python cli.py simfyzer -i data.xlsx --client-column A --source-column B
+    python cli.py featureflow -i data.csv --client-column A --source-column B
+    python cli.py semantix -i data.xlsx --column A
+
+Run python cli.py <engine> --help for all options.
+"""
+
+import sys
+import json
+import argparse
+import multiprocessing
+import pandas as pd
+from pathlib import Path
+from contextlib import nullcontext
+
+PROJECT_DIR = Path(__file__).parent
+CONFIG_DIR = PROJECT_DIR / "config"
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.chunked_io import (
+    file_type,
+    read_table,
+    write_table,
+    read_chunks,
+    ChunkWriter,
+)
+
+SIMFYZER = "simfyzer"
+FEATURE_FLOW = "featureflow"
+SEMANTIX = "semantix"
+
+CONFIG_PATHS = {
+    SIMFYZER: CONFIG_DIR / "simfyzer_config" / "setups",
+    FEATURE_FLOW: CONFIG_DIR / "measures_config" / "setups",
+    SEMANTIX: CONFIG_DIR / "measures_config" / "setups",
+}
+
+# same names as GUI outputs
+OUTPUT_NAMES = {
+    SIMFYZER: "SimFyzer_output",
+    FEATURE_FLOW: "FeatureFlow_output",
+    SEMANTIX: "Semantix_output",
+}
+
+FORMATS = ["xlsx", "csv", "parquet", "feather"]
+
+
+class CLIGracefullExit(Exception):
+    pass
+
+
+def read_config(engine: str, config: str) -> dict:
+    """Config is a path or a name of config in config setups of the engine"""
+
+    path = Path(config)
+    if not path.exists():
+        path = CONFIG_PATHS[engine] / config
+    if not path.exists():
+        raise CLIGracefullExit(f"Config not found: {config}")
+
+    with open(path, "rb") as file:
+        return json.loads(file.read())
+
+
+def output_path(args: argparse.Namespace) -> Path:
+    """Default output has format of the input if format isn't passed"""
+
+    if args.output is not None:
+        return Path(args.output)
+    if args.format is None:
+        return (PROJECT_DIR / OUTPUT_NAMES[args.engine]).with_suffix(args.input.suffix)
+    return PROJECT_DIR / f"{OUTPUT_NAMES[args.engine]}.{args.format}"
+
+
+def status_callback(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def process_pool(workers: int) -> multiprocessing.Pool:
+    """Pool of workers (all CPUs if None), no pool for one worker"""
+
+    if workers == 1:
+        return nullcontext()
+    return multiprocessing.Pool(workers)
+
+
+def check_columns(columns: list[str], path: Path) -> None:
+    """Check columns by header of the file (without reading the whole file)"""
+
+    header = next(read_chunks(path, 1), None)
+    header = [] if header is None else list(header.columns)
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise CLIGracefullExit(f"Columns not found: {', '.join(missing)}")
+
+
+def input_columns(args: argparse.Namespace, columns: list[str]) -> list[str]:
+    """Columns to read from the input (all columns if None)"""
+
+    return columns if args.only_columns else None
+
+
+def read_data(
+    columns: list[str], path: Path, only_columns: bool = False
+) -> pd.DataFrame:
+    data = read_table(path, columns if only_columns else None)
+    missing = [column for column in columns if column not in data.columns]
+    if missing:
+        raise CLIGracefullExit(f"Columns not found: {', '.join(missing)}")
+    return data
+
+
+def compile_measures_config(args: argparse.Namespace):
+    """Measures config compiled once (artifact is reused if directory is passed)"""
+
+    from src.functool.compiled_config import compile_config, ConfigGracefullExit
+
+    try:
+        return compile_config(
+            read_config(args.engine, args.config), args.compiled_config
+        )
+    except ConfigGracefullExit as ex:
+        raise CLIGracefullExit(f"Wrong config: {ex}")
+
+
+def run_simfyzer(args: argparse.Namespace) -> None:
+    from src.simfyzer.main import setup_SimFyzer
+
+    if args.chunk_size is not None and args.decision_only:
+        # rows for fuzzy matching are chosen by ratio of all rows
+        raise CLIGracefullExit("--decision-only can't be used with --chunk-size")
+
+    validator = setup_SimFyzer(
+        read_config(SIMFYZER, args.config),
+        args.fuzzy_threshold,
+        args.validation_threshold,
+        status_callback,
+        fuzzy_mode=args.fuzzy_mode,
+        tokenization_cache=args.tokenization_cache,
+    )
+    columns = [args.client_column, args.source_column]
+
+    with process_pool(args.workers) as pool:
+        if args.chunk_size is not None:
+            check_columns(columns, args.input)
+            validator.validate_file(
+                args.input,
+                output_path(args),
+                args.client_column,
+                args.source_column,
+                args.chunk_size,
+                pool,
+                input_columns(args, columns),
+            )
+            return
+
+        data = read_data(columns, args.input, args.only_columns)
+        data = validator.validate(
+            data,
+            args.client_column,
+            args.source_column,
+            pool,
+            decision_only=args.decision_only,
+        )
+        write_table(data, output_path(args))
+
+
+def run_feature_flow(args: argparse.Namespace) -> None:
+    from src.feature_flow.main import FeatureFlow
+
+    features = compile_measures_config(args).features()
+    validator = FeatureFlow(
+        args.client_column,
+        args.source_column,
+        features,
+        status_callback=status_callback,
+    )
+    columns = [args.client_column, args.source_column]
+
+    with process_pool(args.workers) as pool:
+        if args.chunk_size is not None:
+            check_columns(columns, args.input)
+            with ChunkWriter(output_path(args)) as writer:
+                chunks = read_chunks(
+                    args.input, args.chunk_size, input_columns(args, columns)
+                )
+                for chunk in chunks:
+                    writer.write(validator.validate(chunk, pool))
+            return
+
+        data = read_data(columns, args.input, args.only_columns)
+        data = validator.validate(data, pool)
+        write_table(data, output_path(args))
+
+
+def run_semantix(args: argparse.Namespace) -> None:
+    from src.semantix.measures_extraction import MeasuresExtractor
+    from src.semantix.cross_semantic import CrosserPro, LanguageRules
+
+    extractor = MeasuresExtractor(
+        compile_measures_config(args),
+        True,
+        status_callback,
+        regex_cache=args.regex_cache,
+    )
+    crosser = CrosserPro(
+        [
+            LanguageRules(
+                language,
+                check_letters=True,
+                with_numbers=True,
+                min_lenght=3,
+                stemming=True,
+                symbols="",
+            )
+            for language in args.languages
+        ],
+        delete_rx=True,
+        process_nearest=250,
+        status_callback=status_callback,
+    )
+
+    data = read_data([args.column], args.input, args.only_columns)
+    with process_pool(args.workers) as pool:
+        data = extractor.extract(
+            data, args.column, concat_regex=True, process_pool=pool
+        )
+        data = crosser.extract(data, args.column, pool)
+    write_table(data, output_path(args))
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-i", "--input", type=Path, required=True)
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="output file (<engine>_output.<format> in project dir by default)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="format of default output (format of the input by default, "
+        "output file sets format by extension)",
+    )
+    parser.add_argument(
+        "--only-columns",
+        action="store_true",
+        help="read only the processed columns (other input columns are dropped)",
+    )
+    parser.add_argument(
+        "--config",
+        default="main.json",
+        help="config path or name of config in config setups",
+    )
+
+
+def add_pool_arguments(
+    parser: argparse.ArgumentParser,
+    chunks: bool = True,
+) -> None:
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="count of worker processes (all CPUs by default, 1 - no pool)",
+    )
+    if not chunks:
+        return
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="process input by chunks of rows (output is written by chunks)",
+    )
+
+
+def add_compiled_config_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compiled-config",
+        type=Path,
+        help="directory of compiled config artifacts (config is compiled once)",
+    )
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="skylark",
+        description="Skylark headless batch processing",
+    )
+    engines = parser.add_subparsers(dest="engine", required=True)
+
+    simfyzer = engines.add_parser(SIMFYZER, help="fuzzy validation of pairs")
+    add_common_arguments(simfyzer)
+    add_pool_arguments(simfyzer)
+    simfyzer.add_argument("--client-column", required=True)
+    simfyzer.add_argument("--source-column", required=True)
+    simfyzer.add_argument("--fuzzy-threshold", type=float, default=0.75)
+    simfyzer.add_argument("--validation-threshold", type=float, default=0.5)
+    simfyzer.add_argument(
+        "--fuzzy-mode", choices=["pairwise", "global"], default="pairwise"
+    )
+    simfyzer.add_argument("--tokenization-cache", type=Path)
+    simfyzer.add_argument("--decision-only", action="store_true")
+    simfyzer.set_defaults(run=run_simfyzer)
+
+    feature_flow = engines.add_parser(FEATURE_FLOW, help="validation by features")
+    add_common_arguments(feature_flow)
+    add_pool_arguments(feature_flow)
+    feature_flow.add_argument("--client-column", required=True)
+    feature_flow.add_argument("--source-column", required=True)
+    add_compiled_config_argument(feature_flow)
+    feature_flow.set_defaults(run=run_feature_flow)
+
+    semantix = engines.add_parser(SEMANTIX, help="features and regex extraction")
+    add_common_arguments(semantix)
+    # rows are crossed with the nearest rows of the whole file (no chunks)
+    add_pool_arguments(semantix, chunks=False)
+    semantix.add_argument("--column", required=True)
+    add_compiled_config_argument(semantix)
+    semantix.add_argument(
+        "--languages",
+        nargs="+",
+        choices=["russian", "english"],
+        default=["russian", "english"],
+    )
+    semantix.add_argument(
+        "--regex-cache",
+        type=Path,
+        help="directory of regex cache (next runs extract only new names)",
+    )
+    semantix.set_defaults(run=run_semantix)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        for path in [args.input, output_path(args)]:
+            try:
+                file_type(path)
+            except ValueError as ex:
+                raise CLIGracefullExit(f"{ex}: {path}")
+
+        if not args.input.exists():
+            raise CLIGracefullExit(f"Input file not found: {args.input}")
+
+        args.run(args)
+
+    except CLIGracefullExit as ex:
+        print(f"Error: {ex}", file=sys.stderr)
+        return 1
+
+    status_callback(f"Saved: {output_path(args)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,7 +38,7 @@ class MainWindow(QMainWindow):
     def _set_tables(self, main_window: QWidget):
         tab_widget = QTabWidget(main_window)
 
-        autosem_tab = SemantixWidget()
+        autosem_tab = SemantixWidget(self._process_pool)
         feature_validator_tab = FeatureFlowWidget(self._process_pool)
         jakkar_validator_tab = SimFyzerWidget(self._process_pool)
 
@@ -1,9 +1,10 @@
 import os
 import sys
 import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Any, List, Dict, Union
+from typing import Any, Callable, List, Dict, Union
 
 from PyQt6.QtWidgets import (
     QTreeView,
@@ -28,6 +29,7 @@ from PyQt6.QtCore import (
     QObject,
     Qt,
     QAbstractTableModel,
+    QThread,
     pyqtSignal,
 )
 
@@ -35,8 +37,22 @@ GUI_DIR = Path(__file__).parent.parent
 PROJECT_DIR = GUI_DIR.parent
 
 sys.path.append(str(GUI_DIR))
+sys.path.append(str(PROJECT_DIR))
 
 from config.measures_config.config_parser import CONFIG, MEASURE, DATA, UNIT
+from src.functool.chunked_io import COLUMNAR_FORMATS, file_type
+from src.functool.file_preview import FilePreview
+from src.functool.display_table import DisplayTable
+
+PREVIEW_ROWS = 5
+
+
+def output_path(path: str | Path, data_path: str | Path) -> Path:
+    """Columnar input is saved in the same format, other input - by path"""
+
+    if file_type(data_path) in COLUMNAR_FORMATS:
+        return Path(path).with_suffix(Path(data_path).suffix)
+    return Path(path)
 
 
 class RunButtonStatus(object):
@@ -277,27 +293,69 @@ class JsonModel(QAbstractItemModel):
             return item.value
 
 
+class TableOrderWorker(QThread):
+    """Counts order of rows of the table view (sorting, filtering) in background"""
+
+    order_signal = pyqtSignal(int, object)
+
+    def __init__(self, generation: int, function: Callable, *args) -> None:
+        super().__init__()
+        self.generation = generation
+        self.function = function
+        self.args = args
+
+    def run(self) -> None:
+        self.order_signal.emit(self.generation, self.function(*self.args))
+
+
 class PandasModel(QAbstractTableModel):
+    """
+    Virtualized model of DataFrame: rows are loaded by FETCH_ROWS (fetchMore),
+    display strings are formatted by blocks of visible rows (see DisplayTable).
+    Sorting and filtering are done in background, only the last one is applied.
+    """
+
+    FETCH_ROWS = 1000
+
+    # running workers are kept by class: replaced model can be deleted before
+    _workers: list[TableOrderWorker] = []
+
     def __init__(self, dataframe: pd.DataFrame = pd.DataFrame(), parent=None):
         QAbstractTableModel.__init__(self, parent)
-        self._dataframe = dataframe
+        self._table = DisplayTable(dataframe)
+        self._loaded = min(len(self._table), self.FETCH_ROWS)
+        self._generation = 0
 
     def rowCount(self, parent=QModelIndex()) -> int:
         if parent == QModelIndex():
-            return len(self._dataframe)
+            return self._loaded
         return 0
 
     def columnCount(self, parent=QModelIndex()) -> int:
         if parent == QModelIndex():
-            return len(self._dataframe.columns)
+            return len(self._table.columns)
         return 0
 
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent == QModelIndex():
+            return self._loaded < len(self._table)
+        return False
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        count = min(self.FETCH_ROWS, len(self._table) - self._loaded)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
     def data(self, index: QModelIndex, role=Qt.ItemDataRole):
         if not index.isValid():
             return None
 
         if role == Qt.ItemDataRole.DisplayRole:
-            return str(self._dataframe.iloc[index.row(), index.column()])
+            return self._table.cell(index.row(), index.column())
 
         return None
 
@@ -306,13 +364,68 @@ class PandasModel(QAbstractTableModel):
     ):
         if role == Qt.ItemDataRole.DisplayRole:
             if orientation == Qt.Orientation.Horizontal:
-                return str(self._dataframe.columns[section])
+                return self._table.columns[section]
 
             if orientation == Qt.Orientation.Vertical:
-                return str(self._dataframe.index[section])
+                return self._table.row_label(section)
 
         return None
 
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        if column < 0:
+            return
+
+        descending = order == Qt.SortOrder.DescendingOrder
+        self._run_order(self._table.sorted_order, column, descending)
+
+    def filter(self, text: str) -> None:
+        """Show rows which contain text in any column (sorting is reset)"""
+
+        self._run_order(self._table.filtered_order, text)
+
+    def _run_order(self, function: Callable, *args) -> None:
+        self._generation += 1
+
+        worker = TableOrderWorker(self._generation, function, *args)
+        worker.order_signal.connect(self._set_order)
+        worker.finished.connect(lambda: self._workers.remove(worker))
+
+        self._workers.append(worker)
+        worker.start()
+
+    def _set_order(self, generation: int, order: np.ndarray) -> None:
+        if generation != self._generation:
+            return
+
+        self.beginResetModel()
+        self._table.set_order(order)
+        self._loaded = min(len(self._table), self.FETCH_ROWS)
+        self.endResetModel()
+
+
+class PreviewLoader(QThread):
+    """Reads preview of the file and then counts its rows in background"""
+
+    preview_signal = pyqtSignal(str, object)
+    rows_signal = pyqtSignal(str, int)
+    error_signal = pyqtSignal(str, str)
+
+    def __init__(self, file_preview: FilePreview, file_path: str) -> None:
+        super().__init__()
+        self.file_preview = file_preview
+        self.file_path = file_path
+
+    def run(self) -> None:
+        try:
+            data = self.file_preview.preview(self.file_path)
+            self.preview_signal.emit(self.file_path, data)
+
+            rows = self.file_preview.count_rows(self.file_path)
+            self.rows_signal.emit(self.file_path, rows)
+
+        except Exception as ex:
+            self.error_signal.emit(self.file_path, str(ex))
+
 
 class ConfigViewerDialog(QDialog):
     def __init__(
@@ -370,9 +483,11 @@ class ConfigViewerDialog(QDialog):
 class CommonGUI(QWidget):
     progress_signal = pyqtSignal(int)
     CONFIG_PATH = ""
+    file_preview = FilePreview(PREVIEW_ROWS)
 
     def __init__(self) -> None:
         super().__init__()
+        self._preview_loaders: list[PreviewLoader] = []
 
     def _setup_progress_bar(self, main_layout: QVBoxLayout) -> QProgressBar:
         progress_layout = QHBoxLayout()
@@ -444,11 +559,22 @@ class CommonGUI(QWidget):
         return self.file_path_display
 
     def _setup_table_view(self, main_layout: QVBoxLayout) -> QTableView:
+        filter_layout = QHBoxLayout()
+        filter_label = QLabel("Фильтр:")
+        self.filter_display = QLineEdit(self)
+        self.filter_display.textChanged.connect(self.filter_table)
+
+        filter_layout.addWidget(filter_label)
+        filter_layout.addWidget(self.filter_display)
+        main_layout.addLayout(filter_layout)
+
         table_layout = QHBoxLayout()
         table_view = QTableView()
         model = PandasModel()
 
         table_view.setModel(model)
+        table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        table_view.setSortingEnabled(True)
         table_layout.addWidget(table_view)
 
         main_layout.addLayout(table_layout)
@@ -456,6 +582,29 @@ class CommonGUI(QWidget):
         self.table_view = table_view
         return self.table_view
 
+    def set_table_data(self, data: pd.DataFrame) -> None:
+        """Show data in the table view (current filter is applied)"""
+
+        model = PandasModel(data)
+        self.table_view.horizontalHeader().setSortIndicator(
+            -1, Qt.SortOrder.AscendingOrder
+        )
+        self.table_view.setModel(model)
+
+        if self.filter_display.text():
+            model.filter(self.filter_display.text())
+
+    def filter_table(self, text: str) -> None:
+        model = self.table_view.model()
+        if isinstance(model, PandasModel):
+            model.filter(text)
+
+    def show_result(self, data: pd.DataFrame) -> None:
+        """Show result of the run in the table view (if the run is finished)"""
+
+        if data is not None:
+            self.set_table_data(data)
+
     def _setup_config_layout(self, main_layout: QVBoxLayout) -> QComboBox:
         config_layout = QHBoxLayout()
 
@@ -481,7 +630,7 @@ class CommonGUI(QWidget):
             self,
             "Выберите файл",
             "",
-            "Excel (*.xlsx *.csv)",
+            "Таблицы (*.xlsx *.csv *.parquet *.feather *.arrow)",
         )
 
         if file_path:
@@ -489,14 +638,36 @@ class CommonGUI(QWidget):
             self.upload_file_data(file_path)
 
     def upload_file_data(self, file_path: str) -> None:
-        if ".xlsx" in file_path:
-            data = pd.read_excel(file_path, nrows=5)
-        elif ".csv" in file_path:
-            data = pd.read_excel(file_path, nrows=5)
-        else:
-            raise ValueError("File should be Excel or csv")
+        """Preview is read in background thread (GUI isn't blocked)"""
+
+        self.status_callback("Загружаю предпросмотр файла")
+
+        loader = PreviewLoader(self.file_preview, file_path)
+        loader.preview_signal.connect(self.show_preview)
+        loader.rows_signal.connect(self.show_rows_count)
+        loader.error_signal.connect(self.show_preview_error)
+        loader.finished.connect(lambda: self._preview_loaders.remove(loader))
+
+        self._preview_loaders.append(loader)
+        loader.start()
+
+    def _is_current_file(self, file_path: str) -> bool:
+        """Results of previous selected files are skipped"""
+
+        return self.file_path_display.text() == file_path
+
+    def show_preview(self, file_path: str, data: pd.DataFrame) -> None:
+        if self._is_current_file(file_path):
+            self.set_table_data(data)
+            self.status_callback("Считаю строки файла")
+
+    def show_rows_count(self, file_path: str, rows: int) -> None:
+        if self._is_current_file(file_path):
+            self.status_callback(f"Строк в файле: {rows}")
 
-        self.table_view.setModel(PandasModel(data))
+    def show_preview_error(self, file_path: str, message: str) -> None:
+        if self._is_current_file(file_path):
+            self.status_callback(f"Ошибка: не удалось прочитать файл ({message})")
 
     def update_config_combobox(self):
         if self.CONFIG_PATH:
@@ -19,7 +19,8 @@ CONFIG_PATH = PROJECT_DIR / "config" / "measures_config" / "setups"
 
 sys.path.append(str(PROJECT_DIR))
 
-from gui_common import CommonGUI, RunButtonStatus
+from gui_common import CommonGUI, RunButtonStatus, output_path
+from src.functool.chunked_io import file_type, read_table, write_table
 from src.feature_flow.main import (
     FeatureGenerator,
     FeatureFlow,
@@ -43,6 +44,10 @@ class FileUploadException(Exception):
     pass
 
 
+class FileReadException(Exception):
+    pass
+
+
 class FeatureFlowProcessRunner(QThread):
     def __init__(
         self,
@@ -58,6 +63,7 @@ class FeatureFlowProcessRunner(QThread):
         super().__init__()
 
         self.data_path = data_path
+        self.result: pd.DataFrame = None
 
         self.feature_generator = FeatureGenerator()
         features = self.feature_generator.generate(config)
@@ -80,12 +86,15 @@ class FeatureFlowProcessRunner(QThread):
         )
 
     def upload_data(self):
-        if ".csv" in self.data_path:
-            data = pd.read_csv(self.data_path)
-        elif ".xlsx" in self.data_path:
-            data = pd.read_excel(self.data_path)
-        else:
-            raise FileUploadException("File should be Excel or csv")
+        try:
+            file_type(self.data_path)
+        except ValueError as ex:
+            raise FileUploadException(str(ex))
+
+        try:
+            data = read_table(self.data_path)
+        except Exception as ex:
+            raise FileReadException(f"Ошибка чтения файла: {ex}")
         return data
 
     def stop_callback(self) -> None:
@@ -126,7 +135,10 @@ class FeatureFlowProcessRunner(QThread):
             data = self.run_validator(data, self._process_pool)
 
             self.call_status("Сохраняю результат")
-            data.to_excel(PROJECT_DIR / OUTPUT_FILENAME, index=False)
+            write_table(
+                data, output_path(PROJECT_DIR / OUTPUT_FILENAME, self.data_path)
+            )
+            self.result = data
 
             self.call_status("Сохранено")
             self.call_progress(0)
@@ -154,6 +166,13 @@ class FeatureFlowProcessRunner(QThread):
             if self.run_button_callback is not None:
                 self.run_button_callback(RunButtonStatus.STOPPED)
 
+        except FileReadException as ex:
+            self.call_status(str(ex))
+            self.call_progress(0)
+
+            if self.run_button_callback is not None:
+                self.run_button_callback(RunButtonStatus.STOPPED)
+
 
 class FeatureFlowWidget(CommonGUI):
     CONFIG_PATH = CONFIG_PATH
@@ -213,6 +232,8 @@ class FeatureFlowWidget(CommonGUI):
         )
 
         self.validator_stop: callable = self.validator.stop_callback
+        runner = self.validator
+        runner.finished.connect(lambda: self.show_result(runner.result))
         self.validator.start()
 
     def stop(self):
@@ -1,5 +1,6 @@
 import sys
 import time
+import multiprocessing
 import pandas as pd
 
 from pathlib import Path
@@ -22,7 +23,8 @@ CONFIG_PATH = PROJECT_DIR / "config" / "measures_config" / "setups"
 
 sys.path.append(str(PROJECT_DIR))
 
-from gui_common import CommonGUI, RunButtonStatus
+from gui_common import CommonGUI, RunButtonStatus, output_path
+from src.functool.chunked_io import file_type, read_table, write_table
 from src.semantix.measures_extraction import MeasuresExtractor, MeasuresGracefullExit
 from src.semantix.cross_semantic import CrosserPro, LanguageRules, CrosserGracefullExit
 
@@ -43,6 +45,10 @@ class FileUploadException(Exception):
     pass
 
 
+class FileReadException(Exception):
+    pass
+
+
 class SemantixProcessRunner(QThread):
     def __init__(
         self,
@@ -50,6 +56,7 @@ class SemantixProcessRunner(QThread):
         data_path: str | Path,
         column: str,
         cross_sem_langs: list[str] = ["ru", "eng"],
+        process_pool: multiprocessing.Pool = None,
         status_callback: Callable = None,
         progress_callback: Callable = None,
         run_button_callback: Callable = None,
@@ -57,6 +64,7 @@ class SemantixProcessRunner(QThread):
         super().__init__()
 
         self.data_path = data_path
+        self.result: pd.DataFrame = None
         self.column = column
 
         self.extractor = MeasuresExtractor(
@@ -75,17 +83,22 @@ class SemantixProcessRunner(QThread):
             progress_callback=progress_callback,
         )
 
+        self._process_pool = process_pool
+
         self.status_callback = status_callback
         self.progress_callback = progress_callback
         self.run_button_callback = run_button_callback
 
     def upload_data(self):
-        if ".csv" in self.data_path:
-            data = pd.read_csv(self.data_path)
-        elif ".xlsx" in self.data_path:
-            data = pd.read_excel(self.data_path)
-        else:
-            raise FileUploadException("File should be Excel or csv")
+        try:
+            file_type(self.data_path)
+        except ValueError as ex:
+            raise FileUploadException(str(ex))
+
+        try:
+            data = read_table(self.data_path)
+        except Exception as ex:
+            raise FileReadException(f"Ошибка чтения файла: {ex}")
         return data
 
     def setup_crosser_lang_rules(
@@ -137,7 +150,12 @@ class SemantixProcessRunner(QThread):
     def run_measure_extraction(self, data: pd.DataFrame) -> pd.DataFrame:
         try:
             self.call_status("Запускаю извлечение величин")
-            data = self.extractor.extract(data, self.column, concat_regex=True)
+            data = self.extractor.extract(
+                data,
+                self.column,
+                concat_regex=True,
+                process_pool=self._process_pool,
+            )
             return data
 
         except MeasuresGracefullExit:
@@ -146,7 +164,7 @@ class SemantixProcessRunner(QThread):
     def run_cross_semantic(self, data: pd.DataFrame) -> pd.DataFrame:
         try:
             self.call_status("Запускаю извлечение кросс-семантики")
-            data = self.crosser.extract(data, self.column)
+            data = self.crosser.extract(data, self.column, self._process_pool)
             return data
 
         except CrosserGracefullExit:
@@ -164,7 +182,10 @@ class SemantixProcessRunner(QThread):
             data = self.run_cross_semantic(data)
 
             self.call_status("Сохраняю результат")
-            data.to_excel(PROJECT_DIR / OUTPUT_FILENAME, index=False)
+            write_table(
+                data, output_path(PROJECT_DIR / OUTPUT_FILENAME, self.data_path)
+            )
+            self.result = data
 
             self.call_status("Сохранено")
             self.call_progress(0)
@@ -192,12 +213,20 @@ class SemantixProcessRunner(QThread):
             if self.run_button_callback is not None:
                 self.run_button_callback(RunButtonStatus.STOPPED)
 
+        except FileReadException as ex:
+            self.call_status(str(ex))
+            self.call_progress(0)
+
+            if self.run_button_callback is not None:
+                self.run_button_callback(RunButtonStatus.STOPPED)
+
 
 class SemantixWidget(CommonGUI):
     CONFIG_PATH = CONFIG_PATH
 
-    def __init__(self):
+    def __init__(self, process_pool=None):
         super().__init__()
+        self._process_pool = process_pool
 
         self.extractor: QThread = None
         main_layout = QVBoxLayout(self)
@@ -261,12 +290,15 @@ class SemantixWidget(CommonGUI):
             self.file_path_display.text(),
             self.workcol_display.text(),
             cross_sem_langs,
+            self._process_pool,
             status_callback=self.status_callback,
             progress_callback=self.progress_callback,
             run_button_callback=self.run_button_status,
         )
 
         self.extractor_stop: callable = self.extractor.stop_callback
+        runner = self.extractor
+        runner.finished.connect(lambda: self.show_result(runner.result))
         self.extractor.start()
 
     def stop(self):
@@ -275,8 +307,9 @@ class SemantixWidget(CommonGUI):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = SemantixWidget()
-    window.show()
+    with multiprocessing.Pool(4) as process_pool:
+        app = QApplication(sys.argv)
+        window = SemantixWidget(process_pool)
+        window.show()
 
-    sys.exit(app.exec())
+        sys.exit(app.exec())
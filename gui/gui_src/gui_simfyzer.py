@@ -19,7 +19,8 @@ CONFIG_PATH = PROJECT_DIR / "config" / "simfyzer_config" / "setups"
 
 sys.path.append(str(PROJECT_DIR))
 
-from gui_common import CommonGUI, RunButtonStatus
+from gui_common import CommonGUI, RunButtonStatus, output_path
+from src.functool.chunked_io import file_type, read_table, write_table
 from src.simfyzer.main import SimFyzer, setup_SimFyzer, SimFyzerGracefullExit
 
 
@@ -40,6 +41,10 @@ class FileUploadException(Exception):
     pass
 
 
+class FileReadException(Exception):
+    pass
+
+
 class SimFyzerProcessRunner(QThread):
     def __init__(
         self,
@@ -66,6 +71,7 @@ class SimFyzerProcessRunner(QThread):
         self.run_button_callback = run_button_callback
 
         self.data_path = data_path
+        self.result: pd.DataFrame = None
         self.validator = setup_SimFyzer(
             config,
             float(fuzzy_threshold),
@@ -75,12 +81,15 @@ class SimFyzerProcessRunner(QThread):
         )
 
     def upload_data(self):
-        if ".csv" in self.data_path:
-            data = pd.read_csv(self.data_path)
-        elif ".xlsx" in self.data_path:
-            data = pd.read_excel(self.data_path)
-        else:
-            raise FileUploadException("File should be Excel or csv")
+        try:
+            file_type(self.data_path)
+        except ValueError as ex:
+            raise FileUploadException(str(ex))
+
+        try:
+            data = read_table(self.data_path)
+        except Exception as ex:
+            raise FileReadException(f"Ошибка чтения файла: {ex}")
         return data
 
     def stop_callback(self) -> None:
@@ -127,7 +136,10 @@ class SimFyzerProcessRunner(QThread):
             data = self.run_validator(data, self._process_pool)
 
             self.call_status("Сохраняю данные")
-            data.to_excel(PROJECT_DIR / OUTPUT_FILENAME, index=False)
+            write_table(
+                data, output_path(PROJECT_DIR / OUTPUT_FILENAME, self.data_path)
+            )
+            self.result = data
 
             self.call_status("Сохранено")
             self.call_progress(0)
@@ -155,6 +167,13 @@ class SimFyzerProcessRunner(QThread):
             if self.run_button_callback is not None:
                 self.run_button_callback(RunButtonStatus.STOPPED)
 
+        except FileReadException as ex:
+            self.call_status(str(ex))
+            self.call_progress(0)
+
+            if self.run_button_callback is not None:
+                self.run_button_callback(RunButtonStatus.STOPPED)
+
 
 class SimFyzerWidget(CommonGUI):
     CONFIG_PATH = CONFIG_PATH
@@ -233,6 +252,8 @@ class SimFyzerWidget(CommonGUI):
         )
 
         self.validator_stop = self.validator.stop_callback
+        runner = self.validator
+        runner.finished.connect(lambda: self.show_result(runner.result))
         self.validator.start()
 
     def stop(self):
@@ -1,3 +1,4 @@
+import regex as re
 from abc import ABC, abstractmethod
 from decimal import Decimal
 
@@ -43,6 +44,10 @@ class FeatureUnit(object):
         self.regex = regex
         self.weight = Decimal(str(weight))
 
+        # compiled once (the regex module cache is small for many units)
+        self.search_pattern = re.compile(regex, re.IGNORECASE)
+        self.delete_pattern = re.compile(regex)
+
     def __repr__(self) -> str:
         return f"{self.name} with weight {self.weight}"
 
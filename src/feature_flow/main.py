@@ -45,7 +45,7 @@ class AbstractFeatureFlow(ABC):
 
 
 def findall_func(cell: str, unit: FeatureUnit) -> list[str]:
-    output = re.findall(unit.regex, str(cell), re.IGNORECASE)
+    output = unit.search_pattern.findall(str(cell))
     return output
 
 
@@ -58,7 +58,7 @@ def preproccess_func(
 
 
 def del_pattern_func(cell: str, unit: FeatureUnit) -> str:
-    return re.sub(unit.regex, "  ", cell)
+    return unit.delete_pattern.sub("  ", cell)
 
 
 class FeatureFlow(AbstractFeatureFlow):
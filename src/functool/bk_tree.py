@@ -0,0 +1,278 @@
+import sys
+import json
+import numpy as np
+from math import floor
+from pathlib import Path
+from typing import Iterable
+from rapidfuzz import process
+from rapidfuzz.distance import Indel, Levenshtein
+
+
+class EditMetric(object):
+    """Edit Distance Metric of BKTree
+
+    Metric can be:
+        - levenshtein : insertions, deletions and substitutions
+        - indel : insertions and deletions only (score is the same as fuzz.ratio)
+
+    Default metric:
+        - levenshtein
+    """
+
+    LEVENSHTEIN = "levenshtein"
+    INDEL = "indel"
+    modes = {LEVENSHTEIN, INDEL}
+
+    default = LEVENSHTEIN
+
+    metrics = {
+        LEVENSHTEIN: Levenshtein,
+        INDEL: Indel,
+    }
+
+    @classmethod
+    def checkout(cls, mode: str) -> str:
+        """
+        Check metric and return standardized value\n
+        If the input metric have wrong value -> return default metric
+        """
+
+        mode = str(mode).lower()
+        if mode not in cls.modes:
+            mode = cls.default
+        return mode
+
+    @classmethod
+    def max_distance(cls, mode: str, length: int, score: float) -> int:
+        """
+        Return max distance of strings with normalized similarity >= score
+        (score in range 0 to 100) to the string of given length.
+        """
+
+        score = score / 100
+        if score <= 0:
+            return sys.maxsize
+
+        # levenshtein: d <= (1 - s) * max(l1, l2) and d >= |l1 - l2|
+        # indel: d <= (1 - s) * (l1 + l2) and d >= |l1 - l2|
+        factor = 1 if mode == cls.LEVENSHTEIN else 2
+        return floor(factor * (1 - score) / score * length + 1e-9)
+
+
+class BKTree(object):
+    """
+    Burkhard-Keller tree over vocabulary of words.
+    Every child lies at exact edit distance (edge) from its parent,
+    so the search inside radius r only visits children with
+    |edge - distance(query, parent)| <= r.
+
+    Words are inserted incrementally (duplicates are ignored).
+    Search is done level by level: distances of the whole level
+    are counted with one rapidfuzz.process.cdist call.
+
+    - words - words by insertion order (index is word id)
+    - parents, edges - parent id and distance to parent of every word
+    """
+
+    def __init__(
+        self,
+        words: Iterable[str] = (),
+        metric: str = EditMetric.default,
+    ) -> None:
+        self.metric = EditMetric.checkout(metric)
+        self.words: list[str] = []
+        self.parents: list[int] = []
+        self.edges: list[int] = []
+
+        self._ids: dict[str, int] = {}
+        self._children: list[dict[int, int]] = []
+        self._compiled = None
+
+        self.extend(words)
+
+    @property
+    def distance(self):
+        return EditMetric.metrics[self.metric].distance
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def insert(self, word: str) -> int:
+        """Insert word and return its id"""
+
+        word_id = self._ids.get(word)
+        if word_id is not None:
+            return word_id
+
+        parent, edge = -1, 0
+        node = 0 if self.words else None
+        while node is not None:
+            edge = self.distance(word, self.words[node])
+            parent, node = node, self._children[node].get(edge)
+
+        word_id = len(self.words)
+        self._ids[word] = word_id
+        self.words.append(word)
+        self.parents.append(parent)
+        self.edges.append(edge)
+        self._children.append({})
+        if parent >= 0:
+            self._children[parent][edge] = word_id
+
+        self._compiled = None
+        return word_id
+
+    def extend(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.insert(word)
+
+    def _compile(self) -> tuple[np.ndarray]:
+        """Children of every word in CSR layout (rebuilt after inserts)"""
+
+        if self._compiled is None:
+            parents = np.array(self.parents, dtype=np.int64)
+            children = np.argsort(parents, kind="stable")[1:]
+            counts = np.bincount(parents[children], minlength=len(self))
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            edges = np.array(self.edges, dtype=np.int64)[children]
+            words = np.array(self.words, dtype=object)
+            self._compiled = offsets, children, edges, words
+        return self._compiled
+
+    def within(self, query: str, max_distance: int) -> list[tuple[str, int, int]]:
+        """
+        Return all words within max_distance from query:
+        (word, distance, id) sorted by distance and id.
+        """
+
+        if not self.words:
+            return []
+
+        offsets, children, edges, words = self._compile()
+
+        found_ids, found_distances = [], []
+        level = np.zeros(1, dtype=np.int64)
+        while len(level):
+            distances = process.cdist(
+                [query],
+                words[level].tolist(),
+                scorer=self.distance,
+                dtype=np.int64,
+            )[0]
+
+            found = distances <= max_distance
+            found_ids.append(level[found])
+            found_distances.append(distances[found])
+
+            counts = offsets[level + 1] - offsets[level]
+            positions = np.arange(counts.sum()) + np.repeat(
+                offsets[level] - np.cumsum(counts) + counts, counts
+            )
+            near = np.abs(edges[positions] - np.repeat(distances, counts))
+            level = children[positions[near <= max_distance]]
+
+        ids = np.concatenate(found_ids)
+        distances = np.concatenate(found_distances)
+        order = np.lexsort((ids, distances))
+        return [
+            (self.words[word_id], distance, word_id)
+            for word_id, distance in zip(ids[order].tolist(), distances[order].tolist())
+        ]
+
+    def best_match(
+        self,
+        query: str,
+        score_cutoff: float = 0,
+    ) -> tuple[str, float, int] | None:
+        """
+        Return the most similar word (word, score, id) with
+        normalized similarity (0 to 100) >= score_cutoff or None.
+        If scores are equal -> word that was inserted first.
+        """
+
+        max_distance = EditMetric.max_distance(self.metric, len(query), score_cutoff)
+        candidates = self.within(query, max_distance)
+        if not candidates:
+            return None
+
+        candidates.sort(key=lambda candidate: candidate[2])
+        scores = process.cdist(
+            [query],
+            [word for word, _, _ in candidates],
+            scorer=EditMetric.metrics[self.metric].normalized_similarity,
+            dtype=np.float64,
+        )[0]
+        scores = scores * 100
+
+        best = int(scores.argmax())
+        if scores[best] < score_cutoff:
+            return None
+        word, _, word_id = candidates[best]
+        return word, float(scores[best]), word_id
+
+    def save(self, path: str | Path) -> None:
+        data = {
+            "metric": self.metric,
+            "words": self.words,
+            "parents": self.parents,
+            "edges": self.edges,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BKTree":
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        tree = cls(metric=data["metric"])
+        tree.words = data["words"]
+        tree.parents = data["parents"]
+        tree.edges = data["edges"]
+        tree._ids = {word: word_id for word_id, word in enumerate(tree.words)}
+        tree._children = [{} for _ in tree.words]
+        for word_id, (parent, edge) in enumerate(zip(tree.parents, tree.edges)):
+            if parent >= 0:
+                tree._children[parent][edge] = word_id
+        return tree
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from fuzzywuzzy import process as fuzzy_process
+    from fuzzywuzzy import fuzz
+
+    random.seed(0)
+    symbols = "абвгдежзиклмнопрст"
+    vocabulary = [
+        "".join(random.choice(symbols) for _ in range(random.randint(4, 12)))
+        for _ in range(20000)
+    ]
+    queries = [word[:-1] + random.choice(symbols) for word in vocabulary[:200]]
+
+    start = time.perf_counter()
+    tree = BKTree(vocabulary, metric=EditMetric.INDEL)
+    print(f"BKTree build: {len(tree)} words, {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    tree_matches = [tree.best_match(query, 75) for query in queries]
+    tree_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    brute_matches = [
+        fuzzy_process.extractOne(query, vocabulary, scorer=fuzz.ratio, score_cutoff=75)
+        for query in queries
+    ]
+    brute_time = time.perf_counter() - start
+
+    same = sum(
+        (t[0] if t else None) == (b[0] if b else None)
+        for t, b in zip(tree_matches, brute_matches)
+    )
+    print(f"BKTree: {tree_time / len(queries) * 1000:.2f}ms per query")
+    print(f"extractOne: {brute_time / len(queries) * 1000:.2f}ms per query")
+    print(f"Same matches: {same} of {len(queries)}")
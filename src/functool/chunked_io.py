@@ -0,0 +1,503 @@
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator
+from openpyxl import Workbook, load_workbook
+
+
+class TableWriter(ABC):
+    """
+    Incremental writer of DataFrame chunks into one file.
+    Header (schema) is taken from the first chunk.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = path
+        self._header = None
+
+    @abstractmethod
+    def write(self, data: pd.DataFrame) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class TableFormat(ABC):
+    """
+    Reader and writer of one file format.
+    Format of a file is chosen by its extension (see register_format).
+
+    - columns - read only these columns (all columns if None)
+    """
+
+    name = ""
+
+    @abstractmethod
+    def read(self, path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def read_chunks(
+        self,
+        path: str | Path,
+        chunk_size: int,
+        columns: list[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Read file by chunks, index of chunks continues from the previous chunk"""
+
+        pass
+
+    @abstractmethod
+    def count_rows(self, path: str | Path) -> int:
+        """Return count of rows without header"""
+
+        pass
+
+    @abstractmethod
+    def writer(self, path: str | Path) -> TableWriter:
+        pass
+
+    def write(self, data: pd.DataFrame, path: str | Path) -> None:
+        with self.writer(path) as writer:
+            writer.write(data)
+
+
+def _file_columns(names: list[str], columns: list[str] = None) -> list[str]:
+    """Return columns in order of the file (as csv and xlsx readers do)"""
+
+    if columns is None:
+        return None
+    return [name for name in names if name in columns]
+
+
+def _chunk_frame(rows: list[tuple], header: tuple, start: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        rows,
+        columns=list(header),
+        index=pd.RangeIndex(start, start + len(rows)),
+    )
+
+
+class CsvWriter(TableWriter):
+    def write(self, data: pd.DataFrame) -> None:
+        data.to_csv(
+            self.path,
+            mode="w" if self._header is None else "a",
+            header=self._header is None,
+            index=False,
+        )
+        self._header = list(data.columns)
+
+
+class CsvFormat(TableFormat):
+    name = "csv"
+
+    def read(self, path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+        return pd.read_csv(path, usecols=columns)
+
+    def read_chunks(
+        self,
+        path: str | Path,
+        chunk_size: int,
+        columns: list[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(path, chunksize=chunk_size, usecols=columns) as reader:
+            yield from reader
+
+    def count_rows(self, path: str | Path) -> int:
+        """Lines are counted in binary blocks (quoted line breaks are counted too)"""
+
+        lines = 0
+        last = b"\n"
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                lines += block.count(b"\n")
+                last = block[-1:]
+
+        if last != b"\n":
+            lines += 1
+        return max(lines - 1, 0)
+
+    def writer(self, path: str | Path) -> TableWriter:
+        return CsvWriter(path)
+
+
+class ExcelWriter(TableWriter):
+    """
+    XLSX is written by openpyxl write-only workbook: rows are streamed
+    into the sheet file, the workbook object tree isn't built in memory.
+    Rows are converted to python values by blocks of block_size rows.
+    """
+
+    block_size = 10_000
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+
+    def write(self, data: pd.DataFrame) -> None:
+        if self._header is None:
+            self._header = list(data.columns)
+            self._sheet.append(self._header)
+
+        for start in range(0, len(data), self.block_size):
+            block = data.iloc[start : start + self.block_size]
+            values = block.astype(object).where(block.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                self._sheet.append(row)
+
+    def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+def _excel_header(header: tuple) -> list:
+    """Empty names of the header are named as pandas does"""
+
+    return [
+        f"Unnamed: {i}" if value is None else value for i, value in enumerate(header)
+    ]
+
+
+def _filled_rows(rows: Iterator[tuple]) -> Iterator[tuple]:
+    """Skip trailing empty rows of the sheet (empty rows between filled are kept)"""
+
+    empty = []
+    for row in rows:
+        if all(value is None for value in row):
+            empty.append(row)
+            continue
+
+        yield from empty
+        empty.clear()
+        yield row
+
+
+class ExcelFormat(TableFormat):
+    """
+    XLSX is read from the first sheet, first row is header.
+    Sheet is read in openpyxl read-only mode row by row (cells are parsed
+    from the sheet stream), so only the current chunk of rows is kept
+    as python objects. The whole file is read by chunks of chunk_size rows.
+    """
+
+    name = "xlsx"
+    chunk_size = 50_000
+
+    def read(self, path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+        chunks = list(self.read_chunks(path, self.chunk_size, columns))
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks).infer_objects()
+
+    def read_chunks(
+        self,
+        path: str | Path,
+        chunk_size: int,
+        columns: list[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Header-only sheet gives one empty chunk, empty sheet gives no chunks"""
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+
+            header = _excel_header(header)
+            positions = list(range(len(header)))
+            if columns is not None:
+                positions = [i for i, value in enumerate(header) if value in columns]
+                header = [header[i] for i in positions]
+
+            start = 0
+            chunk = []
+            for row in _filled_rows(rows):
+                chunk.append([row[i] if i < len(row) else None for i in positions])
+                if len(chunk) == chunk_size:
+                    yield self._chunk(chunk, header, start)
+                    start += len(chunk)
+                    chunk = []
+
+            if chunk or start == 0:
+                yield self._chunk(chunk, header, start)
+
+        finally:
+            workbook.close()
+
+    def _chunk(self, rows: list[list], header: list, start: int) -> pd.DataFrame:
+        """Empty cells are NaN as in pandas.read_excel"""
+
+        chunk = _chunk_frame(rows, header, start)
+        return chunk.fillna(np.nan)
+
+    def count_rows(self, path: str | Path) -> int:
+        """
+        Rows are counted as read_chunks reads them (trailing empty rows
+        and stale sheet dimension aren't counted)
+        """
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            if next(rows, None) is None:
+                return 0
+            return sum(1 for _ in _filled_rows(rows))
+
+        finally:
+            workbook.close()
+
+    def writer(self, path: str | Path) -> TableWriter:
+        return ExcelWriter(path)
+
+
+class ParquetWriter(TableWriter):
+    """Every chunk is a row group of the file (zstd compression)"""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._writer = None
+
+    def write(self, data: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            self._header = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._header, compression="zstd")
+        else:
+            table = pa.Table.from_pandas(
+                data, schema=self._header, preserve_index=False
+            )
+
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetFormat(TableFormat):
+    """Parquet and Feather formats need pyarrow"""
+
+    name = "parquet"
+
+    def read(self, path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        if columns is not None:
+            columns = _file_columns(pq.read_schema(path).names, columns)
+        return pd.read_parquet(path, columns=columns)
+
+    def read_chunks(
+        self,
+        path: str | Path,
+        chunk_size: int,
+        columns: list[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        start = 0
+        with pq.ParquetFile(path) as file:
+            columns = _file_columns(file.schema_arrow.names, columns)
+            for batch in file.iter_batches(batch_size=chunk_size, columns=columns):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+
+    def count_rows(self, path: str | Path) -> int:
+        """Count of rows is taken from the file metadata"""
+
+        import pyarrow.parquet as pq
+
+        return pq.read_metadata(path).num_rows
+
+    def writer(self, path: str | Path) -> TableWriter:
+        return ParquetWriter(path)
+
+
+class FeatherWriter(TableWriter):
+    """Arrow IPC file (Feather V2) with zstd compression"""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._writer = None
+
+    def write(self, data: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            self._header = table.schema
+            self._writer = pa.ipc.new_file(
+                str(self.path),
+                self._header,
+                options=pa.ipc.IpcWriteOptions(compression="zstd"),
+            )
+        else:
+            table = pa.Table.from_pandas(
+                data, schema=self._header, preserve_index=False
+            )
+
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class FeatherFormat(TableFormat):
+    name = "feather"
+
+    def read(self, path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+        import pyarrow as pa
+
+        if columns is not None:
+            with pa.memory_map(str(path)) as source:
+                names = pa.ipc.open_file(source).schema.names
+            columns = _file_columns(names, columns)
+        return pd.read_feather(path, columns=columns)
+
+    def read_chunks(
+        self,
+        path: str | Path,
+        chunk_size: int,
+        columns: list[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """File is memory mapped, only record batches of the current chunk are read"""
+
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            columns = _file_columns(reader.schema.names, columns)
+
+            start = 0
+            batches = []
+            rows = 0
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                batches.append(batch)
+                rows += batch.num_rows
+
+                while rows >= chunk_size:
+                    table = pa.Table.from_batches(batches)
+                    yield self._chunk(table.slice(0, chunk_size), start)
+                    start += chunk_size
+                    rows -= chunk_size
+                    batches = table.slice(chunk_size).to_batches()
+
+            if rows:
+                yield self._chunk(pa.Table.from_batches(batches), start)
+
+    def _chunk(self, table, start: int) -> pd.DataFrame:
+        chunk = table.to_pandas()
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        return chunk
+
+    def count_rows(self, path: str | Path) -> int:
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+
+    def writer(self, path: str | Path) -> TableWriter:
+        return FeatherWriter(path)
+
+
+FORMATS: dict[str, TableFormat] = {}
+COLUMNAR_FORMATS = {"parquet", "feather"}
+
+
+def register_format(table_format: TableFormat, *extensions: str) -> None:
+    """Use table_format for files with extensions (without dot)"""
+
+    for extension in extensions:
+        FORMATS[extension.lower()] = table_format
+
+
+register_format(CsvFormat(), "csv")
+register_format(ExcelFormat(), "xlsx")
+register_format(ParquetFormat(), "parquet")
+register_format(FeatherFormat(), "feather", "arrow")
+
+
+def table_format(path: str | Path) -> TableFormat:
+    """Return format of the file by its extension"""
+
+    table_format = FORMATS.get(Path(path).suffix.lower().lstrip("."))
+    if table_format is None:
+        extensions = ", ".join(FORMATS)
+        raise ValueError(f"File should be one of: {extensions}")
+    return table_format
+
+
+def file_type(path: str | Path) -> str:
+    """Return name of the file format ('csv', 'xlsx', 'parquet', 'feather')"""
+
+    return table_format(path).name
+
+
+def read_table(path: str | Path, columns: list[str] = None) -> pd.DataFrame:
+    """Read whole file (only columns if they are passed)"""
+
+    return table_format(path).read(path, columns)
+
+
+def write_table(data: pd.DataFrame, path: str | Path) -> None:
+    """Write DataFrame into file (without index)"""
+
+    table_format(path).write(data, path)
+
+
+def count_rows(path: str | Path) -> int:
+    """Return count of rows of the file without header"""
+
+    return table_format(path).count_rows(path)
+
+
+def read_chunks(
+    path: str | Path,
+    chunk_size: int,
+    columns: list[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read file by chunks of chunk_size rows.
+    Index of chunks continues from the previous chunk.
+    """
+
+    yield from table_format(path).read_chunks(path, chunk_size, columns)
+
+
+class ChunkWriter(TableWriter):
+    """Incremental writer of DataFrame chunks into file by its extension"""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._writer = table_format(path).writer(path)
+
+    def write(self, data: pd.DataFrame) -> None:
+        self._writer.write(data)
+
+    def close(self) -> None:
+        self._writer.close()
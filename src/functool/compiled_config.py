@@ -0,0 +1,237 @@
+import os
+import sys
+import copy
+import json
+import pickle
+import hashlib
+import regex as re
+
+from pathlib import Path
+from typing import Callable
+
+SRC_DIR = Path(__file__).parent.parent
+PROJECT_DIR = SRC_DIR.parent
+sys.path.append(str(PROJECT_DIR))
+
+from config.measures_config.config_parser import (
+    CONFIG,
+    MEASURE,
+    DATA,
+    UNIT,
+    AUTOSEM_CONF,
+    TEXT_FEATURES_CONF,
+)
+from src.functool.measures_functool import Measures
+from src.feature_flow.feature_generator import FeatureGenerator
+from src.feature_flow.feature_functool import AbstractFeature
+
+# version of the artifact format (artifacts of other versions are rebuilt)
+ARTIFACT_VERSION = 1
+
+MEASURE_KEYS = {
+    CONFIG.NUMERIC_MEASURES: [MEASURE.AUTOSEM, MEASURE.TEXT_FEATURES, MEASURE.DATA],
+    CONFIG.STRING_MEASURES: [MEASURE.AUTOSEM, MEASURE.TEXT_FEATURES, MEASURE.DATA],
+    CONFIG.COMPLEX_MEASURES: [MEASURE.TEXT_FEATURES],
+}
+AUTOSEM_KEYS = [AUTOSEM_CONF.USE_IT, AUTOSEM_CONF.MERGE_MODE, AUTOSEM_CONF.EXCLUDE_RX]
+TEXT_FEATURES_KEYS = [
+    TEXT_FEATURES_CONF.USE_IT,
+    TEXT_FEATURES_CONF.VALIDATION_MODE,
+    TEXT_FEATURES_CONF.NOT_FOUND_MODE,
+    TEXT_FEATURES_CONF.PRIORITY,
+]
+DATA_KEYS = [
+    DATA.COMMON_PREFIX,
+    DATA.COMMON_POSTFIX,
+    DATA.COMMON_MAX_COUNT,
+    DATA.SPECIAL_VALUE_SEARCH,
+    DATA.UNITS,
+]
+UNIT_KEYS = [
+    UNIT.NAME,
+    UNIT.SYMBOL,
+    UNIT.RWEIGHT,
+    UNIT.PREFIX,
+    UNIT.POSTFIX,
+    UNIT.MAX_COUNT,
+    UNIT.USE_IT,
+]
+
+
+class ConfigGracefullExit(Exception):
+    pass
+
+
+def config_key(config: dict) -> str:
+    """Return hash of the config (the same for equal configs)"""
+
+    dump = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(dump.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _check_keys(record: dict, keys: list[str], where: str) -> None:
+    if not isinstance(record, dict):
+        raise ConfigGracefullExit(f"{where}: should be an object")
+
+    missing = [key for key in keys if key not in record]
+    if missing:
+        raise ConfigGracefullExit(f"{where}: missing {', '.join(missing)}")
+
+
+def validate_config(config: dict) -> None:
+    """
+    Check structure of the measures config
+    (raise ConfigGracefullExit with the place of the error)
+    """
+
+    _check_keys(config, list(MEASURE_KEYS), "config")
+
+    for measure_type, measure_keys in MEASURE_KEYS.items():
+        _check_keys(
+            config[measure_type], [CONFIG.USE_IT, CONFIG.MEASURES], measure_type
+        )
+
+        for measure_record in config[measure_type][CONFIG.MEASURES]:
+            if MEASURE.NAME not in measure_record:
+                continue
+
+            where = f"{measure_type} / {measure_record[MEASURE.NAME]}"
+            _check_keys(measure_record, measure_keys, where)
+            _check_keys(
+                measure_record[MEASURE.TEXT_FEATURES], TEXT_FEATURES_KEYS, where
+            )
+            if measure_type == CONFIG.COMPLEX_MEASURES:
+                continue
+
+            _check_keys(measure_record[MEASURE.AUTOSEM], AUTOSEM_KEYS, where)
+            _check_keys(measure_record[MEASURE.DATA], DATA_KEYS, where)
+            for unit_data in measure_record[MEASURE.DATA][DATA.UNITS]:
+                _check_keys(unit_data, UNIT_KEYS, where)
+
+
+class CompiledConfig(object):
+    """
+    Measures config which is validated and compiled once.
+    SemantiX measures and FeatureFlow features are built once per instance:
+    every measures() call gets its own Measures (callbacks and stop state)
+    over the same measure objects with compiled patterns and converters.
+
+    Compiled config can be saved as a versioned artifact and passed to
+    worker processes (measures are kept serialized, so the config isn't
+    validated and measures aren't built again; patterns are compiled
+    when the artifact is loaded).
+
+    - config - parsed measures config
+    """
+
+    def __init__(self, config: dict) -> None:
+        validate_config(config)
+
+        self.version = ARTIFACT_VERSION
+        self.key = config_key(config)
+        self.config = config
+
+        self._built_measures: Measures = None
+        self._features: list[AbstractFeature] = None
+
+        try:
+            measures = Measures(config)
+            for measure in measures.measures.values():
+                re.compile(measure.exclude_regex)
+            self._measures = pickle.dumps(measures)
+            self._built_measures = measures
+
+            # FeatureFlow units are compiled when features are created
+            self.features()
+        except re.error as ex:
+            raise ConfigGracefullExit(f"Wrong regex in config: {ex}")
+
+    def __getstate__(self) -> dict:
+        """Built measures and features aren't saved (classes can't be saved)"""
+
+        state = self.__dict__.copy()
+        state["_built_measures"] = None
+        state["_features"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._built_measures = None
+        self._features = None
+
+    def measures(
+        self,
+        status_callback: Callable = None,
+        progress_callback: Callable = None,
+    ) -> Measures:
+        """Return new Measures of the config (measure objects are shared)"""
+
+        if self._built_measures is None:
+            self._built_measures = pickle.loads(self._measures)
+
+        measures = copy.copy(self._built_measures)
+        measures.status_callback = status_callback
+        measures.progress_callback = progress_callback
+        measures.used_units_names = []
+        measures._stopped = False
+        return measures
+
+    def features(self) -> list[AbstractFeature]:
+        """Return FeatureFlow features of the config"""
+
+        if self._features is None:
+            self._features = FeatureGenerator().generate(self.config)
+        return self._features
+
+    def save(self, path: str | Path) -> None:
+        """Save the artifact (file is replaced at once)"""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as file:
+            pickle.dump(self, file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CompiledConfig":
+        """
+        Return saved artifact or None if it can't be used
+        (also if it was saved by other version of the code)
+        """
+
+        try:
+            with open(path, "rb") as file:
+                compiled = pickle.load(file)
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            ImportError,
+            AttributeError,
+            TypeError,
+            ValueError,
+        ):
+            return None
+
+        if not isinstance(compiled, cls) or compiled.version != ARTIFACT_VERSION:
+            return None
+        return compiled
+
+
+def compile_config(config: dict, directory: str | Path = None) -> CompiledConfig:
+    """
+    Return compiled config. Artifacts are kept in directory by config hash,
+    so a saved artifact is loaded instead of compiling (if directory is passed).
+    """
+
+    if directory is None:
+        return CompiledConfig(config)
+
+    path = Path(directory) / f"measures_{config_key(config)}.pkl"
+    compiled = CompiledConfig.load(path) if path.exists() else None
+    if compiled is None or compiled.config != config:
+        compiled = CompiledConfig(config)
+        compiled.save(path)
+    return compiled
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+
+class DisplayTable(object):
+    """
+    Display strings of a DataFrame for table views.
+    Columns are kept as numpy arrays, rows are shown in order of the view
+    (positions of rows after sorting and filtering).
+
+    Cells are converted to strings by blocks of rows (one column at a time),
+    formatted blocks are kept in LRU cache, so only visible blocks are formatted.
+
+    - block_size - count of rows in a formatted block
+    - cache_blocks - count of cached blocks
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame = None,
+        block_size: int = 256,
+        cache_blocks: int = 64,
+    ) -> None:
+        if data is None:
+            data = pd.DataFrame()
+
+        self.columns = [str(column) for column in data.columns]
+        self.index = data.index.to_numpy()
+        self.arrays = [data.iloc[:, i].to_numpy() for i in range(data.shape[1])]
+
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+
+        self.order = np.arange(len(data), dtype=np.int64)
+        self._blocks: OrderedDict[int, list[list[str]]] = OrderedDict()
+        self._strings_cache: dict[int, pd.Series] = {}
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _format(self, values: np.ndarray) -> list[str]:
+        return [str(value) for value in values.tolist()]
+
+    def _block(self, number: int) -> list[list[str]]:
+        """Return formatted rows of the block (columns of strings)"""
+
+        block = self._blocks.get(number)
+        if block is not None:
+            self._blocks.move_to_end(number)
+            return block
+
+        positions = self.order[
+            number * self.block_size : (number + 1) * self.block_size
+        ]
+        block = [self._format(array[positions]) for array in self.arrays]
+
+        self._blocks[number] = block
+        if len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def cell(self, row: int, column: int) -> str:
+        """Return display string of the cell of the view"""
+
+        block = self._block(row // self.block_size)
+        return block[column][row % self.block_size]
+
+    def row_label(self, row: int) -> str:
+        return str(self.index[self.order[row]])
+
+    def _strings(self, column: int) -> pd.Series:
+        """Display strings of the whole column (kept for next filters)"""
+
+        strings = self._strings_cache.get(column)
+        if strings is None:
+            strings = pd.Series(self.arrays[column]).astype(str)
+            self._strings_cache[column] = strings
+        return strings
+
+    def sorted_order(self, column: int, descending: bool = False) -> np.ndarray:
+        """
+        Return view order sorted by column (current order is kept for equal
+        values, NaN are at the end). Columns of mixed types are sorted
+        by display strings.
+        """
+
+        values = pd.Series(self.arrays[column][self.order])
+        ascending = not descending
+        try:
+            values = values.sort_values(ascending=ascending, kind="stable")
+        except TypeError:
+            values = values.astype(str).sort_values(ascending=ascending, kind="stable")
+
+        return self.order[values.index.to_numpy()]
+
+    def filtered_order(self, text: str, column: int = None) -> np.ndarray:
+        """
+        Return order of all rows which contain text (case insensitive)
+        in the column or in any column if column is None.
+        """
+
+        if not text:
+            return np.arange(len(self.index), dtype=np.int64)
+
+        columns = range(len(self.arrays)) if column is None else [column]
+        mask = np.zeros(len(self.index), dtype=bool)
+        for i in columns:
+            mask |= self._strings(i).str.contains(text, case=False, regex=False)
+
+        return np.flatnonzero(mask)
+
+    def set_order(self, order: np.ndarray) -> None:
+        """Set rows of the view (formatted blocks are dropped)"""
+
+        self.order = np.asarray(order, dtype=np.int64)
+        self._blocks.clear()
@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import pandas as pd
+from pathlib import Path
+from collections import OrderedDict
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.chunked_io import read_chunks, count_rows
+
+
+class FilePreview(object):
+    """
+    Preview of table files: header and first rows only
+    (csv is read by a bounded reader, xlsx by streaming of the first rows).
+    Count of rows is counted only on demand.
+
+    Previews are cached by path and modification time of the file,
+    so a changed file is read again. Methods can be called from threads.
+
+    - rows - count of preview rows
+    - cache_size - count of cached files
+    """
+
+    def __init__(self, rows: int = 5, cache_size: int = 16) -> None:
+        self.rows = rows
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, path: str | Path) -> tuple:
+        stat = os.stat(path)
+        return (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+    def _entry(self, key: tuple) -> dict:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = {}
+                self._cache[key] = entry
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            self._cache.move_to_end(key)
+            return entry
+
+    def preview(self, path: str | Path) -> pd.DataFrame:
+        """Return header and first rows of the file"""
+
+        entry = self._entry(self._key(path))
+        if "data" not in entry:
+            entry["data"] = next(read_chunks(path, self.rows), pd.DataFrame())
+        return entry["data"]
+
+    def count_rows(self, path: str | Path) -> int:
+        """Return count of rows of the file (counted once per file version)"""
+
+        entry = self._entry(self._key(path))
+        if "rows" not in entry:
+            entry["rows"] = count_rows(path)
+        return entry["rows"]
@@ -0,0 +1,115 @@
+import os
+import hashlib
+import numpy as np
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+def digest(value: str) -> str:
+    """Return short hex hash of the value (for file names)"""
+
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def key_hashes(values: list[str]) -> np.ndarray:
+    """Return 64-bit hashes of values"""
+
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for value in values
+        ),
+        dtype=np.uint64,
+        count=len(values),
+    )
+
+
+class HashedCache(ABC):
+    """
+    Base of on-disk caches of rows by string keys in npz files.
+    Every config has its own file (name is a hash of the config key),
+    so the cache is dropped as soon as the config is changed.
+
+    Keys are kept as 64-bit hashes (sorted, found by binary search),
+    subclasses keep rows of payload in order of keys and encode them
+    into npz arrays (_load_payload, _payload, _add_payload).
+
+    - directory - directory of cache files
+    - key - config key
+    """
+
+    PREFIX = "cache"
+
+    def __init__(self, directory: str | Path, key: str) -> None:
+        self.directory = Path(directory)
+        self.key = key
+        self.path = self.directory / f"{self.PREFIX}_{digest(key)}.npz"
+
+        self.keys = np.empty(0, dtype=np.uint64)
+        self._changed = False
+
+        if self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @abstractmethod
+    def _load_payload(self, data: np.lib.npyio.NpzFile) -> None:
+        pass
+
+    @abstractmethod
+    def _payload(self) -> dict[str, np.ndarray]:
+        """Return payload arrays for the npz file"""
+
+        pass
+
+    @abstractmethod
+    def _add_payload(self, rows: list, order: np.ndarray) -> None:
+        """Append rows to payload and reorder payload by order"""
+
+        pass
+
+    def _load(self) -> None:
+        with np.load(self.path) as data:
+            self.keys = data["keys"]
+            self._load_payload(data)
+
+    def _find(self, keys: np.ndarray) -> tuple[np.ndarray]:
+        """Return position of every key in the cache and mask of found keys"""
+
+        positions = np.searchsorted(self.keys, keys)
+        positions = np.minimum(positions, max(len(self) - 1, 0))
+        if len(self) == 0:
+            return positions, np.zeros(len(keys), dtype=bool)
+        return positions, self.keys[positions] == keys
+
+    def _add(self, keys: np.ndarray, rows: list) -> None:
+        """Add rows of new keys (row of the first one of equal keys is added)"""
+
+        keys, unique = np.unique(keys, return_index=True)
+        rows = [rows[index] for index in unique.tolist()]
+
+        keys = np.concatenate([self.keys, keys])
+        order = np.argsort(keys, kind="stable")
+
+        self.keys = keys[order]
+        self._add_payload(rows, order)
+        self._changed = True
+
+    def save(self) -> None:
+        """Save the cache if it was changed (file is replaced at once)"""
+
+        if not self._changed:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "wb") as file:
+            np.savez(file, keys=self.keys, **self._payload())
+        os.replace(temporary, self.path)
+        self._changed = False
@@ -7,6 +7,7 @@ import pandas as pd
 from pathlib import Path
 from typing import Callable
 from decimal import Decimal
+from collections import OrderedDict
 from abc import abstractmethod
 from typing import Tuple, List
 
@@ -27,11 +28,21 @@ EXCLUDE_RX_NAME_PREFIX = "Исключ. "
 EXCLUDE_RX_PATTER = r"(?!.*("
 EXCLUDE_RX_PATTER_CARET = r"^(?!.*("
 
+NUMBER_PATTERN = re.compile(r"\d*[.,]?\d+", re.IGNORECASE)
+
 
 class MeasuresGracefullExit(Exception):
     pass
 
 
+def join_columns(columns: list[list[str]], count: int = 0) -> list[str]:
+    """Join strings of columns row by row (count of rows if columns are empty)"""
+
+    if not columns:
+        return [""] * count
+    return ["".join(values) for values in zip(*columns)]
+
+
 class SearchMode(object):
     """Measure Search Mode
     Using for determing position of search value (\d+)
@@ -155,7 +166,9 @@ class Unit(AbstractUnit):
         )
 
         self._search_rx = self._make_search_rx(special_value_search)
+        self._search_pattern = re.compile(self._search_rx, re.IGNORECASE)
         self.allocated_units = [self]
+        self.converter: UnitsConverter = None
 
     def get_search_regex(self) -> str:
         return self._search_rx
@@ -187,8 +200,11 @@ class Unit(AbstractUnit):
 
         return rx
 
-    def _extract_values(self, string: pd.Series) -> list[str]:
-        return re.findall(self._search_rx, string, re.IGNORECASE)
+    def get_search_pattern(self) -> re.Pattern:
+        return self._search_pattern
+
+    def _extract_values(self, string: str) -> list[str]:
+        return self._search_pattern.findall(string)
 
     def extract(
         self,
@@ -256,65 +272,20 @@ class NumericUnit(Unit):
     def _default_search(self) -> str:
         return r"\d*[.,]?\d+"
 
-    def _extract_numeric_values(self, values: list[str]) -> list[str]:
+    def _extract_numeric_values(self, values: list[str]) -> list[Decimal]:
         numeric_values = []
         for value in values:
-            searched = re.search(r"\d*[.,]?\d+", value, re.IGNORECASE)
+            searched = NUMBER_PATTERN.search(value)
             if searched:
-                numeric_values.append(Decimal(searched[0]))
+                numeric_values.append(Decimal(searched[0].replace(",", ".")))
 
         return numeric_values
 
-    def _prepare_num(self, num: str) -> str:
-        if num and not isinstance(num, list):
-            num = f"{num:.20f}"
-            if isinstance(num, str):
-                if "." in num:
-                    num = re.sub(r"0+$", "", num)
-                    num = re.sub(r"\.$", "", num)
-                if "." in num:
-                    num = re.sub(r"[.]", r"[.,]", num)
-        return num
-
-    def _to_regex(self, numeric_values: list[str]) -> list[str]:
-        regexes = []
-        units: list[AbstractUnit] = self.allocated_units
-
-        for numeric_value in numeric_values:
-            rx_parts = []
-            for unit in units:
-                num: Decimal = numeric_value * (
-                    self.relative_weight / unit.relative_weight
-                )
-                num = self._prepare_num(num)
-
-                if unit.search_mode == SearchMode.BEHIND:
-                    rx_part = (
-                        unit.prefix
-                        + num
-                        + r"\s*"
-                        + r"(?:"
-                        + unit.symbol
-                        + r")"
-                        + unit.postfix
-                    )
-
-                else:
-                    rx_part = (
-                        unit.prefix
-                        + r"(?:"
-                        + unit.symbol
-                        + ")"
-                        + r"\s*"
-                        + num
-                        + unit.postfix
-                    )
-
-                rx_parts.append(rx_part)
-
-            regexes.append("|".join(rx_parts))
+    def _to_regex(self, numeric_values: list[Decimal]) -> list[str]:
+        if self.converter is None:
+            self.converter = UnitsConverter([self])
 
-        return regexes
+        return [self.converter.to_regex(self, value) for value in numeric_values]
 
     def transform(
         self,
@@ -333,6 +304,127 @@ class NumericUnit(Unit):
         return list(regex_values)
 
 
+class UnitsConverter(object):
+    """
+    Conversion of numeric values of units to regex of allocated units.
+    Ratios of units and constant parts of regex are prepared once
+    (when units are allocated), rendered regex are kept in LRU cache
+    by (value, unit), so the same values (0.5 л, 1 кг) are rendered once.
+
+    - units - units with allocated units
+    - cache_size - count of cached regex
+    """
+
+    def __init__(self, units: list[AbstractUnit], cache_size: int = 10_000) -> None:
+        self.units = units
+        self.cache_size = cache_size
+
+        self._numbers = {unit.name: number for number, unit in enumerate(units)}
+        self.ratios = [
+            [
+                unit.relative_weight / other.relative_weight
+                for other in unit.allocated_units
+            ]
+            for unit in units
+        ]
+        self._parts = [
+            [self._regex_parts(other) for other in unit.allocated_units]
+            for unit in units
+        ]
+        self._cache: OrderedDict[tuple, str] = OrderedDict()
+
+    def _regex_parts(self, unit: AbstractUnit) -> tuple[str, str]:
+        """Return parts of the unit regex before and after the number"""
+
+        symbol = r"(?:" + unit.symbol + r")"
+        if unit.search_mode == SearchMode.BEHIND:
+            return unit.prefix, r"\s*" + symbol + unit.postfix
+        return unit.prefix + symbol + r"\s*", unit.postfix
+
+    def _render(self, num: Decimal) -> str:
+        """Return number without trailing zeros (20 decimal places at most)"""
+
+        num = f"{num:.20f}".rstrip("0").rstrip(".")
+        return num.replace(".", "[.,]")
+
+    def to_regex(self, unit: AbstractUnit, value: Decimal) -> str:
+        """Return regex of the value of the unit in all allocated units"""
+
+        key = (value, unit.name)
+        regex = self._cache.get(key)
+        if regex is not None:
+            self._cache.move_to_end(key)
+            return regex
+
+        number = self._numbers[unit.name]
+        regex = "|".join(
+            before + self._render(value * ratio) + after
+            for ratio, (before, after) in zip(self.ratios[number], self._parts[number])
+        )
+
+        self._cache[key] = regex
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return regex
+
+
+class UnitsScanner(object):
+    """
+    Extraction of values of many units from one column of strings.
+    Search patterns of units are compiled once. Every unit is looked up
+    by its symbol in the text of the whole column at once (one scan per unit),
+    so findall of the unit runs only for strings which contain the symbol.
+    Values are the same as Unit.extract gives: a match of the unit
+    always contains a match of its symbol.
+
+    Symbols with anchors or lookarounds depend on the context of the string,
+    units with such symbols are searched in every string.
+    """
+
+    SEPARATOR = "\n"
+    CONTEXT_TOKENS = ("(?=", "(?!", "(?<", "^", "$", r"\b", r"\B", r"\A", r"\Z", r"\G")
+
+    def __init__(self, units: list[Unit]) -> None:
+        self.units = units
+        self._symbols = [self._symbol_pattern(unit) for unit in units]
+
+    def _symbol_pattern(self, unit: Unit) -> re.Pattern:
+        if any(token in unit.symbol for token in self.CONTEXT_TOKENS):
+            return None
+        return re.compile(unit.symbol, re.IGNORECASE)
+
+    def _rows(self, symbol: re.Pattern, text: str, starts: np.ndarray) -> list[int]:
+        """Return numbers of strings which contain the symbol"""
+
+        positions = np.fromiter(
+            (match.start() for match in symbol.finditer(text, overlapped=True)),
+            dtype=np.int64,
+        )
+        rows = np.searchsorted(starts, positions, side="right") - 1
+        return np.unique(rows).tolist()
+
+    def scan(self, strings: list[str]) -> list[list[list[str]]]:
+        """Return extracted values by unit (in order of units) and by string"""
+
+        text = self.SEPARATOR.join(strings)
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        starts = np.concatenate([[0], np.cumsum(lengths + len(self.SEPARATOR))[:-1]])
+
+        extracted = []
+        for unit, symbol in zip(self.units, self._symbols):
+            if symbol is None:
+                extracted.append(unit.extract(strings))
+                continue
+
+            pattern = unit.get_search_pattern()
+            values = [[] for _ in strings]
+            for row in self._rows(symbol, text, starts):
+                values[row] = pattern.findall(strings[row])
+            extracted.append(values)
+
+        return extracted
+
+
 class UnitType(object):
     NUMERIC = "numeric_unit"
     STRING = "string_unit"
@@ -372,6 +464,12 @@ class Measure(object):
         self._sort_units()
         self._allocate_relative_units()
 
+        self.converter = UnitsConverter(self.units)
+        for unit in self.units:
+            unit.converter = self.converter
+
+        self.exclude_regex = self._make_exclude_rx()
+
     def __iter__(self):
         self.__i = 0
         return self
@@ -472,42 +570,48 @@ class Measure(object):
         rx += r"))"
         return rx
 
-    def _add_exclude_rx(
-        self,
-        data: pd.DataFrame,
-        units_names: list[str],
-        new_unit_name: str,
-    ) -> pd.DataFrame:
-        exclude_rx = self._make_exclude_rx()
+    def _exclude_rx_column(self, columns: list[list[str]], count: int) -> np.ndarray:
+        """Return exclude regex for rows where all units regex are empty"""
 
-        data.loc[:, new_unit_name] = np.where(
-            data[units_names].apply(lambda r: r.str.strip().eq("").all(), axis=1),
-            exclude_rx,
-            "",
-        )
+        empty = np.ones(count, dtype=bool)
+        for values in columns:
+            empty &= pd.Series(values, dtype=object).str.strip().eq("").to_numpy()
 
-        return data
+        return np.where(empty, self.exclude_regex, "")
 
     def extract(
         self,
         data: pd.DataFrame,
         column: str,
+        extracted: list[list[list[str]]] = None,
     ) -> Tuple[pd.DataFrame, List[str]]:
-        units_names = []
-        extract_from = data[column].to_list()
+        """
+        Create regex column for every unit\n
+        extracted - values of units found by UnitsScanner (in order of units),
+        units extract values by themselves if they are not passed
+        """
 
-        for unit in self.units:
-            extracted_values = unit.extract(extract_from)
-            extracted_values = unit.filter_count(extracted_values)
-            rx_patterns = unit.transform(extracted_values)
+        columns = {}
+        extract_from = data[column].to_list() if extracted is None else None
 
-            data.loc[:, unit.name] = rx_patterns
-            units_names.append(unit.name)
+        for index, unit in enumerate(self.units):
+            if extracted is None:
+                extracted_values = unit.extract(extract_from)
+            else:
+                extracted_values = extracted[index]
+
+            extracted_values = unit.filter_count(extracted_values)
+            columns[unit.name] = unit.transform(extracted_values)
 
         if self.exclude_rx:
             new_unit_name = EXCLUDE_RX_NAME_PREFIX + self.name
-            data = self._add_exclude_rx(data, units_names, new_unit_name)
-            units_names.append(new_unit_name)
+            columns[new_unit_name] = self._exclude_rx_column(
+                list(columns.values()), len(data)
+            )
+
+        # columns are written at once
+        units_names = list(columns)
+        data[units_names] = pd.DataFrame(columns, index=data.index, dtype=object)
 
         return data, units_names
 
@@ -531,6 +635,9 @@ class Measures(object):
     ) -> None:
         self.measures = self._create_measures(config)
         self.measures_names = list(self.measures.keys())
+        self.scanner = UnitsScanner(
+            [unit for measure in self.measures.values() for unit in measure.units]
+        )
 
         self.status_callback = status_callback
         self.progress_callback = progress_callback
@@ -623,10 +730,21 @@ class Measures(object):
         measure = self.measures[measure_name]
         data, units_names = measure.extract(data, column)
 
-        extracted = data[units_names[0]]
-        if len(units_names) >= 2:
-            for unit_name in units_names[1:]:
-                extracted += data[unit_name]
+        extracted = join_columns([data[name].to_list() for name in units_names])
+        return pd.Series(extracted, index=data.index, dtype=object)
+
+    def _scan(self, strings: list[str], chunk_size: int = 10_000) -> list:
+        """Scan strings by chunks (extraction can be stopped between chunks)"""
+
+        self.call_status("Ищу величины")
+        extracted = [[] for _ in self.scanner.units]
+        for start in range(0, len(strings), chunk_size):
+            if self._stopped:
+                raise MeasuresGracefullExit("Measures extraction was stopped")
+
+            chunk = self.scanner.scan(strings[start : start + chunk_size])
+            for values, chunk_values in zip(extracted, chunk):
+                values.extend(chunk_values)
 
         return extracted
 
@@ -642,6 +760,10 @@ class Measures(object):
 
         self.call_status("Начинаю извлечение величин")
         self.call_progress(count, total)
+        self.used_units_names = []
+        extracted = self._scan(data[column].to_list())
+
+        start = 0
         for measure_name in self.measures_names:
             if self._stopped:
                 raise MeasuresGracefullExit("Measures extraction was stopped")
@@ -649,7 +771,9 @@ class Measures(object):
             self.call_status(self._status(measure_name))
 
             measure = self.measures[measure_name]
-            data, units_names = measure.extract(data, column)
+            stop = start + len(measure)
+            data, units_names = measure.extract(data, column, extracted[start:stop])
+            start = stop
 
             self.used_units_names.extend(units_names)
 
@@ -663,11 +787,11 @@ class Measures(object):
         self,
         data: pd.DataFrame,
         used_units_names: list[str],
-    ) -> pd.DataFrame:
-        def is_empty(row: str) -> bool:
-            if row == "":
-                return False
-            return True
+    ) -> Tuple[list[list[str]], list[str]]:
+        """
+        Return regex fragments of exclude columns (caret and exclude regex)
+        and names of other units
+        """
 
         exclude = []
         for unit_name in used_units_names:
@@ -677,35 +801,37 @@ class Measures(object):
         for unit_name in exclude:
             used_units_names.remove(unit_name)
 
-        data["__temp"] = ""
-        for unit_name in exclude:
-            data["__temp"] += data[unit_name]
+        if not exclude:
+            return [], used_units_names
 
-        data.loc[data["__temp"].apply(is_empty), SEMANTIC.REGEX] += "^"
+        exclude_columns = [data[unit_name].to_list() for unit_name in exclude]
+        caret = ["^" if any(values) else "" for values in zip(*exclude_columns)]
 
-        for unit_name in exclude:
-            data[SEMANTIC.REGEX] += data[unit_name].str.replace(
-                EXCLUDE_RX_PATTER_CARET,
-                EXCLUDE_RX_PATTER,
-                n=1,
-                regex=False,
+        fragments = [caret]
+        for values in exclude_columns:
+            fragments.append(
+                [
+                    value.replace(EXCLUDE_RX_PATTER_CARET, EXCLUDE_RX_PATTER, 1)
+                    for value in values
+                ]
             )
 
-        data = data.drop(["__temp"], axis=1)
-        return data, used_units_names
+        return fragments, used_units_names
 
     def concat_regex(
         self,
         data: pd.DataFrame,
         delete_units_columns: bool = False,
     ) -> pd.DataFrame:
-        data[SEMANTIC.REGEX] = ""
+        """Join regex of all units to one column (rows are joined once)"""
+
         used_units_names = self.used_units_names
 
-        data, used_units_names = self._concat_exlcude_rx(data, used_units_names)
+        fragments, used_units_names = self._concat_exlcude_rx(data, used_units_names)
+        for unit_name in used_units_names:
+            fragments.append(data[unit_name].to_list())
 
-        for unit_name in self.used_units_names:
-            data[SEMANTIC.REGEX] += data[unit_name]
+        data[SEMANTIC.REGEX] = join_columns(fragments, len(data))
 
         if delete_units_columns:
             data = data.drop(self.used_units_names, axis=1)
@@ -0,0 +1,72 @@
+import numpy as np
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+
+class SharedArrays(object):
+    """
+    Numpy arrays published once into one multiprocessing.shared_memory block.
+    Workers get only descriptor (block name and arrays layout) and attach
+    the block: the last attached block is cached in the process until detach
+    (workers should detach when they don't need the block, otherwise
+    the unlinked block stays mapped in them).
+
+    - descriptor - (block name, ((key, dtype, shape, offset), ...))
+    """
+
+    _attached: dict[str, tuple[SharedMemory, dict[str, np.ndarray]]] = {}
+
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        arrays = {key: np.ascontiguousarray(array) for key, array in arrays.items()}
+
+        layout = []
+        size = 0
+        for key, array in arrays.items():
+            size = (size + 7) // 8 * 8
+            layout.append((key, array.dtype.str, array.shape, size))
+            size += array.nbytes
+
+        self.memory = SharedMemory(create=True, size=max(size, 1))
+        for key, dtype, shape, offset in layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+            view[...] = arrays[key]
+            del view
+
+        self.descriptor = (self.memory.name, tuple(layout))
+
+    def close(self) -> None:
+        """Close and unlink shared block (workers' mappings stay valid until detach)"""
+
+        # workers unregister attached block, so it's registered again
+        # if they share resource tracker of this process
+        resource_tracker.register(self.memory._name, "shared_memory")
+        self.memory.close()
+        self.memory.unlink()
+
+    @classmethod
+    def attach(cls, descriptor: tuple) -> dict[str, np.ndarray]:
+        """Return arrays of shared block by its descriptor"""
+
+        name, layout = descriptor
+        attached = cls._attached.get(name)
+        if attached is None:
+            cls.detach()
+
+            # block is owned and unlinked by the creator process,
+            # resource tracker of worker process shouldn't unlink it on exit
+            memory = SharedMemory(name=name)
+            resource_tracker.unregister(memory._name, "shared_memory")
+            arrays = {
+                key: np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+                for key, dtype, shape, offset in layout
+            }
+            attached = cls._attached[name] = (memory, arrays)
+        return attached[1]
+
+    @classmethod
+    def detach(cls) -> None:
+        attached = list(cls._attached.values())
+        cls._attached.clear()
+        for memory, arrays in attached:
+            arrays.clear()
+            memory.close()
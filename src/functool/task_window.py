@@ -0,0 +1,62 @@
+import multiprocessing
+from collections import deque
+from typing import Callable, Iterable, Iterator
+
+
+class TaskWindow(object):
+    """
+    Tasks of a process pool with bounded count of tasks in flight.
+    Next task is submitted only when the result of a task is taken,
+    so stopped processing doesn't leave queued tasks in the shared pool.
+    Results are returned in order of tasks.
+
+    On exit (also by exception) no more tasks are submitted and
+    submitted tasks are waited for.
+
+    - window - count of tasks in flight (twice the count of workers if None)
+    """
+
+    def __init__(
+        self,
+        process_pool: multiprocessing.Pool,
+        func: Callable,
+        tasks: Iterable,
+        window: int = None,
+    ) -> None:
+        if window is None:
+            workers = getattr(process_pool, "_processes", None)
+            window = 2 * (workers or multiprocessing.cpu_count())
+
+        self.process_pool = process_pool
+        self.func = func
+        self.window = max(window, 1)
+
+        self._tasks = iter(tasks)
+        self._pending = deque()
+        self._closed = False
+
+    def _submit(self) -> None:
+        while not self._closed and len(self._pending) < self.window:
+            task = next(self._tasks, None)
+            if task is None:
+                return
+            self._pending.append(self.process_pool.apply_async(self.func, (task,)))
+
+    def __iter__(self) -> Iterator:
+        self._submit()
+        while self._pending:
+            yield self._pending.popleft().get()
+            self._submit()
+
+    def close(self) -> None:
+        """Stop submitting and wait for submitted tasks"""
+
+        self._closed = True
+        while self._pending:
+            self._pending.popleft().wait()
+
+    def __enter__(self) -> "TaskWindow":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -172,5 +172,26 @@ class JAKKAR(NOTATION):
     CLIENT_TOKENS_COUNT = "client_tokens_count"
     SOURCE_TOKENS_COUNT = "source_tokens_count"
 
+    CANDIDATE_RANK = "candidate_rank"
+    CANDIDATE_SCORE = "candidate_score"
+
     RATIO_PATH = r"ratio.xlsx"
     VALIDATED = "fuzzy validation"
+
+
+class SWEEP(NOTATION):
+    """Metrics table of SimFyzer.sweep"""
+
+    FUZZY_THRESHOLD = "fuzzy_threshold"
+    VALIDATION_THRESHOLD = "validation_threshold"
+    RATE_FUNCTION = "rate_function"
+
+    TP = "true_positive"
+    FP = "false_positive"
+    FN = "false_negative"
+    TN = "true_negative"
+
+    PRECISION = "precision"
+    RECALL = "recall"
+    F1 = "f1"
+    ACCURACY = "accuracy"
@@ -19,6 +19,11 @@ from src.functool.measures_functool import (
     Measures,
     MeasuresGracefullExit,
 )
+from src.functool.compiled_config import (
+    CompiledConfig,
+    ConfigGracefullExit,
+    compile_config,
+)
 from src.functool.cross_semantic_functool import BasicCrosser
 from src.functool.words_functool import (
     LanguageRules,
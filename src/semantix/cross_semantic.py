@@ -2,9 +2,11 @@ import sys
 import pandas as pd
 import re
 import copy
+import multiprocessing
 
 from pathlib import Path
 from typing import Callable
+from functools import partial
 
 SRC_DIR = Path(__file__).parent.parent
 PROJECT_DIR = SRC_DIR.parent
@@ -18,12 +20,76 @@ from src.functool.word_extraction import (
     words_stemming,
     WordsExtractor,
 )
+from src.functool.task_window import TaskWindow
 
 
 class CrosserGracefullExit(Exception):
     pass
 
 
+CROSS_MINUS, CROSS_PLUS, CROSS_INTERSECT = 0, 1, 2
+
+
+def checkout(row: str, rx: set, plus: bool) -> bool:
+    found = True if re.search(list(rx)[0], row, re.IGNORECASE) else False
+    return found if plus else not found
+
+
+def crossing_func(
+    task: tuple[int, int, int, list[set], list[str]],
+    process_nearest: int,
+    make_cross_minus: bool,
+    make_cross_intersect: bool,
+) -> tuple[int, list[tuple[int, int, set]]]:
+    """
+    Cross-operations of rows from start to stop with their nearest rows.
+    Task is (start, stop, offset, tokens, strings): tokens and strings
+    of the rows window beginning at offset.
+    Return updates (row, column, words) in order of processing.
+    """
+
+    start, stop, offset, tokens, strings = task
+    crosser = BasicCrosser()
+    rows_count = offset + len(tokens)
+
+    updates = []
+    for position in range(start, stop):
+        index = position - offset
+        current_set = tokens[index]
+
+        first, last = offset, rows_count
+        if process_nearest:
+            first = max(0, position - process_nearest)
+            last = min(rows_count, position + process_nearest + 1)
+
+        for rest_position in range(first, last):
+            if rest_position == position:
+                continue
+
+            rest_index = rest_position - offset
+            other_set = tokens[rest_index]
+
+            if make_cross_minus:
+                cross_minus = crosser.get_cross_minus(current_set, other_set)
+                if cross_minus:
+                    if checkout(strings[index], cross_minus, plus=False):
+                        updates.append((position, CROSS_MINUS, cross_minus))
+                    if checkout(strings[rest_index], cross_minus, plus=True):
+                        updates.append((rest_position, CROSS_PLUS, cross_minus))
+
+            if make_cross_intersect:
+                cross_intersect = crosser.get_cross_intersect(current_set, other_set)
+                if cross_intersect:
+                    if checkout(strings[index], cross_intersect[0], plus=True):
+                        updates.append((position, CROSS_INTERSECT, cross_intersect[0]))
+                    if checkout(strings[index], cross_intersect[1], plus=True):
+                        updates.append(
+                            (rest_position, CROSS_INTERSECT, cross_intersect[1])
+                        )
+
+    return start, updates
+
+
 class Crosser(BasicCrosser):
     """
     This class can perform cross-minus and
@@ -71,11 +137,7 @@ class Crosser(BasicCrosser):
         self.delete_rx = delete_rx
 
     def _checkout(self, row: str, rx: str, plus: bool) -> bool:
-        if plus:
-            checkout = True if re.search(list(rx)[0], row, re.IGNORECASE) else False
-        else:
-            checkout = False if re.search(list(rx)[0], row, re.IGNORECASE) else True
-        return checkout
+        return checkout(row, rx, plus)
 
     def _call_cross_minus(
         self,
@@ -253,59 +315,100 @@ class CrosserPro(Crosser):
     def stop_callback(self) -> None:
         self._stopped = True
 
-    def extract(self, data: pd.DataFrame, col: str):
-        if len(self.extractors) > 0:
-            resort_by_index = False
-            # self._show_status()
+    def _cross_tasks(
+        self,
+        tokens: list[set],
+        strings: list[str],
+        block_size: int,
+    ):
+        """Tasks of crossing_func: blocks of rows with windows of nearest rows"""
 
-            self.call_status("Предобработка для кросс-семантики")
-            data = self._setup(data)
-            data = self._del_rx(data, col)
-            data = self.get_tokens_pro(data, "row", self.extractors)
+        rows_count = len(tokens)
+        for start in range(0, rows_count, block_size):
+            stop = min(start + block_size, rows_count)
 
+            first, last = 0, rows_count
             if self.process_nearest:
-                resort_by_index = True
-                data = data.sort_values(by=[col])
+                first = max(0, start - self.process_nearest)
+                last = min(rows_count, stop + self.process_nearest)
 
-            indexes = list(data.index)
+            yield start, stop, first, tokens[first:last], strings[first:last]
 
-            count = 0
-            total = len(indexes)
+    def _cross(
+        self,
+        tokens: list[set],
+        strings: list[str],
+        process_pool: multiprocessing.Pool = None,
+    ) -> list[list[set]]:
+        """
+        Return cross-minus, cross-plus and cross-intersect sets of rows.
+        Blocks of rows are processed by the process pool (if passed),
+        updates are applied in order of rows as one process does.
+        """
 
-            self.call_status("Извлекаю кросс-семантику")
-            self.call_progress(count, total)
-            for pos_index in range(len(indexes)):
+        block_size = 100 if process_pool is not None else 1000
+        tasks = self._cross_tasks(tokens, strings, block_size)
+        cross_func = partial(
+            crossing_func,
+            process_nearest=self.process_nearest,
+            make_cross_minus=self.make_cross_minus,
+            make_cross_intersect=self.make_cross_intersect,
+        )
+
+        window = None
+        if process_pool is not None:
+            window = TaskWindow(process_pool, cross_func, tasks)
+            results = iter(window)
+        else:
+            results = map(cross_func, tasks)
+
+        sets = [[set() for _ in tokens] for _ in self.columns]
+
+        count = 0
+        total = len(range(0, len(tokens), block_size))
+        self.call_progress(count, total)
+        try:
+            for _, updates in results:
                 if self._stopped:
                     raise CrosserGracefullExit
 
-                index = indexes[pos_index]
-                current_set = data.at[index, "tokens"]
+                for position, column, words in updates:
+                    sets[column][position].update(words)
 
-                rest_indexes = indexes[:]  # or use copy.copy(indexes)
-                if self.process_nearest:
-                    rest_indexes = indexes[
-                        max(0, pos_index - self.process_nearest) : min(
-                            len(indexes), pos_index + self.process_nearest + 1
-                        )
-                    ]
+                count += 1
+                self.call_progress(count, total)
 
-                if index in rest_indexes:
-                    rest_indexes.remove(index)  # can be profiled?
+        finally:
+            if window is not None:
+                window.close()
 
-                for rest_index in rest_indexes:
-                    other_set = data.at[rest_index, "tokens"]
+        return sets
 
-                    if self.make_cross_minus:
-                        self._call_cross_minus(
-                            data, col, current_set, other_set, index, rest_index
-                        )
-                    if self.make_cross_intersect:
-                        self._call_cross_intersect(
-                            data, col, current_set, other_set, index, rest_index
-                        )
+    def extract(
+        self,
+        data: pd.DataFrame,
+        col: str,
+        process_pool: multiprocessing.Pool = None,
+    ):
+        if len(self.extractors) > 0:
+            resort_by_index = False
+            # self._show_status()
 
-                count += 1
-                self.call_progress(count, total)
+            self.call_status("Предобработка для кросс-семантики")
+            data = self._setup(data)
+            data = self._del_rx(data, col)
+            data = self.get_tokens_pro(data, "row", self.extractors)
+
+            if self.process_nearest:
+                resort_by_index = True
+                data = data.sort_values(by=[col])
+
+            self.call_status("Извлекаю кросс-семантику")
+            sets = self._cross(
+                data["tokens"].to_list(), data[col].to_list(), process_pool
+            )
+            for column, column_sets in zip(self.columns, sets):
+                data[column] = column_sets
 
             data = self._to_list(data)
             data = self._join(data)
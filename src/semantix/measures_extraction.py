@@ -1,30 +1,94 @@
 import sys
 import math
 import json
+import multiprocessing
 import regex as re
 import pandas as pd
 import numpy as np
 
 from pathlib import Path
 from typing import Callable
+from functools import partial
 
 SRC_DIR = Path(__file__).parent.parent
 PROJECT_DIR = SRC_DIR.parent
 sys.path.append(str(PROJECT_DIR))
 
-from src.semantix.common import Extractor, Measures, read_config, MeasuresGracefullExit
+from src.semantix.common import (
+    Extractor,
+    Measures,
+    read_config,
+    MeasuresGracefullExit,
+    CompiledConfig,
+)
+from src.semantix.regex_cache import RegexCache
+from src.functool.task_window import TaskWindow
+
+# measures of worker processes by config key (pool is created outside,
+# so measures are built by the first task of the config in every worker)
+_worker_measures: dict[str, Measures] = {}
+
+
+def names_regex_func(
+    measures: Measures,
+    names: list[str],
+    column: str,
+    delete_features_columns: bool,
+    concat_regex: bool,
+) -> pd.DataFrame:
+    """Return regex columns of names"""
+
+    data = pd.DataFrame({column: pd.Series(names, dtype=object)})
+    data = measures.extract_all(data, column)
+
+    measures.call_status("Объединяю регулярные выражения")
+    data = (
+        measures.concat_regex(data, delete_features_columns) if concat_regex else data
+    )
+
+    return data.drop(column, axis=1)
+
+
+def extracting_func(
+    task: tuple[int, list[str]],
+    compiled: CompiledConfig,
+    column: str,
+    delete_features_columns: bool,
+    concat_regex: bool,
+) -> tuple[int, pd.DataFrame]:
+    """Extract regex columns of a block of names in a worker process"""
+
+    start, names = task
+
+    measures = _worker_measures.get(compiled.key)
+    if measures is None:
+        measures = compiled.measures()
+        _worker_measures[compiled.key] = measures
+
+    regex = names_regex_func(
+        measures, names, column, delete_features_columns, concat_regex
+    )
+    return start, regex
 
 
 class MeasureExtractor(Extractor):
+    """
+    Extraction of regex of a measure.
+    Config can be a parsed config or CompiledConfig (measures aren't built again).
+    """
+
     def __init__(
         self,
-        config: dict,
+        config: dict | CompiledConfig,
         add_spaces: bool = True,
         status_callback: Callable = None,
         progress_callback: Callable = None,
     ) -> None:
         self._add_spaces_flag = add_spaces
-        self.enginge = Measures(config, status_callback, progress_callback)
+        if isinstance(config, CompiledConfig):
+            self.enginge = config.measures(status_callback, progress_callback)
+        else:
+            self.enginge = Measures(config, status_callback, progress_callback)
 
         self.status_callback = status_callback
         self.progress_callback = progress_callback
@@ -63,12 +127,26 @@ class MeasureExtractor(Extractor):
 
 
 class MeasuresExtractor(MeasureExtractor):
+    """
+    Extraction of regex columns of all measures.
+    Names are extracted once per unique name and regex columns are
+    broadcast back to rows (names are often repeated in semantic files).
+
+    - regex_cache - directory of RegexCache, so the next runs extract
+    only new names (cache isn't used if None)
+
+    With process pool unique names are extracted by blocks in worker processes.
+    """
+
+    BLOCK_SIZE = 2000
+
     def __init__(
         self,
-        config: dict,
+        config: dict | CompiledConfig,
         add_spaces: bool = True,
         status_callback: Callable = None,
         progress_callback: Callable = None,
+        regex_cache: str | Path = None,
     ) -> None:
         super().__init__(
             config,
@@ -77,27 +155,118 @@ class MeasuresExtractor(MeasureExtractor):
             progress_callback,
         )
 
+        self._compiled_config = None
+        if isinstance(config, CompiledConfig):
+            self._compiled_config = config
+            config = config.config
+        self.config = config
+        self.regex_cache = regex_cache
+
     def call_status(self, message: str) -> None:
         if self.status_callback is not None:
             self.status_callback(message)
 
+    def config_key(
+        self,
+        delete_features_columns: bool = False,
+        concat_regex: bool = True,
+    ) -> str:
+        """Return key of the config and options (for RegexCache)"""
+
+        return json.dumps(
+            [
+                self.config,
+                self._add_spaces_flag,
+                delete_features_columns,
+                concat_regex,
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+
+    def _compiled(self) -> CompiledConfig:
+        if self._compiled_config is None:
+            self._compiled_config = CompiledConfig(self.config)
+        return self._compiled_config
+
+    def _extract_names(
+        self,
+        names: list[str],
+        column: str,
+        delete_features_columns: bool,
+        concat_regex: bool,
+        process_pool: multiprocessing.Pool = None,
+    ) -> pd.DataFrame:
+        """
+        Return regex columns of names
+        (blocks of names are extracted by the process pool if it is passed)
+        """
+
+        if process_pool is None or len(names) <= self.BLOCK_SIZE:
+            return names_regex_func(
+                self.enginge, names, column, delete_features_columns, concat_regex
+            )
+
+        tasks = (
+            (start, names[start : start + self.BLOCK_SIZE])
+            for start in range(0, len(names), self.BLOCK_SIZE)
+        )
+        extract_func = partial(
+            extracting_func,
+            compiled=self._compiled(),
+            column=column,
+            delete_features_columns=delete_features_columns,
+            concat_regex=concat_regex,
+        )
+
+        count = 0
+        total = len(range(0, len(names), self.BLOCK_SIZE))
+        self.call_status("Извлекаю величины в процессах")
+        self.enginge.call_progress(count, total)
+
+        blocks = []
+        with TaskWindow(process_pool, extract_func, tasks) as window:
+            for _, regex in window:
+                if self._stopped:
+                    raise MeasuresGracefullExit("Measures extraction was stopped")
+
+                blocks.append(regex)
+
+                count += 1
+                self.enginge.call_progress(count, total)
+
+        return pd.concat(blocks, ignore_index=True)
+
     def extract(
         self,
         data: pd.DataFrame,
         column: str,
         delete_features_columns: bool = False,
         concat_regex: bool = True,
+        process_pool: multiprocessing.Pool = None,
     ) -> pd.DataFrame:
         data[column] = self._add_spaces(data[column])
 
-        data = self.enginge.extract_all(data, column)
+        codes, names = pd.factorize(data[column], use_na_sentinel=False)
+        names = names.tolist()
 
-        self.call_status("Объединяю регулярные выражения")
-        data = (
-            self.enginge.concat_regex(data, delete_features_columns)
-            if concat_regex
-            else data
-        )
+        def extract_names(names: list[str]) -> pd.DataFrame:
+            return self._extract_names(
+                names, column, delete_features_columns, concat_regex, process_pool
+            )
+
+        if self.regex_cache is not None:
+            cache = RegexCache(
+                self.regex_cache,
+                self.config_key(delete_features_columns, concat_regex),
+            )
+            regex = cache.regex_of(names, extract_names)
+            cache.save()
+        else:
+            regex = extract_names(names)
+
+        for regex_column in regex.columns:
+            data[regex_column] = regex[regex_column].to_numpy()[codes]
 
         data[column] = self._del_spaces(data[column])
         return data
@@ -0,0 +1,114 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Callable
+
+SRC_DIR = Path(__file__).parent.parent
+PROJECT_DIR = SRC_DIR.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.hashed_cache import HashedCache, key_hashes
+
+
+class RegexCache(HashedCache):
+    """
+    On-disk cache of SemantiX results: regex columns of names
+    (see HashedCache). Values of every name are kept as a row
+    of strings (one per column).
+
+    - directory - directory of cache files
+    - key - config key (see MeasuresExtractor.config_key)
+    """
+
+    PREFIX = "regex"
+    SEPARATOR = "\n"
+
+    def __init__(self, directory: str | Path, key: str) -> None:
+        self.columns: list[str] = []
+        self.values: list[list[str]] = []
+        super().__init__(directory, key)
+
+    def _encode(self, values: list[str]) -> np.ndarray:
+        """Every value is ended by the separator (so empty values are kept)"""
+
+        encoded = "".join(value + self.SEPARATOR for value in values)
+        return np.frombuffer(encoded.encode("utf-8"), dtype=np.uint8)
+
+    def _decode(self, data: np.ndarray) -> list[str]:
+        return data.tobytes().decode("utf-8").split(self.SEPARATOR)[:-1]
+
+    def _load_payload(self, data: np.lib.npyio.NpzFile) -> None:
+        self.columns = self._decode(data["columns"])
+        strings = self._decode(data["values"])
+
+        width = len(self.columns)
+        self.values = [
+            strings[row * width : (row + 1) * width] for row in range(len(self.keys))
+        ]
+
+    def _reset(self, columns: list[str]) -> None:
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.columns = columns
+        self.values = []
+        self._changed = True
+
+    def _add_payload(self, rows: list[list[str]], order: np.ndarray) -> None:
+        values = self.values + rows
+        self.values = [values[position] for position in order.tolist()]
+
+    def _payload(self) -> dict[str, np.ndarray]:
+        values = [value for row in self.values for value in row]
+        return {
+            "columns": self._encode(self.columns),
+            "values": self._encode(values),
+        }
+
+    def regex_of(
+        self,
+        names: list[str],
+        extract: Callable[[list[str]], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Return regex columns of every name: cached names are taken
+        from the cache, other names are extracted by extract and cached.
+        """
+
+        keys = key_hashes([str(name) for name in names])
+        positions, found = self._find(keys)
+        missing = np.flatnonzero(~found)
+
+        extracted = None
+        if len(missing) or not self.columns:
+            extracted = extract([names[index] for index in missing.tolist()])
+            columns = [str(column) for column in extracted.columns]
+            if columns != self.columns:
+                # cached values have other columns, so they are dropped
+                self._reset(columns)
+                if found.any():
+                    return self.regex_of(names, extract)
+
+        rows = [None] * len(names)
+        for index in np.flatnonzero(found).tolist():
+            rows[index] = self.values[positions[index]]
+
+        if len(missing):
+            extracted_rows = extracted.values.tolist()
+            for index, row in zip(missing.tolist(), extracted_rows):
+                rows[index] = row
+
+            # only strings without line breaks can be saved
+            cached = [
+                position
+                for position, row in enumerate(extracted_rows)
+                if all(
+                    isinstance(value, str) and self.SEPARATOR not in value
+                    for value in row
+                )
+            ]
+            self._add(
+                keys[missing[cached]], [extracted_rows[index] for index in cached]
+            )
+
+        return pd.DataFrame(rows, columns=self.columns, dtype=object)
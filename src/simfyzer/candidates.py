@@ -0,0 +1,240 @@
+import sys
+import numpy as np
+from pathlib import Path
+from typing import Callable
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.simfyzer.vocabulary import TokenArrays
+
+
+class CandidateMode(object):
+    """Candidates generation mode of SimFyzer.match
+
+    Mode can be:
+        - postings : CandidateIndex, sum of rates of common tokens
+        - minhash : MinHashIndex, estimated jaccard similarity of tokens sets
+
+    Default mode:
+        - postings
+    """
+
+    POSTINGS = "postings"
+    MINHASH = "minhash"
+    modes = {POSTINGS, MINHASH}
+
+    default = POSTINGS
+
+    @classmethod
+    def checkout(cls, mode: str) -> str:
+        """
+        Check mode and return standardized value\n
+        If the input mode have wrong value -> return default mode
+        """
+
+        mode = str(mode).lower()
+        if mode not in cls.modes:
+            mode = cls.default
+        return mode
+
+
+def top_candidates(
+    client_rows: np.ndarray,
+    source_rows: np.ndarray,
+    scores: np.ndarray,
+    top_k: int,
+) -> tuple[np.ndarray]:
+    """
+    Keep top_k pairs of every client row sorted by client row and score
+    (source rows order if scores are equal).
+    """
+
+    order = np.lexsort((source_rows, -scores, client_rows))
+    client_rows = client_rows[order]
+    first = np.searchsorted(client_rows, client_rows, side="left")
+    top = np.arange(len(order)) - first < top_k
+
+    order = order[top]
+    return client_rows[top], source_rows[order], scores[order]
+
+
+class CandidateIndex(object):
+    """
+    Inverted index of source rows for unpaired matching (blocking).
+    Postings of every token id are source rows with this token
+    (rows of token id i are rows[offsets[i] : offsets[i + 1]]).
+
+    Candidate score of a source row is the sum of rates of the client
+    tokens it contains (rate is ratio * custom weight of client token),
+    only top_k candidates of every client row are kept.
+
+    - max_tokens - only max_tokens tokens of client row with the highest rates
+    generate candidates (None - all tokens)
+    - max_postings - tokens with more source rows are too common
+    to generate candidates, except the highest rate token of a row (None - no limit)
+    - chunk_postings - max count of postings expanded at once
+    """
+
+    # chunk scores are counted in dense matrix if it's not larger
+    # than dense_ratio * count of postings
+    dense_ratio = 2
+
+    def __init__(
+        self,
+        source_tokens: TokenArrays,
+        ratio_by_id: np.ndarray,
+        max_tokens: int = None,
+        max_postings: int = None,
+        chunk_postings: int = 2**22,
+    ) -> None:
+        self.ratio_by_id = ratio_by_id
+        self.max_tokens = max_tokens
+        self.max_postings = max_postings
+        self.chunk_postings = chunk_postings
+
+        source_tokens = source_tokens.unique()
+        self.source_count = len(source_tokens)
+
+        order = np.argsort(source_tokens.ids, kind="stable")
+        self.rows = source_tokens.rows_index()[order]
+        counts = np.bincount(source_tokens.ids, minlength=len(ratio_by_id))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _postings(self, ids: np.ndarray) -> np.ndarray:
+        """Return count of postings of every token id"""
+
+        return self.offsets[ids + 1] - self.offsets[ids]
+
+    def _positions(self, tokens: TokenArrays) -> np.ndarray:
+        """Return position of every token inside its row"""
+
+        return np.arange(len(tokens.ids)) - np.repeat(
+            tokens.offsets[:-1], tokens.counts()
+        )
+
+    def _query_tokens(self, client_tokens: TokenArrays) -> TokenArrays:
+        """
+        Client tokens that generate candidates (by rate, the highest first):
+        weights of returned arrays are rates.
+        """
+
+        client_tokens = client_tokens.unique()
+        rows = client_tokens.rows_index()
+        rates = self.ratio_by_id[client_tokens.ids] * client_tokens.weights
+        keep = (rates > 0) & (self._postings(client_tokens.ids) > 0)
+
+        order = np.lexsort((-rates, rows))
+        query = TokenArrays(
+            client_tokens.offsets,
+            client_tokens.ids[order],
+            rates[order],
+        ).mask(keep[order])
+
+        # the highest rate token of a row is kept even if it's too common
+        if self.max_postings is not None:
+            common = self._postings(query.ids) > self.max_postings
+            query = query.mask(~common | (self._positions(query) == 0))
+
+        if self.max_tokens is not None:
+            query = query.mask(self._positions(query) < self.max_tokens)
+        return query
+
+    def _dense_scores(self, query: TokenArrays) -> tuple[np.ndarray]:
+        """Chunk scores in dense matrix: only pairs not lower than k-th score are kept"""
+
+        scores = np.zeros((len(query), self.source_count), dtype=np.float64)
+        rows = query.rows_index().tolist()
+        for row, token_id, rate in zip(
+            rows, query.ids.tolist(), query.weights.tolist()
+        ):
+            # tokens of source row are unique, so postings don't repeat
+            scores[
+                row, self.rows[self.offsets[token_id] : self.offsets[token_id + 1]]
+            ] += rate
+        return scores
+
+    def _chunk_candidates(
+        self,
+        query: TokenArrays,
+        top_k: int,
+    ) -> tuple[np.ndarray]:
+        starts = self.offsets[query.ids]
+        lengths = self._postings(query.ids)
+
+        cells = len(query) * self.source_count
+        if cells <= self.dense_ratio * lengths.sum():
+            scores = self._dense_scores(query)
+            k = min(top_k, self.source_count)
+            kth = np.partition(scores, self.source_count - k, axis=1)[:, -k]
+            client_rows, source_rows = np.nonzero(
+                (scores >= kth[:, np.newaxis]) & (scores > 0)
+            )
+            scores = scores[client_rows, source_rows]
+            return top_candidates(client_rows, source_rows, scores, top_k)
+
+        positions = np.arange(lengths.sum()) + np.repeat(
+            starts - np.cumsum(lengths) + lengths, lengths
+        )
+        pair_keys = np.repeat(query.rows_index(), lengths) * self.source_count
+        pair_keys += self.rows[positions]
+
+        keys, inverse = np.unique(pair_keys, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.repeat(query.weights, lengths))
+        client_rows, source_rows = np.divmod(keys, self.source_count)
+        return top_candidates(client_rows, source_rows, scores, top_k)
+
+    def candidates(
+        self,
+        client_tokens: TokenArrays,
+        top_k: int,
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Return top_k candidates of every client row:
+        (client row, source row, candidate score) sorted by client row and score.
+        Client rows without common tokens have no candidates.
+        """
+
+        query = self._query_tokens(client_tokens)
+        lengths = self._postings(query.ids)
+        rows_postings = np.bincount(
+            query.rows_index(), weights=lengths, minlength=len(query)
+        )
+
+        bounds = [0]
+        total = 0
+        for index, postings in enumerate(rows_postings.tolist()):
+            if total and total + postings > self.chunk_postings:
+                bounds.append(index)
+                total = 0
+            total += postings
+        bounds.append(len(query))
+
+        client_rows, source_rows, scores = [], [], []
+        for count, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if stop_callback is not None and stop_callback():
+                break
+
+            chunk_rows, chunk_sources, chunk_scores = self._chunk_candidates(
+                query.rows(start, stop), top_k
+            )
+            client_rows.append(chunk_rows + start)
+            source_rows.append(chunk_sources)
+            scores.append(chunk_scores)
+
+            if progress_callback is not None:
+                progress_callback(count + 1, len(bounds) - 1)
+
+        if not client_rows:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+        return (
+            np.concatenate(client_rows),
+            np.concatenate(source_rows),
+            np.concatenate(scores),
+        )
@@ -0,0 +1,195 @@
+import sys
+import numpy as np
+from pathlib import Path
+from typing import Callable
+from rapidfuzz import process
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.simfyzer.fuzzy_scorer import BatchScorer, FuzzyScorer
+from src.functool.bk_tree import BKTree, EditMetric
+
+
+class VocabularyCanonicalizer(object):
+    """
+    Clusters near-duplicate tokens of the whole vocabulary once.
+
+    Similar pairs (score >= threshold) are found by blocks of
+    rapidfuzz.process.cdist over the vocabulary sorted by length
+    (only longer strings are scored, scorers are symmetric).
+    With use_index ratio scorer finds pairs by BKTree (indel metric) instead:
+    every string is a separate query, and only words inside its indel
+    radius are scored (used by global mode of FuzzySearch).
+    Tokens are taken from the most frequent one: token becomes representative
+    of a new cluster if no representative is similar enough, otherwise
+    it's rewritten to the most similar representative.
+
+    - block_cells - max size of one scores matrix
+    - use_index - find similar pairs of ratio scorer by BKTree
+    """
+
+    def __init__(
+        self,
+        scorer: BatchScorer,
+        threshold: float,
+        block_cells: int = 2**21,
+        use_index: bool = False,
+    ) -> None:
+        self.scorer = scorer
+        self.threshold = threshold
+        self.block_cells = block_cells
+        self.use_index = use_index
+
+    def _use_index(self) -> bool:
+        return self.use_index and self.scorer.scorer == FuzzyScorer.RATIO
+
+    def _index_neighbours(
+        self,
+        strings: list[str],
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        tree = BKTree(strings, metric=EditMetric.INDEL)
+        step = max(1, len(strings) // 100)
+
+        left, right, scores = [], [], []
+        for index, string in enumerate(strings):
+            if index % step == 0:
+                if stop_callback is not None and stop_callback():
+                    break
+                if progress_callback is not None:
+                    progress_callback(index, len(strings))
+
+            max_distance = EditMetric.max_distance(
+                EditMetric.INDEL, len(string), self.threshold
+            )
+            candidates = [
+                word_id
+                for _, _, word_id in tree.within(string, max_distance)
+                if word_id != index
+            ]
+            if not candidates:
+                continue
+
+            candidates_scores = process.cdist(
+                [string],
+                [strings[word_id] for word_id in candidates],
+                scorer=self.scorer.scorer_func,
+                dtype=np.float64,
+            )[0]
+            similar = candidates_scores >= self.threshold
+
+            left.append(np.full(similar.sum(), index, dtype=np.int64))
+            right.append(np.array(candidates, dtype=np.int64)[similar])
+            scores.append(candidates_scores[similar])
+
+        if progress_callback is not None:
+            progress_callback(len(strings), len(strings))
+
+        if not left:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+        return np.concatenate(left), np.concatenate(right), np.concatenate(scores)
+
+    def neighbours(
+        self,
+        strings: list[str],
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Return similar pairs of strings: (left index, right index, score).
+        Every pair is returned in both directions.
+        """
+
+        if self._use_index():
+            return self._index_neighbours(strings, progress_callback, stop_callback)
+
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        order = np.argsort(lengths, kind="stable")
+        lengths = lengths[order]
+        sorted_strings = [strings[index] for index in order.tolist()]
+
+        block_size = max(1, self.block_cells // max(len(strings), 1))
+        starts = range(0, len(strings), block_size)
+
+        left, right, scores = [], [], []
+        for count, start in enumerate(starts):
+            if stop_callback is not None and stop_callback():
+                break
+
+            stop = min(start + block_size, len(strings))
+            _, high = self.scorer.length_bounds(
+                int(lengths[start]), int(lengths[stop - 1]), self.threshold
+            )
+            last = np.searchsorted(lengths, high, side="right")
+
+            matrix = process.cdist(
+                sorted_strings[start:stop],
+                sorted_strings[start:last],
+                scorer=self.scorer.scorer_func,
+                score_cutoff=self.threshold,
+                dtype=np.float64,
+                workers=-1,
+            )
+            rows, columns = np.nonzero(matrix >= self.threshold)
+            upper = columns > rows
+            rows, columns = rows[upper], columns[upper]
+
+            left.append(order[rows + start])
+            right.append(order[columns + start])
+            scores.append(matrix[rows, columns])
+
+            if progress_callback is not None:
+                progress_callback(count + 1, len(starts))
+
+        if not left:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+
+        left, right = np.concatenate(left), np.concatenate(right)
+        scores = np.concatenate(scores)
+        return (
+            np.concatenate([left, right]),
+            np.concatenate([right, left]),
+            np.concatenate([scores, scores]),
+        )
+
+    def clusters(
+        self,
+        strings: list[str],
+        counts: np.ndarray,
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> np.ndarray:
+        """Return index of cluster representative for every string"""
+
+        left, right, scores = self.neighbours(
+            strings,
+            progress_callback,
+            stop_callback,
+        )
+
+        # rank 0 is the most frequent string (first one if counts are equal)
+        rank = np.empty(len(strings), dtype=np.int64)
+        rank[np.argsort(-np.asarray(counts), kind="stable")] = np.arange(len(strings))
+
+        # candidates of every string: more frequent neighbours by best score
+        earlier = rank[right] < rank[left]
+        left, right, scores = left[earlier], right[earlier], scores[earlier]
+        order = np.lexsort((rank[right], -scores, rank[left]))
+        left, right = left[order].tolist(), right[order].tolist()
+
+        representative = np.arange(len(strings))
+        candidates = {}
+        for string, candidate in zip(left, right):
+            candidates.setdefault(string, []).append(candidate)
+
+        for string in np.argsort(rank).tolist():
+            for candidate in candidates.get(string, ()):
+                if representative[candidate] == candidate:
+                    representative[string] = candidate
+                    break
+
+        return representative
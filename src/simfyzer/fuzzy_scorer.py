@@ -0,0 +1,304 @@
+import sys
+import numpy as np
+from math import ceil, floor
+from typing import Callable
+from fuzzywuzzy import fuzz as fuzzy_fuzz
+from fuzzywuzzy import utils as fuzzy_utils
+from rapidfuzz import fuzz, process, utils
+from rapidfuzz.distance import Indel
+
+
+class FuzzyScorer(object):
+    """Fuzzy Scorer of FuzzySearch
+
+    Scorer can be:
+        - wratio : same scores as fuzzywuzzy.process.extractOne
+        (weighted ratio, non ascii symbols are ignored)
+        - ratio : rapidfuzz.fuzz.ratio
+        - partial_ratio : rapidfuzz.fuzz.partial_ratio
+        - token_sort_ratio : rapidfuzz.fuzz.token_sort_ratio
+
+    Default scorer:
+        - wratio
+    """
+
+    WRATIO = "wratio"
+    RATIO = "ratio"
+    PARTIAL_RATIO = "partial_ratio"
+    TOKEN_SORT_RATIO = "token_sort_ratio"
+    modes = {WRATIO, RATIO, PARTIAL_RATIO, TOKEN_SORT_RATIO}
+
+    default = WRATIO
+
+    @classmethod
+    def checkout(cls, mode: str) -> str:
+        """
+        Check scorer and return standardized value\n
+        If the input scorer have wrong value -> return default scorer
+        """
+
+        mode = str(mode).lower()
+        if mode not in cls.modes:
+            mode = cls.default
+        return mode
+
+
+class ScoringPairs(object):
+    """
+    All queries x choices pairs of several rows in one flat layout.
+    Pairs are ordered by row, query and choice,
+    so choices of every query are one segment.
+    Queries of rows without choices are not scored.
+
+    - queries, choices - flat lists of strings of all rows
+    - query, choice - indexes of query and choice for every pair
+    - scored - indexes of scored queries (one segment for every query)
+    - starts, lengths, segment - segments of pairs
+    """
+
+    def __init__(
+        self,
+        queries: list[str],
+        queries_counts: np.ndarray,
+        choices: list[str],
+        choices_counts: np.ndarray,
+    ) -> None:
+        self.queries = queries
+        self.choices = choices
+
+        self.queries_offsets = np.concatenate([[0], np.cumsum(queries_counts)])
+        self.choices_offsets = np.concatenate([[0], np.cumsum(choices_counts)])
+        self.choices_counts = np.asarray(choices_counts)
+
+        query_rows = np.repeat(np.arange(len(queries_counts)), queries_counts)
+        self.scored = np.flatnonzero(self.choices_counts[query_rows] > 0)
+        scored_rows = query_rows[self.scored]
+
+        self.lengths = self.choices_counts[scored_rows]
+        self.starts = np.cumsum(self.lengths) - self.lengths
+        self.segment = np.repeat(np.arange(len(self.scored)), self.lengths)
+
+        self.query = self.scored[self.segment]
+        self.choice = np.arange(len(self.query)) - self.starts[self.segment]
+        self.choice += self.choices_offsets[scored_rows][self.segment]
+
+    def __len__(self) -> int:
+        return len(self.query)
+
+    def rows(self) -> list[tuple[list[str]]]:
+        """Return queries and choices of scored rows"""
+
+        rows = []
+        for index in np.flatnonzero(self.choices_counts > 0).tolist():
+            queries_slice = slice(*self.queries_offsets[index : index + 2])
+            choices_slice = slice(*self.choices_offsets[index : index + 2])
+            rows.append((self.queries[queries_slice], self.choices[choices_slice]))
+        return rows
+
+    def codes(self, values: list[str]) -> tuple[list[str], np.ndarray]:
+        """Return unique values and code of every value"""
+
+        codes = {}
+        values_codes = [codes.setdefault(value, len(codes)) for value in values]
+        return list(codes), np.array(values_codes, dtype=np.int64)
+
+    def segments_max(self, values: np.ndarray) -> np.ndarray:
+        return np.maximum.reduceat(values, self.starts)
+
+    def segments_first_max(self, values: np.ndarray) -> tuple[np.ndarray]:
+        """Return max value of every segment and pair index of its first position"""
+
+        best = self.segments_max(values)
+        hits = np.flatnonzero(values == best[self.segment])
+        _, first = np.unique(self.segment[hits], return_index=True)
+        return best, hits[first]
+
+
+class BatchScorer(object):
+    """
+    Scores all queries x choices pairs of several rows in one batch
+    and finds best matches for all rows at once.
+    Usually batch is one rapidfuzz.process.cdist call for unique queries
+    and choices, if this matrix is too large -> one call for every row.
+    Strings should be processed with BatchScorer.process before scoring.
+    """
+
+    scorers = {
+        FuzzyScorer.WRATIO: fuzz.WRatio,
+        FuzzyScorer.RATIO: fuzz.ratio,
+        FuzzyScorer.PARTIAL_RATIO: fuzz.partial_ratio,
+        FuzzyScorer.TOKEN_SORT_RATIO: fuzz.token_sort_ratio,
+    }
+
+    # max size of unique matrix per one scored pair
+    matrix_ratio = 16
+
+    def __init__(self, scorer: str = FuzzyScorer.RATIO) -> None:
+        self.scorer = scorer
+
+    def process(self, value: str) -> str:
+        return utils.default_process(value)
+
+    @property
+    def scorer_func(self) -> Callable:
+        """rapidfuzz scorer (used for scores matrices)"""
+
+        return self.scorers[self.scorer]
+
+    def length_bounds(self, low: int, high: int, threshold: float) -> tuple[int]:
+        """
+        Return range of lengths of strings that can have score >= threshold
+        with strings of lengths from low to high.
+        """
+
+        if self.scorer != FuzzyScorer.RATIO or threshold <= 0:
+            return 0, sys.maxsize
+
+        # ratio <= 200 * min_length / (length1 + length2)
+        return (
+            floor(low * threshold / (200 - threshold)),
+            ceil(high * (200 - threshold) / threshold),
+        )
+
+    def _cdist(self, pairs: ScoringPairs, **kwargs) -> np.ndarray:
+        queries, queries_codes = pairs.codes(pairs.queries)
+        choices, choices_codes = pairs.codes(pairs.choices)
+
+        if len(queries) * len(choices) <= self.matrix_ratio * len(pairs):
+            matrix = process.cdist(queries, choices, **kwargs)
+            return matrix[queries_codes[pairs.query], choices_codes[pairs.choice]]
+
+        return np.concatenate(
+            [process.cdist(q, c, **kwargs).ravel() for q, c in pairs.rows()]
+        )
+
+    def scores(self, pairs: ScoringPairs, threshold: float) -> np.ndarray:
+        """Return scores of pairs (scores lower than threshold may be any lower value)"""
+
+        return self._cdist(
+            pairs,
+            scorer=self.scorer_func,
+            score_cutoff=threshold,
+            dtype=np.float64,
+        )
+
+    def best_scores(
+        self,
+        queries: list[str],
+        queries_counts: np.ndarray,
+        choices: list[str],
+        choices_counts: np.ndarray,
+        threshold: float,
+    ) -> tuple[np.ndarray]:
+        """
+        Same as best_matches, but also return score of best choice
+        for every query (-1 if index is -1).
+        Best choice doesn't depend on threshold, so matches for any higher
+        threshold are the matches with score >= that threshold.
+        """
+
+        matches = np.full(len(queries), -1, dtype=np.int64)
+        scores = np.full(len(queries), -1, dtype=np.float64)
+
+        pairs = ScoringPairs(queries, queries_counts, choices, choices_counts)
+        if len(pairs) == 0:
+            return matches, scores
+
+        best_score, best_pair = pairs.segments_first_max(self.scores(pairs, threshold))
+        passed = best_score >= threshold
+        matches[pairs.scored[passed]] = pairs.choice[best_pair[passed]]
+        scores[pairs.scored[passed]] = best_score[passed]
+        return matches, scores
+
+    def best_matches(
+        self,
+        queries: list[str],
+        queries_counts: np.ndarray,
+        choices: list[str],
+        choices_counts: np.ndarray,
+        threshold: float,
+    ) -> np.ndarray:
+        """
+        Queries and choices are flat lists of strings of several rows.
+        Return index of best choice of the same row for every query
+        (first one if scores are equal).
+        If score of best choice is lower than threshold -> index is -1
+        """
+
+        matches, _ = self.best_scores(
+            queries,
+            queries_counts,
+            choices,
+            choices_counts,
+            threshold,
+        )
+        return matches
+
+
+class WRatioScorer(BatchScorer):
+    """
+    Batch version of fuzzywuzzy.process.extractOne with default WRatio scorer.
+
+    Indel distance is counted for all pairs with cdist and base ratio is
+    the final score for similar length single words. Other pairs have an
+    upper bound by longest common subsequence and only pairs that can still
+    be the best match are rescored by fuzzywuzzy.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(FuzzyScorer.WRATIO)
+
+    def process(self, value: str) -> str:
+        return fuzzy_utils.full_process(value, force_ascii=True)
+
+    def _lengths(self, values: list[str]) -> tuple[np.ndarray]:
+        count = len(values)
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=count)
+        spaces = np.fromiter((" " in v for v in values), dtype=bool, count=count)
+        return lengths, spaces
+
+    def scores(self, pairs: ScoringPairs, threshold: float) -> np.ndarray:
+        query_lengths, query_spaces = self._lengths(pairs.queries)
+        choice_lengths, choice_spaces = self._lengths(pairs.choices)
+        query_lengths = query_lengths[pairs.query]
+        choice_lengths = choice_lengths[pairs.choice]
+
+        total = query_lengths + choice_lengths
+        shorter = np.minimum(query_lengths, choice_lengths)
+        empty = shorter == 0
+        shorter = np.maximum(shorter, 1)
+
+        # same as fuzzywuzzy ratio: 100 * Indel.normalized_similarity
+        distance = self._cdist(pairs, scorer=Indel.distance, dtype=np.int64)
+        similarity = 1.0 - distance / np.maximum(total, 1)
+        base = np.where(empty, 0, np.round(100 * similarity))
+
+        len_ratio = (total - shorter) / shorter
+        several_words = query_spaces[pairs.query] | choice_spaces[pairs.choice]
+        exact = ~((len_ratio >= 1.5) | several_words) | empty
+
+        # partial ratio <= 2 * lcs / (len(shorter) + lcs) for any substring
+        lcs = (total - distance) / 2
+        partial = np.minimum(np.floor(200 * lcs / (shorter + lcs)) + 1, 100)
+        partial_scale = np.where(len_ratio > 8, 0.6, 0.9)
+        upper = np.maximum(base, np.ceil(partial * partial_scale))
+        upper[several_words] = 100
+
+        best_lower = pairs.segments_max(base)[pairs.segment]
+        rescore = ~exact & (upper >= np.maximum(best_lower, threshold))
+
+        scores = np.where(exact | rescore, base, -1)
+        for index in np.flatnonzero(rescore).tolist():
+            scores[index] = fuzzy_fuzz.WRatio(
+                pairs.queries[pairs.query[index]],
+                pairs.choices[pairs.choice[index]],
+                full_process=False,
+            )
+        return scores
+
+
+def setup_scorer(scorer: str) -> BatchScorer:
+    scorer = FuzzyScorer.checkout(scorer)
+    if scorer == FuzzyScorer.WRATIO:
+        return WRatioScorer()
+    return BatchScorer(scorer)
@@ -1,52 +1,255 @@
 import sys
 import multiprocessing
+import numpy as np
 import pandas as pd
+from math import ceil
 from typing import Callable
 from pathlib import Path
 from tqdm import tqdm
 from functools import partial
-from fuzzywuzzy import process as fuzz_process
 
 tqdm.pandas()
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(PROJECT_DIR))
 
-from src.simfyzer.tokenization import Token, TokenTransformer
+from src.simfyzer.tokenization import TokenTransformer
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.fuzzy_scorer import BatchScorer, FuzzyScorer, setup_scorer
+from src.simfyzer.canonicalization import VocabularyCanonicalizer
+from src.functool.shared_arrays import SharedArrays
+from src.functool.task_window import TaskWindow
 
 
 class FyzzySearchGracefullExit(Exception):
     pass
 
 
-def searching_func(
-    row: list[Token],
+class FuzzyMode(object):
+    """Fuzzy Search Mode
+
+    Mode can be:
+        - pairwise : tokens of every row are matched with tokens of the same row
+        - global : near-duplicate tokens of all rows are clustered once
+        and every token is rewritten to its cluster representative
+        (tokens are compared by ratio scorer, whatever the scorer is)
+
+    Default mode:
+        - pairwise
+    """
+
+    PAIRWISE = "pairwise"
+    GLOBAL = "global"
+    modes = {PAIRWISE, GLOBAL}
+
+    default = PAIRWISE
+
+    @classmethod
+    def checkout(cls, mode: str) -> str:
+        """
+        Check search mode and return standardized value\n
+        If the input mode have wrong value -> return default mode
+        """
+
+        mode = str(mode).lower()
+        if mode not in cls.modes:
+            mode = cls.default
+        return mode
+
+
+def matching_arrays_func(
+    block: tuple[TokenArrays, list[str], TokenArrays, list[str]],
+    fuzzy_threshold: int,
+    scorer: BatchScorer,
+) -> tuple[np.ndarray]:
+    """
+    Find matches of searching_arrays_func: position of matched right token
+    for every left token (-1 if not matched) and score of the match
+    (100 for exact matches, -1 if not matched).
+    Without scorer only exact matches are found (strings aren't used).
+    """
+
+    left_tokens, left_strings, right_tokens, right_strings = block
+
+    left_rows = left_tokens.rows_index()
+    right_rows = right_tokens.rows_index()
+    width = int(max(left_tokens.ids.max(initial=0), right_tokens.ids.max(initial=0)))
+    left_keys = left_rows * (width + 1) + left_tokens.ids
+    right_keys = right_rows * (width + 1) + right_tokens.ids
+
+    # first position of every right token in its row
+    order = np.argsort(right_keys, kind="stable")
+    keys, first = np.unique(right_keys[order], return_index=True)
+    positions = order[first]
+
+    def find(values: np.ndarray) -> tuple[np.ndarray]:
+        if len(keys) == 0:
+            return np.zeros(len(values), dtype=bool), np.full(len(values), -1)
+        index = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+        return keys[index] == values, positions[index]
+
+    exact, exact_positions = find(left_keys)
+    matches = np.where(exact, exact_positions, -1)
+    scores = np.where(exact, 100.0, -1.0)
+
+    if scorer is not None:
+        fuzzy_index = np.flatnonzero(~exact)
+        fuzzy_matches, fuzzy_scores = scorer.best_scores(
+            [left_strings[index] for index in fuzzy_index.tolist()],
+            np.bincount(left_rows[fuzzy_index], minlength=len(left_tokens)),
+            right_strings,
+            right_tokens.counts(),
+            fuzzy_threshold,
+        )
+
+        # like extractOne returns value: take its first position
+        passed = fuzzy_matches >= 0
+        _, fuzzy_positions = find(right_keys[fuzzy_matches[passed]])
+        matches[fuzzy_index[passed]] = fuzzy_positions
+        scores[fuzzy_index[passed]] = fuzzy_scores[passed]
+
+    return matches, scores
+
+
+def weighting_arrays_func(
+    left_tokens: TokenArrays,
+    right_tokens: TokenArrays,
+    matches: np.ndarray,
+    transformer: TokenTransformer,
+) -> tuple[np.ndarray]:
+    """Return new weights of left and right tokens by matches (in left order)"""
+
+    left_weights = left_tokens.weights.tolist()
+    right_weights = right_tokens.weights.tolist()
+    for left_index in np.flatnonzero(matches >= 0).tolist():
+        right_index = matches[left_index]
+        weight = transformer.common_weight(
+            right_weights[right_index],
+            left_weights[left_index],
+        )
+        right_weights[right_index] = weight
+        left_weights[left_index] = weight
+
+    return np.array(left_weights), np.array(right_weights)
+
+
+def searching_arrays_func(
+    block: tuple[TokenArrays, list[str], TokenArrays, list[str]],
     transformer: TokenTransformer,
     fuzzy_threshold: int,
-) -> tuple[list[Token]]:
-    left_tokens: list[Token] = row[0]
-    right_tokens: list[Token] = row[1]
-    right_tokens_values = [token.value for token in right_tokens]
+    scorer: BatchScorer,
+) -> tuple[np.ndarray]:
+    """
+    Match tokens of a block of rows: block is left and right TokenArrays
+    with processed strings of their tokens. Every left token is matched
+    with right tokens of its row: exact matches first, other tokens by
+    the best fuzzy score not less than fuzzy_threshold (all rows are
+    scored by one batch). Weights of matched tokens are changed by transformer.
+    Returns position of matched right token for every left token (-1 if
+    not matched) and new weights of left and right tokens.
+    Without scorer only exact matches are found (strings aren't used).
+    """
 
-    for left_token in left_tokens:
-        if left_token in right_tokens:
-            index = right_tokens.index(left_token.value)
-            right_token = right_tokens[index]
+    left_tokens, _, right_tokens, _ = block
+    matches, _ = matching_arrays_func(block, fuzzy_threshold, scorer)
+    left_weights, right_weights = weighting_arrays_func(
+        left_tokens,
+        right_tokens,
+        matches,
+        transformer,
+    )
+    return matches, left_weights, right_weights
 
-            transformer.transform(right_token, left_token, False)
 
-        else:
-            token_value, score = fuzz_process.extractOne(
-                left_token.value,
-                right_tokens_values,
-            )
-            if score >= fuzzy_threshold:
-                index = right_tokens.index(token_value)
-                right_token = right_tokens[index]
+def block_changes(
+    block: tuple[TokenArrays, list[str], TokenArrays, list[str]],
+    result: tuple[np.ndarray],
+) -> tuple[np.ndarray]:
+    """
+    Return only changes of searching_arrays_func result (positions inside block):
+    changed left ids, changed left weights and changed right weights.
+    """
+
+    left_tokens, _, right_tokens, _ = block
+    matches, left_weights, right_weights = result
+
+    matched = np.flatnonzero(matches >= 0)
+    matched_ids = right_tokens.ids[matches[matched]]
+    changed = matched_ids != left_tokens.ids[matched]
+    left_changed = np.flatnonzero(left_weights != left_tokens.weights)
+    right_changed = np.flatnonzero(right_weights != right_tokens.weights)
+
+    return (
+        matched[changed],
+        matched_ids[changed],
+        left_changed,
+        left_weights[left_changed],
+        right_changed,
+        right_weights[right_changed],
+    )
+
+
+def encode_strings(strings: list[str]) -> tuple[np.ndarray]:
+    """Return code points of all strings and their offsets"""
 
-                transformer.transform(right_token, left_token, True)
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    codes = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+    return codes, np.concatenate([[0], np.cumsum(lengths)])
 
-    return left_tokens, right_tokens
+
+def decode_strings(
+    codes: np.ndarray, offsets: np.ndarray, ids: np.ndarray
+) -> list[str]:
+    return [
+        codes[offsets[i] : offsets[i + 1]].tobytes().decode("utf-32-le")
+        for i in ids.tolist()
+    ]
+
+
+def shared_block(
+    descriptor: tuple,
+    start: int,
+    stop: int,
+) -> tuple[TokenArrays, list[str], TokenArrays, list[str]]:
+    """Return copy of rows from start to stop of shared tokens and strings"""
+
+    arrays = SharedArrays.attach(descriptor)
+
+    left_tokens = TokenArrays(
+        arrays["left_offsets"], arrays["left_ids"], arrays["left_weights"]
+    ).rows(start, stop)
+    right_tokens = TokenArrays(
+        arrays["right_offsets"], arrays["right_ids"], arrays["right_weights"]
+    ).rows(start, stop)
+
+    codes, offsets = arrays["codes"], arrays["codes_offsets"]
+    return (
+        left_tokens.copy(),
+        decode_strings(codes, offsets, left_tokens.ids),
+        right_tokens.copy(),
+        decode_strings(codes, offsets, right_tokens.ids),
+    )
+
+
+def searching_shared_func(
+    task: tuple[tuple, int, int],
+    transformer: TokenTransformer,
+    fuzzy_threshold: int,
+    scorer: BatchScorer,
+) -> tuple[int, int, tuple[np.ndarray]]:
+    """
+    Process pool worker of FuzzySearch.search_arrays.
+    Task is (shared arrays descriptor, start row, stop row): rows are copied
+    from shared memory and the block is detached at once, so workers don't
+    keep the block mapped after the search. Only changes of the rows are returned.
+    """
+
+    descriptor, start, stop = task
+    block = shared_block(descriptor, start, stop)
+    SharedArrays.detach()
+
+    result = searching_arrays_func(block, transformer, fuzzy_threshold, scorer)
+    return start, stop, block_changes(block, result)
 
 
 class FuzzySearch(object):
@@ -54,11 +257,15 @@ class FuzzySearch(object):
         self,
         fuzzy_threshold: int,
         transformer: TokenTransformer,
+        scorer: str = FuzzyScorer.default,
+        mode: str = FuzzyMode.default,
     ) -> None:
         if fuzzy_threshold > 1 or fuzzy_threshold < 0:
             raise ValueError("Fuzzy threshold should be in range 0 to 1")
         self.fuzzy_threshold = fuzzy_threshold * 100
         self.transformer = transformer
+        self.scorer = setup_scorer(scorer)
+        self.mode = FuzzyMode.checkout(mode)
 
         self._process_pool = None
         self._stopped = False
@@ -72,48 +279,393 @@ class FuzzySearch(object):
         if self.progress_callback is not None:
             self.progress_callback(count, total)
 
-    def search(
+    def _rows_block(
+        self,
+        strings: list[str],
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        start: int,
+        stop: int,
+    ) -> tuple[TokenArrays, list[str], TokenArrays, list[str]]:
+        left_tokens = left_tokens.rows(start, stop)
+        right_tokens = right_tokens.rows(start, stop)
+        return (
+            left_tokens,
+            [strings[token_id] for token_id in left_tokens.ids.tolist()],
+            right_tokens,
+            [strings[token_id] for token_id in right_tokens.ids.tolist()],
+        )
+
+    def _search_block(
         self,
-        data: pd.DataFrame,
-        left_tokens_column: str,
-        right_tokens_column: str,
+        strings: list[str],
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        start: int,
+        stop: int,
+    ) -> tuple[int, int, tuple[np.ndarray]]:
+        block = self._rows_block(strings, left_tokens, right_tokens, start, stop)
+        result = searching_arrays_func(
+            block,
+            self.transformer,
+            self.fuzzy_threshold,
+            self.scorer,
+        )
+        return start, stop, block_changes(block, result)
+
+    def _share(
+        self,
+        strings: list[str],
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> SharedArrays:
+        """Publish tokens and processed strings once for all pool workers"""
+
+        codes, codes_offsets = encode_strings(strings)
+        return SharedArrays(
+            {
+                "left_offsets": left_tokens.offsets,
+                "left_ids": left_tokens.ids,
+                "left_weights": left_tokens.weights,
+                "right_offsets": right_tokens.offsets,
+                "right_ids": right_tokens.ids,
+                "right_weights": right_tokens.weights,
+                "codes": codes,
+                "codes_offsets": codes_offsets,
+            }
+        )
+
+    def search_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
         process_pool: multiprocessing.Pool = None,
         progress_callback: Callable = None,
-    ) -> pd.DataFrame:
+        rows: np.ndarray = None,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """
+        Fuzzy matching of left and right tokens of every row.
+        Matched left tokens get ids of right tokens, weights of matched
+        tokens are changed by transformer. Returns new left and right tokens.
+        Rows are processed by blocks (100 rows in the process pool,
+        500 in this process), progress is called after every block.
+
+        - rows - indices of rows for fuzzy matching, other rows get
+        only exact matches (all rows if None, pairwise mode only)
+        """
+
+        if self.mode == FuzzyMode.GLOBAL:
+            return self.canonicalize_arrays(
+                vocabulary,
+                left_tokens,
+                right_tokens,
+                progress_callback,
+            )
+
+        if rows is not None:
+            left_exact, right_exact = self.exact_arrays(left_tokens, right_tokens)
+            left_fuzzy, right_fuzzy = self.search_arrays(
+                vocabulary,
+                left_tokens.take(rows),
+                right_tokens.take(rows),
+                process_pool,
+                progress_callback,
+            )
+            return (
+                left_exact.put(rows, left_fuzzy),
+                right_exact.put(rows, right_fuzzy),
+            )
+
         self.progress_callback = progress_callback
         self._process_pool = process_pool
 
-        left_tokens = data[left_tokens_column].to_list()
-        right_tokens = data[right_tokens_column].to_list()
+        strings = [self.scorer.process(value) for value in vocabulary.values]
 
-        massive = list(zip(left_tokens, right_tokens))
-        search_func = partial(
-            searching_func,
-            transformer=self.transformer,
-            fuzzy_threshold=self.fuzzy_threshold,
-        )
+        left_ids = left_tokens.ids.copy()
+        left_weights = left_tokens.weights.copy()
+        right_weights = right_tokens.weights.copy()
 
-        chunk_size = 500
-        chunks = [
-            massive[i : i + chunk_size] for i in range(0, len(massive), chunk_size)
+        chunk_size = 100 if self._process_pool != None else 500
+        rows_count = len(left_tokens)
+        bounds = [
+            (start, min(start + chunk_size, rows_count))
+            for start in range(0, rows_count, chunk_size)
         ]
 
         count = 0
-        total = len(chunks)
-
-        results = []
-        self.progress_callback(count, total)
-        for chunk in chunks:
-            if self._process_pool != None:
-                chunk = self._process_pool.map(search_func, chunk)
-            else:
-                chunk = list(map(search_func, chunk))
-            results.extend(chunk)
-
-            count += 1
-            self.progress_callback(count, total)
+        total = len(bounds)
+        self.call_progress(count, total)
+
+        shared = None
+        window = None
+        if self._process_pool != None:
+            shared = self._share(strings, left_tokens, right_tokens)
+            search_func = partial(
+                searching_shared_func,
+                transformer=self.transformer,
+                fuzzy_threshold=self.fuzzy_threshold,
+                scorer=self.scorer,
+            )
+            tasks = ((shared.descriptor, start, stop) for start, stop in bounds)
+            window = TaskWindow(self._process_pool, search_func, tasks)
+            results = iter(window)
+        else:
+            results = (
+                self._search_block(strings, left_tokens, right_tokens, *bound)
+                for bound in bounds
+            )
+
+        try:
+            for start, _, changes in results:
+                if self._stopped:
+                    raise FyzzySearchGracefullExit
+
+                left_start = left_tokens.offsets[start]
+                right_start = right_tokens.offsets[start]
+                (
+                    positions,
+                    ids,
+                    left_changed,
+                    left_values,
+                    right_changed,
+                    right_values,
+                ) = changes
+
+                left_ids[left_start + positions] = ids
+                left_weights[left_start + left_changed] = left_values
+                right_weights[right_start + right_changed] = right_values
+
+                count += 1
+                self.call_progress(count, total)
+
+        finally:
+            # shared block is unlinked only when submitted tasks are done
+            if window is not None:
+                window.close()
+            if shared is not None:
+                shared.close()
+
+        left_tokens = TokenArrays(left_tokens.offsets, left_ids, left_weights)
+        right_tokens = TokenArrays(
+            right_tokens.offsets, right_tokens.ids, right_weights
+        )
+        return left_tokens, right_tokens
+
+    def exact_arrays(
+        self,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """Same as search_arrays in pairwise mode, but only for exact matches"""
+
+        block = (left_tokens, [], right_tokens, [])
+        result = searching_arrays_func(block, self.transformer, None, None)
+        _, left_weights, right_weights = result
+        return (
+            TokenArrays(left_tokens.offsets, left_tokens.ids, left_weights),
+            TokenArrays(right_tokens.offsets, right_tokens.ids, right_weights),
+        )
+
+    def score_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        fuzzy_threshold: float = None,
+        progress_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Find matches of pairwise mode once for any threshold >= fuzzy_threshold:
+        position of matched right token for every left token (-1 if not matched)
+        and score of the match (see apply_scores).
+
+        - fuzzy_threshold - the lowest threshold (0 - 1),
+        threshold of the search if None
+        """
+
+        self.progress_callback = progress_callback
+        if fuzzy_threshold is None:
+            threshold = self.fuzzy_threshold
+        else:
+            threshold = fuzzy_threshold * 100
+        strings = [self.scorer.process(value) for value in vocabulary.values]
+
+        matches = np.full(len(left_tokens.ids), -1, dtype=np.int64)
+        scores = np.full(len(left_tokens.ids), -1, dtype=np.float64)
+
+        chunk_size = 500
+        rows_count = len(left_tokens)
+        total = ceil(rows_count / chunk_size)
+        self.call_progress(0, total)
+
+        for number, start in enumerate(range(0, rows_count, chunk_size)):
+            if self._stopped:
+                raise FyzzySearchGracefullExit
+
+            stop = min(start + chunk_size, rows_count)
+            block = self._rows_block(strings, left_tokens, right_tokens, start, stop)
+            block_matches, block_scores = matching_arrays_func(
+                block,
+                threshold,
+                self.scorer,
+            )
+
+            left_slice = slice(left_tokens.offsets[start], left_tokens.offsets[stop])
+            matched = block_matches >= 0
+            block_matches[matched] += right_tokens.offsets[start]
+            matches[left_slice] = block_matches
+            scores[left_slice] = block_scores
+
+            self.call_progress(number + 1, total)
+
+        return matches, scores
+
+    def apply_scores(
+        self,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        matches: np.ndarray,
+        scores: np.ndarray,
+        fuzzy_threshold: float,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """
+        Same as search_arrays in pairwise mode with fuzzy_threshold (0 - 1),
+        but matches are taken from score_arrays
+        """
+
+        matches = np.where(scores >= fuzzy_threshold * 100, matches, -1)
+        left_weights, right_weights = weighting_arrays_func(
+            left_tokens,
+            right_tokens,
+            matches,
+            self.transformer,
+        )
+
+        matched = np.flatnonzero(matches >= 0)
+        left_ids = left_tokens.ids.copy()
+        left_ids[matched] = right_tokens.ids[matches[matched]]
+
+        return (
+            TokenArrays(left_tokens.offsets, left_ids, left_weights),
+            TokenArrays(right_tokens.offsets, right_tokens.ids, right_weights),
+        )
+
+    def canonical_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        progress_callback: Callable = None,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """
+        Near-duplicate tokens of all rows are clustered once and every token
+        gets id of its cluster representative (rows don't have to be paired).
+        """
+
+        counts = np.bincount(
+            np.concatenate([left_tokens.ids, right_tokens.ids]),
+            minlength=len(vocabulary),
+        )
+        canonical = self.canonical_ids(vocabulary, counts, progress_callback)
+
+        left_tokens = TokenArrays(
+            left_tokens.offsets, canonical[left_tokens.ids], left_tokens.weights
+        )
+        right_tokens = TokenArrays(
+            right_tokens.offsets, canonical[right_tokens.ids], right_tokens.weights
+        )
+        return left_tokens, right_tokens
+
+    def canonical_ids(
+        self,
+        vocabulary: TokenVocabulary,
+        counts: np.ndarray,
+        progress_callback: Callable = None,
+    ) -> np.ndarray:
+        """
+        Return id of cluster representative for every token id
+        (counts - count of every token id, unused tokens have count 0).
+        Similar tokens are found by BKTree of ratio scorer,
+        so the whole vocabulary is never scored against itself.
+        """
+
+        self.progress_callback = progress_callback
+        scorer = setup_scorer(FuzzyScorer.RATIO)
 
-        data[left_tokens_column] = list(map(lambda x: x[0], results))
-        data[right_tokens_column] = list(map(lambda x: x[1], results))
+        counts = np.asarray(counts)
+        used = np.flatnonzero(counts)
+        strings = [scorer.process(vocabulary[i]) for i in used.tolist()]
 
-        return data
+        # empty strings are not similar to anything
+        filled = np.array([len(string) > 0 for string in strings], dtype=bool)
+        used = used[filled]
+        strings = [string for string in strings if string]
+
+        canonicalizer = VocabularyCanonicalizer(
+            scorer, self.fuzzy_threshold, use_index=True
+        )
+        clusters = canonicalizer.clusters(
+            strings,
+            counts[used],
+            self.call_progress,
+            lambda: self._stopped,
+        )
+        if self._stopped:
+            raise FyzzySearchGracefullExit
+
+        canonical = np.arange(len(vocabulary), dtype=np.int64)
+        canonical[used] = used[clusters]
+        return canonical
+
+    def common_weights_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """Tokens with the same id in left and right tokens of a row get common weight"""
+
+        width = len(vocabulary)
+        left_keys = left_tokens.rows_index() * width + left_tokens.ids
+        right_keys = right_tokens.rows_index() * width + right_tokens.ids
+        left_matched = np.isin(left_keys, right_keys)
+        right_matched = np.isin(right_keys, left_keys)
+
+        left_weights = left_tokens.weights.copy()
+        right_weights = right_tokens.weights.copy()
+        weights = self.transformer.common_weights(
+            np.concatenate([left_keys[left_matched], right_keys[right_matched]]),
+            np.concatenate([left_weights[left_matched], right_weights[right_matched]]),
+        )
+        left_count = int(left_matched.sum())
+        left_weights[left_matched] = weights[:left_count]
+        right_weights[right_matched] = weights[left_count:]
+
+        left_tokens = TokenArrays(left_tokens.offsets, left_tokens.ids, left_weights)
+        right_tokens = TokenArrays(
+            right_tokens.offsets, right_tokens.ids, right_weights
+        )
+        return left_tokens, right_tokens
+
+    def canonicalize_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        progress_callback: Callable = None,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        """
+        Global mode of search_arrays.
+        Near-duplicate tokens of all rows are clustered once and every token
+        gets id of its cluster representative. Tokens of a row with the same
+        representative in left and right tokens get common weight.
+        """
+
+        tokens = self.canonical_arrays(
+            vocabulary,
+            left_tokens,
+            right_tokens,
+            progress_callback,
+        )
+        return self.common_weights_arrays(vocabulary, *tokens)
@@ -4,7 +4,9 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Callable
+import tempfile
 import multiprocessing
+from copy import copy
 
 
 SRC_DIR = Path(__file__).parent.parent
@@ -12,11 +14,23 @@ PROJECT_DIR = SRC_DIR.parent
 
 sys.path.append(str(PROJECT_DIR))
 
-from src.notation import JAKKAR, DATA
+from src.notation import JAKKAR, DATA, SWEEP
+from src.functool.chunked_io import read_chunks, ChunkWriter
 from src.simfyzer.preprocessing import Preprocessor
-from src.simfyzer.fuzzy_search import FuzzySearch, FyzzySearchGracefullExit
+from src.simfyzer.fuzzy_search import (
+    FuzzySearch,
+    FuzzyMode,
+    FyzzySearchGracefullExit,
+)
+from src.simfyzer.fuzzy_scorer import FuzzyScorer
 from src.simfyzer.ratio import RateCounter, MarksCounter, MarksMode, RateFunction
+from src.simfyzer.ratio_store import TokenRatioStore, RatioStoreMode
+from src.simfyzer.tokenization_cache import TokenizationCache
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.candidates import CandidateIndex, CandidateMode
+from src.simfyzer.minhash import MinHashIndex
 from src.simfyzer.tokenization import (
+    Token,
     BasicTokenizer,
     TokenTransformer,
     RegexTokenizer,
@@ -47,6 +61,7 @@ class SimFyzer(object):
         validation_treshold: float = 0.5,
         status_callback: Callable = None,
         progress_callback: Callable = None,
+        tokenization_cache: TokenizationCache = None,
     ) -> None:
         if validation_treshold < 0 or validation_treshold > 1:
             raise ValueError("Validation treshold should be in range 0 - 1")
@@ -58,12 +73,15 @@ class SimFyzer(object):
         self.marks_counter = marks_counter
         self.debug = debug
         self.validation_treshold = validation_treshold
+        self.tokenization_cache = tokenization_cache
 
         self.status_callback = status_callback
         self.progress_callback = progress_callback
 
         self.symbols_to_del = r"'\"/"
 
+        self.vocabulary = TokenVocabulary()
+
         self._process_pool = None
         self._stopped = False
 
@@ -104,98 +122,321 @@ class SimFyzer(object):
                 [JAKKAR.CLIENT_TOKENS, JAKKAR.SOURCE_TOKENS],
                 axis=1,
                 inplace=True,
+                errors="ignore",
             )
         return data
 
     def _save_ratio(self) -> None:
         pd.Series(data=self.ratio).to_excel(JAKKAR.RATIO_PATH)
 
-    def _process_tokenization(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _process_tokenization(
+        self,
+        data: pd.DataFrame,
+    ) -> tuple[TokenArrays, TokenArrays]:
         if self._stopped:
             raise SimFyzerGracefullExit
 
         print("client_tokens")
-        data = self.tokenizer.tokenize(data, JAKKAR.CLIENT, JAKKAR.CLIENT_TOKENS)
+        client_tokens = self._tokenize(data, JAKKAR.CLIENT)
 
         print("source_tokens")
-        data = self.tokenizer.tokenize(data, JAKKAR.SOURCE, JAKKAR.SOURCE_TOKENS)
+        source_tokens = self._tokenize(data, JAKKAR.SOURCE)
 
-        return data
+        if self.tokenization_cache is not None:
+            self.tokenization_cache.save()
 
-    def _make_tokens_set(self, data: pd.DataFrame) -> pd.DataFrame:
-        data[JAKKAR.CLIENT_TOKENS] = data[JAKKAR.CLIENT_TOKENS].apply(set)
-        data[JAKKAR.SOURCE_TOKENS] = data[JAKKAR.SOURCE_TOKENS].apply(set)
-        return data
+        return client_tokens, source_tokens
 
-    def _process_preprocessing(self, validation: pd.DataFrame) -> pd.DataFrame:
+    def _tokenize(self, data: pd.DataFrame, column: str) -> TokenArrays:
+        return self.tokenizer.tokenize_arrays(
+            data,
+            column,
+            self.vocabulary,
+            cache=self.tokenization_cache,
+        )
+
+    def _make_tokens_set(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        return client_tokens.unique(), source_tokens.unique()
+
+    def _tokens_sets(self, tokens: TokenArrays) -> list[set[Token]]:
+        return [
+            set(Token(value, weight) for value, weight in row)
+            for row in tokens.to_pairs(self.vocabulary)
+        ]
+
+    def _process_preprocessing(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> tuple[TokenArrays, TokenArrays]:
         if self._stopped:
             raise SimFyzerGracefullExit
 
-        validation[JAKKAR.CLIENT_TOKENS] = self.preproc.preprocess(
-            validation[JAKKAR.CLIENT_TOKENS]
-        )
-        validation[JAKKAR.SOURCE_TOKENS] = self.preproc.preprocess(
-            validation[JAKKAR.SOURCE_TOKENS]
-        )
-        return validation
+        client_tokens = self.preproc.preprocess_arrays(client_tokens, self.vocabulary)
+        source_tokens = self.preproc.preprocess_arrays(source_tokens, self.vocabulary)
+        return client_tokens, source_tokens
 
     def _process_fuzzy(
         self,
-        data: pd.DataFrame,
-    ) -> pd.DataFrame:
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+        rows: np.ndarray = None,
+    ) -> tuple[TokenArrays, TokenArrays]:
         if self._stopped:
             raise SimFyzerGracefullExit
 
         print("make_fuzzy")
 
         try:
-            data = self.fuzzy.search(
-                data,
-                JAKKAR.CLIENT_TOKENS,
-                JAKKAR.SOURCE_TOKENS,
+            return self.fuzzy.search_arrays(
+                self.vocabulary,
+                client_tokens,
+                source_tokens,
                 self._process_pool,
                 self.call_progress,
+                rows,
+            )
+
+        except FyzzySearchGracefullExit:
+            raise SimFyzerGracefullExit
+
+    def _process_decisions(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> tuple[np.ndarray, dict]:
+        """
+        Return rows where the decision isn't known from exact matches
+        (see MarksCounter.undecided_rows) and ratio of exact matches
+        the decisions were made with.
+        """
+
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        tokens = self.fuzzy.exact_arrays(client_tokens, source_tokens)
+        ratio = self.rate_counter.count_ratio_arrays(self.vocabulary, *tokens, False)
+        undecided = self.marks_counter.undecided_rows(
+            ratio,
+            self.vocabulary,
+            *self._make_tokens_set(*tokens),
+            self.validation_treshold,
+        )
+        return np.flatnonzero(undecided), ratio
+
+    def _process_canonical(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        try:
+            return self.fuzzy.canonical_arrays(
+                self.vocabulary,
+                client_tokens,
+                source_tokens,
+                self.call_progress,
             )
-            return data
 
         except FyzzySearchGracefullExit:
-            raise FyzzySearchGracefullExit
+            raise SimFyzerGracefullExit
+
+    def _process_candidates(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+        top_k: int,
+        max_tokens: int = None,
+        max_postings: int = None,
+        candidate_mode: str = CandidateMode.default,
+    ) -> tuple[np.ndarray]:
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        if CandidateMode.checkout(candidate_mode) == CandidateMode.MINHASH:
+            index = MinHashIndex()
+            index.fit(index.minhash(self.vocabulary, source_tokens))
+            candidates = index.candidates(
+                self.vocabulary,
+                client_tokens,
+                top_k,
+                progress_callback=self.call_progress,
+                stop_callback=lambda: self._stopped,
+            )
+
+        else:
+            index = CandidateIndex(
+                source_tokens,
+                self.marks_counter.ratio_by_id(self.ratio, self.vocabulary),
+                max_tokens=max_tokens,
+                max_postings=max_postings,
+            )
+            candidates = index.candidates(
+                client_tokens,
+                top_k,
+                self.call_progress,
+                lambda: self._stopped,
+            )
 
-    def _process_ratio(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self._stopped:
+            raise SimFyzerGracefullExit
+        return candidates
+
+    def _process_ratio(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> dict:
         if self._stopped:
             raise SimFyzerGracefullExit
 
         print("make_ratio")
-        ratio = self.rate_counter.count_ratio(
-            data,
-            JAKKAR.CLIENT_TOKENS,
-            JAKKAR.SOURCE_TOKENS,
+        ratio = self.rate_counter.count_ratio_arrays(
+            self.vocabulary,
+            client_tokens,
+            source_tokens,
         )
         return ratio
 
     def _process_marks_count(
         self,
         data: pd.DataFrame,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
     ) -> pd.DataFrame:
-        return self.marks_counter.count_marks(
+        if self.debug:
+            data[JAKKAR.CLIENT_TOKENS] = self._tokens_sets(client_tokens)
+            data[JAKKAR.SOURCE_TOKENS] = self._tokens_sets(source_tokens)
+
+        return self.marks_counter.count_marks_arrays(
             self.ratio,
+            self.vocabulary,
             data,
-            JAKKAR.CLIENT_TOKENS,
-            JAKKAR.SOURCE_TOKENS,
+            client_tokens,
+            source_tokens,
         )
 
     def _process_tokens_count(
         self,
         data: pd.DataFrame,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
     ) -> pd.DataFrame:
-        data[JAKKAR.CLIENT_TOKENS_COUNT] = data[JAKKAR.CLIENT_TOKENS].apply(
-            lambda x: len(x)
+        data[JAKKAR.CLIENT_TOKENS_COUNT] = client_tokens.counts()
+        data[JAKKAR.SOURCE_TOKENS_COUNT] = source_tokens.counts()
+        return data
+
+    def _process_decided_marks(
+        self,
+        rows: np.ndarray,
+        exact_ratio: dict,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> tuple[np.ndarray, pd.DataFrame]:
+        """Marks of rows without fuzzy matching by ratio of exact matches"""
+
+        decided = np.setdiff1d(np.arange(len(client_tokens)), rows)
+        marks = self.marks_counter.count_marks_arrays(
+            exact_ratio,
+            self.vocabulary,
+            pd.DataFrame(index=decided),
+            client_tokens.take(decided),
+            source_tokens.take(decided),
         )
-        data[JAKKAR.SOURCE_TOKENS_COUNT] = data[JAKKAR.SOURCE_TOKENS].apply(
-            lambda x: len(x)
+        return decided, marks
+
+    def _process_validation(
+        self,
+        data: pd.DataFrame,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+        rows: np.ndarray = None,
+        exact_ratio: dict = None,
+    ) -> pd.DataFrame:
+        """
+        - rows - rows with fuzzy matching (decision only), marks of other rows
+        are counted by exact_ratio (the ratio their decisions were made with)
+        """
+
+        tokens = self._make_tokens_set(client_tokens, source_tokens)
+        decided = None
+        if rows is not None:
+            decided, marks = self._process_decided_marks(rows, exact_ratio, *tokens)
+
+        data = self._process_tokens_count(data, *tokens)
+        data = self._process_marks_count(data, *tokens)
+
+        if decided is not None:
+            for column in marks.columns:
+                data.iloc[decided, data.columns.get_loc(column)] = marks[column].values
+
+        data[JAKKAR.VALIDATED] = np.where(
+            data[self.marks_counter.validation_column] >= self.validation_treshold,
+            1,
+            0,
         )
         return data
 
+    def _count_tokens(
+        self,
+        counts: np.ndarray,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> np.ndarray:
+        """Add counts of tokens to counts by token id (vocabulary may grow)"""
+
+        ids = np.concatenate([client_tokens.ids, source_tokens.ids])
+        chunk_counts = np.bincount(ids, minlength=len(self.vocabulary))
+        chunk_counts[: len(counts)] += counts
+        return chunk_counts
+
+    def _save_tokens(
+        self,
+        path: Path,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+    ) -> None:
+        np.savez(
+            path,
+            client_offsets=client_tokens.offsets,
+            client_ids=client_tokens.ids,
+            client_weights=client_tokens.weights,
+            source_offsets=source_tokens.offsets,
+            source_ids=source_tokens.ids,
+            source_weights=source_tokens.weights,
+        )
+
+    def _load_tokens(self, path: Path) -> tuple[TokenArrays, TokenArrays]:
+        with np.load(path) as data:
+            return tuple(
+                TokenArrays(
+                    data[f"{side}_offsets"],
+                    data[f"{side}_ids"],
+                    data[f"{side}_weights"],
+                )
+                for side in ["client", "source"]
+            )
+
+    def _process_canonical_ids(self, counts: np.ndarray) -> np.ndarray:
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        try:
+            return self.fuzzy.canonical_ids(
+                self.vocabulary,
+                counts,
+                self.call_progress,
+            )
+
+        except FyzzySearchGracefullExit:
+            raise SimFyzerGracefullExit
+
     def call_status(self, message: str) -> None:
         if self.status_callback is not None:
             self.status_callback(message)
@@ -215,47 +456,377 @@ class SimFyzer(object):
         client_column: str,
         source_column: str,
         process_pool: multiprocessing.Pool = None,
+        decision_only: bool = False,
     ) -> pd.DataFrame:
+        """
+        Validate pairs of client and source columns.
+
+        - decision_only - fuzzy matching only for rows where it can change
+        JAKKAR.VALIDATED (pairwise fuzzy mode). Marks of other rows are
+        marks of exact matches by ratio of exact matches (the ratio they
+        were decided with), ratio of other marks is counted without
+        fuzzy matches of these rows.
+        """
+
         self._process_pool = process_pool
 
         self.call_status("Создаю рабочие столбцы")
         data = self._create_working_rows(data, client_column, source_column)
 
+        self.vocabulary = TokenVocabulary()
+
         self.call_status("Провожу токенизацию")
-        data = self._process_tokenization(data)
+        tokens = self._process_tokenization(data)
 
         self.call_status("Предобработка данных")
-        data = self._process_preprocessing(data)
+        tokens = self._process_preprocessing(*tokens)
+
+        rows, exact_ratio = None, None
+        if decision_only and self.fuzzy.mode != FuzzyMode.GLOBAL:
+            self.call_status("Отбираю строки для нечеткого поиска")
+            rows, exact_ratio = self._process_decisions(*tokens)
 
         # очистка токенов-символов по типу (, ), \, . и т.д.
         # актуально для word_tokenizer
         self.call_status("Преобразование Левенштейна")
-        data = self._process_fuzzy(data)
+        tokens = self._process_fuzzy(*tokens, rows)
 
         self.call_status("Вычисляю веса токенов")
-        self.ratio = self._process_ratio(data)
+        self.ratio = self._process_ratio(*tokens)
 
         self.call_status("Вычисляю оценки")
         if self._stopped:
             raise SimFyzerGracefullExit
 
-        data = self._make_tokens_set(data)
-        data = self._process_tokens_count(data)
-        data = self._process_marks_count(data)
+        data = self._process_validation(data, *tokens, rows, exact_ratio)
 
         # if self.debug:
         #     self._save_ratio()
 
-        data[JAKKAR.VALIDATED] = np.where(
-            data[self.marks_counter.validation_column] >= self.validation_treshold,
-            1,
-            0,
-        )
+        self.call_status("Закончил валидацию")
+        data = self._delete_working_rows(data)
+        return data
+
+    def _decision_metrics(self, labels: np.ndarray, validated: np.ndarray) -> dict:
+        tp = int(np.sum(labels & validated))
+        fp = int(np.sum(~labels & validated))
+        fn = int(np.sum(labels & ~validated))
+        tn = int(np.sum(~labels & ~validated))
+
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        return {
+            SWEEP.TP: tp,
+            SWEEP.FP: fp,
+            SWEEP.FN: fn,
+            SWEEP.TN: tn,
+            SWEEP.PRECISION: precision,
+            SWEEP.RECALL: recall,
+            SWEEP.F1: (
+                2 * precision * recall / (precision + recall)
+                if precision + recall
+                else 0.0
+            ),
+            SWEEP.ACCURACY: (tp + tn) / len(labels) if len(labels) else 0.0,
+        }
+
+    def _process_fuzzy_scores(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+        fuzzy_threshold: float,
+    ) -> tuple[np.ndarray]:
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        try:
+            return self.fuzzy.score_arrays(
+                self.vocabulary,
+                client_tokens,
+                source_tokens,
+                fuzzy_threshold,
+                self.call_progress,
+            )
+
+        except FyzzySearchGracefullExit:
+            raise SimFyzerGracefullExit
+
+    def _process_threshold_fuzzy(
+        self,
+        client_tokens: TokenArrays,
+        source_tokens: TokenArrays,
+        fuzzy_threshold: float,
+    ) -> tuple[TokenArrays, TokenArrays]:
+        threshold = self.fuzzy.fuzzy_threshold
+        self.fuzzy.fuzzy_threshold = fuzzy_threshold * 100
+        try:
+            return self._process_fuzzy(client_tokens, source_tokens)
+        finally:
+            self.fuzzy.fuzzy_threshold = threshold
+
+    def sweep(
+        self,
+        data: pd.DataFrame,
+        client_column: str,
+        source_column: str,
+        label_column: str,
+        fuzzy_thresholds: list[float],
+        validation_thresholds: list[float],
+        rate_functions: list[str] = ("default",),
+    ) -> pd.DataFrame:
+        """
+        Metrics of JAKKAR.VALIDATED against label_column (true pairs)
+        for every fuzzy threshold x rate function x validation threshold.
+
+        Tokenization and preprocessing are done once, pairwise fuzzy matches
+        are scored once with the lowest fuzzy threshold (global mode
+        is searched for every fuzzy threshold), ratio and marks
+        are counted once for every fuzzy threshold and rate function.
+        Rate functions are names of RateFunction.map.
+
+        Return one row for every combination: thresholds, rate function,
+        confusion counts, precision, recall, f1 and accuracy.
+        """
+
+        self._process_pool = None
+        labels = data[label_column].astype(bool).to_numpy()
+
+        self.call_status("Создаю рабочие столбцы")
+        working = data[[client_column, source_column]].copy()
+        working = self._create_working_rows(working, client_column, source_column)
+
+        self.vocabulary = TokenVocabulary()
+
+        self.call_status("Провожу токенизацию")
+        tokens = self._process_tokenization(working)
+
+        self.call_status("Предобработка данных")
+        tokens = self._process_preprocessing(*tokens)
+
+        self.call_status("Преобразование Левенштейна")
+        fuzzy_thresholds = sorted(set(fuzzy_thresholds))
+        scores = None
+        if self.fuzzy.mode != FuzzyMode.GLOBAL:
+            scores = self._process_fuzzy_scores(*tokens, fuzzy_thresholds[0])
+
+        metrics = []
+        for fuzzy_threshold in fuzzy_thresholds:
+            if self._stopped:
+                raise SimFyzerGracefullExit
+
+            if scores is None:
+                fuzzy_tokens = self._process_threshold_fuzzy(*tokens, fuzzy_threshold)
+            else:
+                fuzzy_tokens = self.fuzzy.apply_scores(
+                    *tokens, *scores, fuzzy_threshold
+                )
+
+            self.call_status("Вычисляю оценки")
+            tokens_set = self._make_tokens_set(*fuzzy_tokens)
+
+            for rate_function in rate_functions:
+                rate_counter = copy(self.rate_counter)
+                rate_counter.rate_function = RateFunction.map(rate_function)
+                ratio = rate_counter.count_ratio_arrays(
+                    self.vocabulary, *fuzzy_tokens, False
+                )
+                marks = self.marks_counter.validation_marks(
+                    ratio, self.vocabulary, *tokens_set
+                )
+
+                for validation_threshold in validation_thresholds:
+                    metrics.append(
+                        {
+                            SWEEP.FUZZY_THRESHOLD: fuzzy_threshold,
+                            SWEEP.VALIDATION_THRESHOLD: validation_threshold,
+                            SWEEP.RATE_FUNCTION: rate_function,
+                            **self._decision_metrics(
+                                labels, marks >= validation_threshold
+                            ),
+                        }
+                    )
 
         self.call_status("Закончил валидацию")
+        return pd.DataFrame(metrics)
+
+    def match(
+        self,
+        client_data: pd.DataFrame,
+        source_data: pd.DataFrame,
+        client_column: str,
+        source_column: str,
+        top_k: int = 5,
+        max_tokens: int = None,
+        max_postings: int = None,
+        candidate_mode: str = CandidateMode.default,
+        process_pool: multiprocessing.Pool = None,
+    ) -> pd.DataFrame:
+        """
+        Unpaired matching of client rows with source catalog.
+        Candidates are taken from inverted index of source tokens
+        (see CandidateIndex) or from MinHashIndex (see CandidateMode),
+        only top_k candidates of every client row are scored the same way
+        as validate scores pairs.
+        Ratio is counted over both client and source tokens.
+
+        Return one row for every candidate: client columns, source columns
+        (_source suffix for equal names), candidate rank, candidate score and marks.
+        """
+
+        self._process_pool = process_pool
+
+        self.call_status("Создаю рабочие столбцы")
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        client = pd.DataFrame(
+            {JAKKAR.CLIENT: self._delete_symbols(client_data[client_column])}
+        )
+        source = pd.DataFrame(
+            {JAKKAR.SOURCE: self._delete_symbols(source_data[source_column])}
+        )
+
+        self.vocabulary = TokenVocabulary()
+
+        self.call_status("Провожу токенизацию")
+        client_tokens = self._tokenize(client, JAKKAR.CLIENT)
+        source_tokens = self._tokenize(source, JAKKAR.SOURCE)
+        if self.tokenization_cache is not None:
+            self.tokenization_cache.save()
+
+        self.call_status("Предобработка данных")
+        tokens = self._process_preprocessing(client_tokens, source_tokens)
+
+        if self.fuzzy.mode == FuzzyMode.GLOBAL:
+            self.call_status("Преобразование Левенштейна")
+            tokens = self._process_canonical(*tokens)
+
+        self.call_status("Вычисляю веса токенов")
+        self.ratio = self._process_ratio(*tokens)
+
+        self.call_status("Подбираю кандидатов")
+        client_tokens, source_tokens = tokens
+        client_rows, source_rows, scores = self._process_candidates(
+            client_tokens,
+            source_tokens,
+            top_k,
+            max_tokens,
+            max_postings,
+            candidate_mode,
+        )
+        pairs = client_tokens.take(client_rows), source_tokens.take(source_rows)
+
+        self.call_status("Преобразование Левенштейна")
+        if self.fuzzy.mode == FuzzyMode.GLOBAL:
+            pairs = self.fuzzy.common_weights_arrays(self.vocabulary, *pairs)
+        else:
+            pairs = self._process_fuzzy(*pairs)
+
+        self.call_status("Вычисляю оценки")
+        if self._stopped:
+            raise SimFyzerGracefullExit
+
+        data = client_data.iloc[client_rows].reset_index(drop=True)
+        data = data.join(
+            source_data.iloc[source_rows].reset_index(drop=True),
+            rsuffix=JAKKAR.SOURCE,
+        )
+        data[JAKKAR.CANDIDATE_RANK] = (
+            np.arange(len(client_rows)) - np.searchsorted(client_rows, client_rows) + 1
+        )
+        data[JAKKAR.CANDIDATE_SCORE] = scores
+
+        data = self._process_validation(data, *pairs)
+
+        self.call_status("Закончил сопоставление")
         data = self._delete_working_rows(data)
         return data
 
+    def validate_file(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        client_column: str,
+        source_column: str,
+        chunk_size: int = 100_000,
+        process_pool: multiprocessing.Pool = None,
+        columns: list[str] = None,
+    ) -> None:
+        """
+        Streaming version of validate for CSV/XLSX/Parquet/Feather files
+        larger than memory. Output file gets the same columns as the result
+        of validate (only columns of the input are read if they are passed).
+
+        First pass: tokenization, preprocessing and fuzzy search chunk by chunk,
+        tokens are spilled to temporary directory, only counts of tokens are kept.
+        Ratio is counted by counts of all tokens (the same ratio as validate has).
+        Second pass: marks of every chunk, chunks are written as soon as ready.
+        In global fuzzy mode the vocabulary is canonicalized between passes.
+        """
+
+        self._process_pool = process_pool
+        self.vocabulary = TokenVocabulary()
+        counts = np.zeros(0, dtype=np.int64)
+
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+
+            chunks_count = 0
+            for data in read_chunks(input_path, chunk_size, columns):
+                part = f"часть {chunks_count + 1}"
+
+                self.call_status(f"Провожу токенизацию: {part}")
+                data = self._create_working_rows(data, client_column, source_column)
+                tokens = self._process_tokenization(data)
+                tokens = self._process_preprocessing(*tokens)
+
+                if self.fuzzy.mode != FuzzyMode.GLOBAL:
+                    self.call_status(f"Преобразование Левенштейна: {part}")
+                    tokens = self._process_fuzzy(*tokens)
+
+                counts = self._count_tokens(counts, *tokens)
+                self._save_tokens(directory / f"{chunks_count}.npz", *tokens)
+                chunks_count += 1
+
+            canonical = None
+            if self.fuzzy.mode == FuzzyMode.GLOBAL:
+                self.call_status("Преобразование Левенштейна")
+                canonical = self._process_canonical_ids(counts)
+                counts = np.bincount(
+                    canonical, weights=counts, minlength=len(self.vocabulary)
+                ).astype(np.int64)
+
+            self.call_status("Вычисляю веса токенов")
+            if self._stopped:
+                raise SimFyzerGracefullExit
+            self.ratio = self.rate_counter.count_ratio_counts(self.vocabulary, counts)
+
+            self.call_status("Вычисляю оценки")
+            self.call_progress(0, max(chunks_count, 1))
+            with ChunkWriter(output_path) as writer:
+                for number, data in enumerate(
+                    read_chunks(input_path, chunk_size, columns)
+                ):
+                    if self._stopped:
+                        raise SimFyzerGracefullExit
+
+                    tokens = self._load_tokens(directory / f"{number}.npz")
+                    if canonical is not None:
+                        tokens = self.fuzzy.common_weights_arrays(
+                            self.vocabulary,
+                            *(
+                                TokenArrays(t.offsets, canonical[t.ids], t.weights)
+                                for t in tokens
+                            ),
+                        )
+
+                    data = self._process_validation(data, *tokens)
+                    data = self._delete_working_rows(data)
+                    writer.write(data)
+                    self.call_progress(number + 1, chunks_count)
+
+        self.call_status("Закончил валидацию")
+
 
 def setup_SimFyzer(
     config: dict,
@@ -263,6 +834,12 @@ def setup_SimFyzer(
     validation_threshold: float,
     status_callback: Callable = None,
     progress_callback: Callable = None,
+    fuzzy_scorer: str = FuzzyScorer.default,
+    fuzzy_mode: str = FuzzyMode.default,
+    ratio_store: str | Path = None,
+    ratio_store_mode: str = RatioStoreMode.default,
+    update_ratio_store: bool = False,
+    tokenization_cache: str | Path = None,
 ) -> SimFyzer:
     regex_weights = RegexCustomWeights(
         config[CONFIG.REGEX_WEIGHTS][REGEX_WEIGHTS.CAPS],
@@ -287,8 +864,16 @@ def setup_SimFyzer(
         config[CONFIG.RATIO][RATIO.MIN_APPEARANCE],
         config[CONFIG.RATIO][RATIO.MIN_APPEARANCE_PENALTY],
         RateFunction.map(config[CONFIG.RATIO][RATIO.RATE_FUNC]),
+        store=TokenRatioStore(ratio_store) if ratio_store is not None else None,
+        store_mode=ratio_store_mode,
+        update_store=update_ratio_store,
+    )
+    fuzzy = FuzzySearch(
+        fuzzy_threshold,
+        transformer=transformer,
+        scorer=fuzzy_scorer,
+        mode=fuzzy_mode,
     )
-    fuzzy = FuzzySearch(fuzzy_threshold, transformer=transformer)
     marks_counter = MarksCounter(MarksMode.MULTIPLE)
 
     simfyzer = SimFyzer(
@@ -300,6 +885,11 @@ def setup_SimFyzer(
         validation_treshold=validation_threshold,
         status_callback=status_callback,
         progress_callback=progress_callback,
+        tokenization_cache=(
+            TokenizationCache(tokenization_cache, tokenizer.config_key())
+            if tokenization_cache is not None
+            else None
+        ),
     )
     return simfyzer
 
@@ -0,0 +1,252 @@
+import sys
+import zlib
+import numpy as np
+from pathlib import Path
+from typing import Callable
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.candidates import top_candidates
+
+
+class MinHashIndex(object):
+    """
+    MinHash signatures of tokens sets with LSH banding.
+
+    Token value is hashed with crc32 (signatures don't depend on vocabulary,
+    so they can be saved and loaded), every permutation is a universal hash
+    (a * x + b) mod p and signature is the min hash of row tokens.
+    Signature is split into bands: rows with equal band are candidates,
+    so pairs with jaccard similarity s are found with probability
+    1 - (1 - s ** rows_per_band) ** bands. Weights of tokens are ignored.
+
+    Rows without tokens have no candidates.
+
+    - permutations - count of hash functions (length of signature)
+    - bands - count of bands (permutations should be divisible by bands)
+    - chunk_cells - max count of hashes counted at once
+    """
+
+    prime = (1 << 31) - 1
+    empty = prime
+
+    def __init__(
+        self,
+        permutations: int = 128,
+        bands: int = 32,
+        seed: int = 1,
+        chunk_cells: int = 2**22,
+    ) -> None:
+        if bands <= 0 or permutations % bands != 0:
+            raise ValueError("Permutations should be divisible by bands")
+
+        self.permutations = permutations
+        self.bands = bands
+        self.seed = seed
+        self.chunk_cells = chunk_cells
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, self.prime, permutations, dtype=np.uint64)
+        self._b = generator.integers(0, self.prime, permutations, dtype=np.uint64)
+        self._bands_mult = generator.integers(
+            1, 1 << 63, self.rows_per_band, dtype=np.uint64
+        )
+
+        self.signatures = np.empty((0, permutations), dtype=np.uint32)
+        self._keys = np.empty((bands, 0), dtype=np.uint64)
+        self._order = np.empty((bands, 0), dtype=np.int64)
+
+    @property
+    def rows_per_band(self) -> int:
+        return self.permutations // self.bands
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _values_hashes(self, vocabulary: TokenVocabulary) -> np.ndarray:
+        return np.fromiter(
+            (zlib.crc32(value.encode("utf-8")) for value in vocabulary.values),
+            dtype=np.uint64,
+            count=len(vocabulary),
+        )
+
+    def minhash(
+        self,
+        vocabulary: TokenVocabulary,
+        tokens: TokenArrays,
+    ) -> np.ndarray:
+        """Return MinHash signature of every row (rows x permutations)"""
+
+        values_hashes = self._values_hashes(vocabulary) % np.uint64(self.prime)
+        signatures = np.full(
+            (len(tokens), self.permutations), self.empty, dtype=np.uint32
+        )
+
+        filled = np.flatnonzero(tokens.counts() > 0)
+        ends = tokens.offsets[filled + 1]
+        chunk_tokens = max(1, self.chunk_cells // self.permutations)
+
+        start = 0
+        while start < len(filled):
+            # chunk is limited by count of tokens, at least one row
+            begin = tokens.offsets[filled[start]]
+            stop = np.searchsorted(ends, begin + chunk_tokens, side="right")
+            rows = filled[start : max(stop, start + 1)]
+            start += len(rows)
+
+            chunk = tokens.rows(int(rows[0]), int(rows[-1]) + 1)
+            x = values_hashes[chunk.ids][:, np.newaxis]
+            hashes = (self._a * x + self._b) % np.uint64(self.prime)
+
+            starts = chunk.offsets[:-1][chunk.counts() > 0]
+            signatures[rows] = np.minimum.reduceat(hashes, starts, axis=0)
+
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Return key of every band (bands x rows)"""
+
+        bands = signatures.astype(np.uint64).reshape(
+            len(signatures), self.bands, self.rows_per_band
+        )
+        # overflow is a part of the hash
+        keys = (bands * self._bands_mult).sum(axis=2, dtype=np.uint64)
+        return np.ascontiguousarray(keys.T)
+
+    def fit(self, signatures: np.ndarray) -> "MinHashIndex":
+        """Index signatures (rows of the index are rows of signatures)"""
+
+        self.signatures = np.asarray(signatures, dtype=np.uint32)
+
+        filled = np.flatnonzero(self.signatures[:, 0] != self.empty)
+        keys = self._band_keys(self.signatures[filled])
+        order = np.argsort(keys, axis=1, kind="stable")
+
+        self._keys = np.take_along_axis(keys, order, axis=1)
+        self._order = filled[order]
+        return self
+
+    def similarity(
+        self,
+        signatures: np.ndarray,
+        query_rows: np.ndarray,
+        index_rows: np.ndarray,
+    ) -> np.ndarray:
+        """Return estimated jaccard similarity of query and index rows pairs"""
+
+        similarity = np.empty(len(query_rows), dtype=np.float64)
+        chunk_size = max(1, self.chunk_cells // self.permutations)
+        for start in range(0, len(query_rows), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            equal = signatures[query_rows[chunk]] == self.signatures[index_rows[chunk]]
+            similarity[chunk] = equal.mean(axis=1)
+        return similarity
+
+    def query(
+        self,
+        signatures: np.ndarray,
+        threshold: float = 0,
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Return candidates of every query signature that share a band
+        with it: (query row, index row, estimated similarity) sorted by query
+        and index rows. Pairs with similarity lower than threshold are dropped.
+        """
+
+        signatures = np.asarray(signatures, dtype=np.uint32)
+        filled = np.flatnonzero(signatures[:, 0] != self.empty)
+        keys = self._band_keys(signatures[filled])
+
+        pairs = []
+        for band in range(self.bands):
+            if stop_callback is not None and stop_callback():
+                break
+
+            first = np.searchsorted(self._keys[band], keys[band], side="left")
+            last = np.searchsorted(self._keys[band], keys[band], side="right")
+            lengths = last - first
+
+            positions = np.arange(lengths.sum()) + np.repeat(
+                first - np.cumsum(lengths) + lengths, lengths
+            )
+            pairs.append(
+                np.repeat(filled, lengths) * len(self) + self._order[band][positions]
+            )
+
+            if progress_callback is not None:
+                progress_callback(band + 1, self.bands)
+
+        pairs = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, np.int64)
+        query_rows, index_rows = np.divmod(pairs, max(len(self), 1))
+
+        similarity = self.similarity(signatures, query_rows, index_rows)
+        passed = similarity >= threshold
+        return query_rows[passed], index_rows[passed], similarity[passed]
+
+    def duplicates(
+        self,
+        threshold: float = 0,
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Return near-duplicate pairs of indexed rows:
+        (left row, right row, estimated similarity), left row < right row.
+        """
+
+        left, right, similarity = self.query(
+            self.signatures,
+            threshold,
+            progress_callback,
+            stop_callback,
+        )
+        pairs = left < right
+        return left[pairs], right[pairs], similarity[pairs]
+
+    def candidates(
+        self,
+        vocabulary: TokenVocabulary,
+        client_tokens: TokenArrays,
+        top_k: int,
+        threshold: float = 0,
+        progress_callback: Callable = None,
+        stop_callback: Callable = None,
+    ) -> tuple[np.ndarray]:
+        """
+        Same as CandidateIndex.candidates:
+        top_k candidates of every client row by estimated similarity.
+        """
+
+        client_rows, source_rows, scores = self.query(
+            self.minhash(vocabulary, client_tokens),
+            threshold,
+            progress_callback,
+            stop_callback,
+        )
+        return top_candidates(client_rows, source_rows, scores, top_k)
+
+    def save(self, path: str | Path) -> None:
+        """Save parameters and signatures (.npz)"""
+
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                permutations=self.permutations,
+                bands=self.bands,
+                seed=self.seed,
+                signatures=self.signatures,
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "MinHashIndex":
+        with np.load(path) as data:
+            index = cls(
+                permutations=int(data["permutations"]),
+                bands=int(data["bands"]),
+                seed=int(data["seed"]),
+            )
+            return index.fit(data["signatures"])
@@ -1,5 +1,12 @@
+import sys
 import pandas as pd
 from abc import ABC
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
 
 
 class AbstractPreprocessor(ABC):
@@ -9,6 +16,13 @@ class AbstractPreprocessor(ABC):
     def preprocess(self, series: pd.Series) -> pd.Series:
         pass
 
+    def preprocess_arrays(
+        self,
+        tokens: TokenArrays,
+        vocabulary: TokenVocabulary,
+    ) -> TokenArrays:
+        pass
+
 
 class Preprocessor(AbstractPreprocessor):
     def __init__(
@@ -36,3 +50,15 @@ class Preprocessor(AbstractPreprocessor):
         series = self._drop_dups(series)
 
         return series
+
+    def preprocess_arrays(
+        self,
+        tokens: TokenArrays,
+        vocabulary: TokenVocabulary,
+    ) -> TokenArrays:
+        if self.word_min_length:
+            lengths = vocabulary.lengths()
+            tokens = tokens.mask(lengths[tokens.ids] >= self.word_min_length)
+        tokens = tokens.unique()
+
+        return tokens
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 from typing import Callable
 from collections import Counter
@@ -11,6 +12,8 @@ PROJECT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(PROJECT_DIR))
 
 from src.simfyzer.tokenization import Token
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.ratio_store import TokenRatioStore, RatioStoreMode
 
 
 class AbstactRateCounter(ABC):
@@ -120,6 +123,9 @@ class RateCounter(AbstactRateCounter):
         min_appearance: int = 1,
         min_appearance_penalty: float = 0,
         rate_function: Callable = RateFunction.default,
+        store: TokenRatioStore = None,
+        store_mode: str = RatioStoreMode.default,
+        update_store: bool = False,
     ) -> None:
         self.min_ratio = min_ratio
         self.max_ratio = max_ratio
@@ -127,6 +133,10 @@ class RateCounter(AbstactRateCounter):
         self.min_appearance_penalty = min_appearance_penalty
         self.rate_function = rate_function
 
+        self.store = store
+        self.store_mode = RatioStoreMode.checkout(store_mode)
+        self.update_store = update_store
+
     def _get_tokens(
         self,
         data: pd.DataFrame,
@@ -199,6 +209,65 @@ class RateCounter(AbstactRateCounter):
         ratio = self._process_ratio(tokens)
         return ratio
 
+    def count_ratio_arrays(
+        self,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        save: bool = True,
+    ) -> dict:
+        """Same as count_ratio, but counts are taken from TokenArrays"""
+
+        ids = np.concatenate([left_tokens.ids, right_tokens.ids])
+        counts = np.bincount(ids, minlength=len(vocabulary))
+        return self.count_ratio_counts(vocabulary, counts, save)
+
+    def _store_counts(
+        self,
+        vocabulary: TokenVocabulary,
+        counts: np.ndarray,
+    ) -> np.ndarray:
+        if self.store is None or self.store_mode == RatioStoreMode.FILE:
+            return counts
+
+        store_counts = self.store.counts(vocabulary)
+        if self.store_mode == RatioStoreMode.BLEND:
+            store_counts = counts + store_counts
+        else:
+            store_counts = np.where(store_counts > 0, store_counts, counts)
+
+        # only tokens of the file are rated
+        return np.where(counts > 0, store_counts, 0)
+
+    def count_ratio_counts(
+        self,
+        vocabulary: TokenVocabulary,
+        counts: np.ndarray,
+        save: bool = True,
+    ) -> dict:
+        """
+        Same as count_ratio, but counts of tokens are counted by token id.
+        Counts are blended with the store by store mode,
+        then the store is updated by counts (if update_store and save).
+        """
+
+        file_counts = np.asarray(counts, dtype=np.int64)
+        counts = self._store_counts(vocabulary, file_counts)
+        if self.store is not None and self.update_store and save:
+            self.store.update(vocabulary, file_counts)
+
+        max_value = int(counts.max()) if counts.any() else 0
+
+        rates = {}
+        ratio = {}
+        for token_id in np.flatnonzero(counts).tolist():
+            value = int(counts[token_id])
+            if value not in rates:
+                rates[value] = self._count_ratio(value, max_value)
+            ratio[vocabulary[token_id]] = rates[value]
+
+        return ratio
+
 
 class AbstractMarksCounter(ABC):
     def __init__(self) -> None:
@@ -326,3 +395,199 @@ class MarksCounter(AbstractMarksCounter):
             )
 
         return data
+
+    def ratio_by_id(self, ratio: dict, vocabulary: TokenVocabulary) -> np.ndarray:
+        ratio_by_id = np.zeros(len(vocabulary), dtype=np.float64)
+        for value, rate in ratio.items():
+            token_id = vocabulary.get(value)
+            if token_id >= 0:
+                ratio_by_id[token_id] = rate
+        return ratio_by_id
+
+    def _divide(self, intersect: np.ndarray, base: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            marks = intersect / base
+        return np.where(base != 0, marks, 0.0)
+
+    def _count_marks_arrays(
+        self,
+        ratio_by_id: np.ndarray,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> dict[str, np.ndarray]:
+        """
+        Count marks for all rows at once.
+        Tokens in every row should be unique (like sets).
+        Common token takes weight the same way as set operations do:
+        intersection keeps token of smaller set (right one if sizes are equal),
+        union keeps token of left set.
+        """
+
+        rows_count = len(left_tokens)
+        width = len(ratio_by_id)
+
+        left_rows = left_tokens.rows_index()
+        right_rows = right_tokens.rows_index()
+        left_rates = ratio_by_id[left_tokens.ids] * left_tokens.weights
+        right_rates = ratio_by_id[right_tokens.ids] * right_tokens.weights
+
+        left_keys = left_rows * width + left_tokens.ids
+        right_keys = right_rows * width + right_tokens.ids
+        left_common = np.isin(left_keys, right_keys)
+        right_common = np.isin(right_keys, left_keys)
+
+        from_left = right_tokens.counts() > left_tokens.counts()
+        left_intersect = left_common & from_left[left_rows]
+        right_intersect = right_common & ~from_left[right_rows]
+        right_only = ~right_common
+
+        def rows_sum(rows: list[np.ndarray], rates: list[np.ndarray]) -> np.ndarray:
+            return np.bincount(
+                np.concatenate(rows),
+                weights=np.concatenate(rates),
+                minlength=rows_count,
+            )
+
+        intersect = rows_sum(
+            [left_rows[left_intersect], right_rows[right_intersect]],
+            [left_rates[left_intersect], right_rates[right_intersect]],
+        )
+        bases = {
+            MarksMode.UNION: rows_sum(
+                [left_rows, right_rows[right_only]],
+                [left_rates, right_rates[right_only]],
+            ),
+            MarksMode.CLIENT: rows_sum([left_rows], [left_rates]),
+            MarksMode.SOURCE: rows_sum([right_rows], [right_rates]),
+        }
+
+        return {mode: self._divide(intersect, base) for mode, base in bases.items()}
+
+    def validation_marks(
+        self,
+        ratio: dict,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> np.ndarray:
+        """Return marks of validation column (tokens should be unique in every row)"""
+
+        ratio_by_id = self.ratio_by_id(ratio, vocabulary)
+        marks = self._count_marks_arrays(ratio_by_id, left_tokens, right_tokens)
+        return marks[self.validation_column]
+
+    def _rows_top_sum(
+        self,
+        rows: np.ndarray,
+        values: np.ndarray,
+        counts: np.ndarray,
+        rows_count: int,
+        largest: bool,
+    ) -> np.ndarray:
+        """Return sum of counts[row] largest (or smallest) values of every row"""
+
+        order = np.lexsort((-values if largest else values, rows))
+        rows = rows[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        taken = rank < counts[rows]
+        return np.bincount(
+            rows[taken],
+            weights=values[order][taken],
+            minlength=rows_count,
+        )
+
+    def undecided_rows(
+        self,
+        ratio: dict,
+        vocabulary: TokenVocabulary,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+        threshold: float,
+    ) -> np.ndarray:
+        """
+        Return mask of rows where fuzzy matching can change the decision
+        (validation mark >= threshold).
+        Tokens should be unique in every row and have weights of exact matches.
+
+        Fuzzy matching only adds matches, so marks of exact matches
+        are the lower bound. Upper bound: every left token without exact match
+        is matched with right token of the highest rate, matched tokens take
+        the max weight of the row and unmatched right tokens are
+        the ones with the smallest rates.
+        """
+
+        ratio_by_id = self.ratio_by_id(ratio, vocabulary)
+        rows_count = len(left_tokens)
+        width = len(ratio_by_id)
+
+        marks = self._count_marks_arrays(ratio_by_id, left_tokens, right_tokens)
+        lower = marks[self.validation_column]
+
+        left_rows = left_tokens.rows_index()
+        right_rows = right_tokens.rows_index()
+        left_keys = left_rows * width + left_tokens.ids
+        right_keys = right_rows * width + right_tokens.ids
+        left_only = ~np.isin(left_keys, right_keys)
+        right_only = ~np.isin(right_keys, left_keys)
+
+        left_unmatched = np.bincount(left_rows[left_only], minlength=rows_count)
+        right_unmatched = np.bincount(right_rows[right_only], minlength=rows_count)
+
+        max_weight = np.zeros(rows_count, dtype=np.float64)
+        np.maximum.at(max_weight, left_rows, left_tokens.weights)
+        np.maximum.at(max_weight, right_rows, right_tokens.weights)
+
+        right_rates = ratio_by_id[right_tokens.ids]
+        intersect = np.bincount(
+            right_rows[~right_only],
+            weights=right_rates[~right_only],
+            minlength=rows_count,
+        ) + self._rows_top_sum(
+            right_rows[right_only],
+            right_rates[right_only],
+            np.minimum(left_unmatched, right_unmatched),
+            rows_count,
+            largest=True,
+        )
+        intersect *= max_weight
+
+        # left tokens can disappear (matched to the same right token)
+        rest = np.zeros(rows_count, dtype=np.float64)
+        if self.validation_column != MarksMode.CLIENT:
+            rest = self._rows_top_sum(
+                right_rows[right_only],
+                (right_rates * right_tokens.weights)[right_only],
+                np.maximum(right_unmatched - left_unmatched, 0),
+                rows_count,
+                largest=False,
+            )
+
+        upper = self._divide(intersect, intersect + rest)
+        return (left_unmatched > 0) & (lower < threshold) & (upper >= threshold)
+
+    def count_marks_arrays(
+        self,
+        ratio: dict,
+        vocabulary: TokenVocabulary,
+        data: pd.DataFrame,
+        left_tokens: TokenArrays,
+        right_tokens: TokenArrays,
+    ) -> pd.DataFrame:
+        """Same as count_marks, but vectorized over TokenArrays"""
+
+        self.ratio = ratio
+        ratio_by_id = self.ratio_by_id(ratio, vocabulary)
+        marks = self._count_marks_arrays(ratio_by_id, left_tokens, right_tokens)
+
+        if self.mode is MarksMode.MULTIPLE:
+            data[MarksMode.UNION] = marks[MarksMode.UNION]
+            data[MarksMode.CLIENT] = marks[MarksMode.CLIENT]
+            data[MarksMode.SOURCE] = marks[MarksMode.SOURCE]
+
+        elif self.mode in marks:
+            data[self.mode] = marks[self.mode]
+
+        else:
+            raise NotImplementedError("Not implemented Marks Mode")
+
+        return data
@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import numpy as np
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.simfyzer.vocabulary import TokenVocabulary
+
+
+class RatioStoreMode(object):
+    """Usage of TokenRatioStore by RateCounter
+
+    Mode can be:
+        - file : only counts of the current file
+        - blend : counts of the current file plus counts of the store
+        - store : counts of the store (counts of the current file
+        are used only for tokens that the store doesn't have)
+
+    Default mode:
+        - file
+    """
+
+    FILE = "file"
+    BLEND = "blend"
+    STORE = "store"
+    modes = {FILE, BLEND, STORE}
+
+    default = FILE
+
+    @classmethod
+    def checkout(cls, mode: str) -> str:
+        """
+        Check mode and return standardized value\n
+        If the input mode have wrong value -> return default mode
+        """
+
+        mode = str(mode).lower()
+        if mode not in cls.modes:
+            mode = cls.default
+        return mode
+
+
+class TokenRatioStore(object):
+    """
+    Token document frequencies accumulated over many runs on disk.
+    Store is a directory:
+        - values.npy - sorted token values (numpy unicode array)
+        - counts.npy - count of every value
+        - meta.json - count of updates
+
+    Arrays are loaded with mmap, values of TokenVocabulary of a run
+    are found by binary search, so loading doesn't depend on the store size.
+    """
+
+    VALUES = "values.npy"
+    COUNTS = "counts.npy"
+    META = "meta.json"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.updates = 0
+        self.values = np.empty(0, dtype=np.str_)
+        self._counts = np.empty(0, dtype=np.int64)
+
+        if (self.path / self.META).exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _load(self) -> None:
+        with open(self.path / self.META, "r", encoding="utf-8") as file:
+            self.updates = json.load(file)["updates"]
+
+        self.values = np.load(self.path / self.VALUES, mmap_mode="r")
+        self._counts = np.load(self.path / self.COUNTS, mmap_mode="r")
+
+    def _find(self, values: np.ndarray) -> tuple[np.ndarray]:
+        """Return position of every value in the store and mask of found values"""
+
+        positions = np.searchsorted(self.values, values)
+        positions = np.minimum(positions, max(len(self) - 1, 0))
+        found = self.values[positions] == values if len(self) else positions < 0
+        return positions, found
+
+    def counts(self, vocabulary: TokenVocabulary) -> np.ndarray:
+        """Return counts of the store by token id of vocabulary (0 if unknown)"""
+
+        positions, found = self._find(np.array(vocabulary.values, dtype=np.str_))
+
+        counts = np.zeros(len(vocabulary), dtype=np.int64)
+        counts[found] = self._counts[positions[found]]
+        return counts
+
+    def update(
+        self,
+        vocabulary: TokenVocabulary,
+        counts: np.ndarray,
+    ) -> None:
+        """Add counts by token id of vocabulary and save the store"""
+
+        used = np.flatnonzero(counts)
+        values = np.array([vocabulary[i] for i in used.tolist()], dtype=np.str_)
+
+        _, found = self._find(values)
+        values = np.concatenate([np.asarray(self.values), values[~found]])
+        order = np.argsort(values, kind="stable")
+
+        updated = np.zeros(len(values), dtype=np.int64)
+        updated[: len(self)] = self._counts
+        updated = updated[order]
+        values = values[order]
+
+        positions = np.searchsorted(values, [vocabulary[i] for i in used.tolist()])
+        updated[positions] += np.asarray(counts)[used]
+
+        self.values = values
+        self._counts = updated
+        self.updates += 1
+        self.save()
+
+    def save(self) -> None:
+        """Save arrays (every file is replaced at once, meta is the last one)"""
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # mmap of the previous arrays is dropped before files are replaced
+        arrays = {
+            self.VALUES: np.array(self.values),
+            self.COUNTS: np.array(self._counts, dtype=np.int64),
+        }
+        self.values = arrays[self.VALUES]
+        self._counts = arrays[self.COUNTS]
+
+        for name, array in arrays.items():
+            temporary = self.path / f"{name}.tmp"
+            with open(temporary, "wb") as file:
+                np.save(file, array)
+            os.replace(temporary, self.path / name)
+
+        temporary = self.path / f"{self.META}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"updates": self.updates}, file)
+        os.replace(temporary, self.path / self.META)
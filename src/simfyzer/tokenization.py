@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+import re
+import json
+import numpy as np
 import pandas as pd
 from nltk.tokenize import word_tokenize
 from collections import namedtuple
@@ -9,13 +12,17 @@ from pathlib import Path
 PROJECT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(PROJECT_DIR))
 
-from src.functool.words_functool import LanguageRules, LanguageType
+from src.functool.words_functool import LanguageRules, LanguageType, WordsFuncTool
 from src.functool.word_extraction import WordsExtractor
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.tokenization_cache import TokenizationCache
 
 WeightsRules = namedtuple("WeightRule", ["rules", "weight"])
 
 
 class AbstractToken(ABC):
+    __slots__ = ()
+
     def __init__(
         self,
         value: str,
@@ -44,6 +51,8 @@ class Token(AbstractToken):
     - custom_weight - custom weight of this word (don't use manual)
     """
 
+    __slots__ = ("original_value", "value", "_custom_weight")
+
     def __init__(
         self,
         value: str,
@@ -84,8 +93,22 @@ class TokenTransformer(object):
     def __init__(self):
         pass
 
+    def common_weight(self, weight1: float, weight2: float) -> float:
+        return max(weight1, weight2)
+
+    def common_weights(self, groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Same as common_weight for every group of matched tokens at once"""
+
+        if len(weights) == 0:
+            return np.asarray(weights, dtype=np.float64)
+
+        _, inverse = np.unique(groups, return_inverse=True)
+        common = np.full(inverse.max() + 1, -np.inf)
+        np.maximum.at(common, inverse, weights)
+        return common[inverse]
+
     def _get_common_weight(self, t1: Token, t2: Token) -> int:
-        return max(t1.custom_weight, t2.custom_weight)
+        return self.common_weight(t1.custom_weight, t2.custom_weight)
 
     def transform(
         self,
@@ -127,6 +150,45 @@ class BasicTokenizer(AbstractTokenizer):
         data[token_column_name] = data[token_column_name].apply(self._create_tokens)
         return data
 
+    def config_key(self) -> str:
+        """Return key of the tokenizer config (for TokenizationCache)"""
+
+        return type(self).__name__
+
+    def tokenize_words(self, values: list) -> list[list[tuple[str, float]]]:
+        """Return (word, weight) pairs of tokens for every value"""
+
+        token_column_name = "_tokens"
+        data = pd.DataFrame({"_values": values})
+        data = self.tokenize(data, "_values", token_column_name)
+        return [
+            [(token.value, token.custom_weight) for token in tokens]
+            for tokens in data[token_column_name]
+        ]
+
+    def tokenize_arrays(
+        self,
+        data: pd.DataFrame,
+        column: str,
+        vocabulary: TokenVocabulary,
+        cache: TokenizationCache = None,
+    ) -> TokenArrays:
+        """
+        Return tokens of the column as TokenArrays.
+        Every unique value is tokenized once (or taken from the cache)
+        and tokens are broadcast to all rows with this value.
+        """
+
+        codes, uniques = pd.factorize(data[column], use_na_sentinel=False)
+        uniques = list(uniques)
+
+        if cache is None:
+            words = self.tokenize_words(uniques)
+        else:
+            words = cache.words_of(uniques, self.tokenize_words)
+
+        return TokenArrays.from_pairs(words, vocabulary).take(codes)
+
 
 class RegexCustomWeights(object):
     """
@@ -226,6 +288,84 @@ class RegexCustomWeights(object):
         return rules
 
 
+class TokenScanner(object):
+    """
+    Compiled single-pass scanner for RegexTokenizer rules.
+
+    With plain word boundaries every rule matches whole words only,
+    so extraction with deletion (caps -> capital -> low -> other
+    for every language) is equal to giving each word to the first
+    rule that matches it. All rules are compiled to one alternation
+    in that order and every row is scanned once.
+
+    - languages - language weights (in order of extraction)
+    - weights_rules - rules from RegexCustomWeights.get_rules()
+    """
+
+    def __init__(
+        self,
+        languages: dict[LanguageType, int],
+        weights_rules: dict[str, WeightsRules],
+    ) -> None:
+        tool = WordsFuncTool()
+
+        patterns = []
+        self._weights = []
+        self._letters = []
+
+        for language in languages:
+            language_weight = languages[language]
+            for weights_rule in weights_rules.values():
+                rules = LanguageRules(language, **weights_rule.rules)
+                patterns.append(f"({tool._select_mode(rules)})")
+                self._weights.append(weights_rule.weight * language_weight)
+                self._letters.append(
+                    re.compile(f"[{rules.language.get_letters()}]")
+                    if rules.check_letters
+                    else None
+                )
+
+        self._rx = re.compile(r"\b(?:" + "|".join(patterns) + r")\b")
+
+    @classmethod
+    def is_supported(cls, weights_rules: dict[str, WeightsRules]) -> bool:
+        """Scanner is exact only for words with plain word boundary"""
+
+        for weights_rule in weights_rules.values():
+            rules = weights_rule.rules
+            if not rules.get("word_boundary", False):
+                return False
+            if rules.get("custom_boundary", "") or rules.get("symbols", "-"):
+                return False
+        return True
+
+    def scan_words(self, row: str) -> list[tuple[str, float]]:
+        """Return (word, weight) pairs ordered by rule, then by position"""
+
+        founded = [[] for _ in self._weights]
+        for match in self._rx.finditer(row):
+            index = match.lastindex - 1
+            word = match[match.lastindex]
+
+            letters = self._letters[index]
+            if letters is None or letters.search(word.lower()):
+                founded[index].append(word)
+
+        words = []
+        for index in range(len(founded)):
+            weight = self._weights[index]
+            words.extend((word, weight) for word in founded[index])
+        return words
+
+    def scan(self, row: str) -> list[Token]:
+        """Return tokens of the row ordered by rule, then by position"""
+
+        return [
+            Token(value=word, custom_weight=weight)
+            for word, weight in self.scan_words(row)
+        ]
+
+
 class RegexTokenizer(BasicTokenizer):
     def __init__(
         self,
@@ -235,6 +375,10 @@ class RegexTokenizer(BasicTokenizer):
         self.languages = languages
         self.weights_rules = weights_rules.get_rules()
 
+        self.scanner = None
+        if TokenScanner.is_supported(self.weights_rules):
+            self.scanner = TokenScanner(self.languages, self.weights_rules)
+
     def create_tokens(
         self,
         data: pd.DataFrame,
@@ -256,12 +400,49 @@ class RegexTokenizer(BasicTokenizer):
         data[token_col_name] = data[token_col_name] + tokens
         return data
 
+    def _scan(
+        self,
+        data: pd.DataFrame,
+        col: str,
+        token_column_name: str,
+    ) -> pd.DataFrame:
+        rows = map(str, data[col].to_list())
+        data[token_column_name] = [self.scanner.scan(row) for row in rows]
+        return data
+
+    def config_key(self) -> str:
+        languages = [
+            [str(language), weight] for language, weight in self.languages.items()
+        ]
+        rules = [
+            [name, weights_rule.rules, weights_rule.weight]
+            for name, weights_rule in self.weights_rules.items()
+        ]
+        return json.dumps([type(self).__name__, languages, rules], sort_keys=True)
+
+    def tokenize_words(self, values: list) -> list[list[tuple[str, float]]]:
+        if self.scanner is None:
+            return super().tokenize_words(values)
+        return [self.scanner.scan_words(str(value)) for value in values]
+
     def tokenize(
         self,
         data: pd.DataFrame,
         col: str,
         token_column_name: str,
     ) -> pd.DataFrame:
+        if self.scanner is not None:
+            return self._scan(data, col, token_column_name)
+        return self._extract(data, col, token_column_name)
+
+    def _extract(
+        self,
+        data: pd.DataFrame,
+        col: str,
+        token_column_name: str,
+    ) -> pd.DataFrame:
+        """Extraction with deletion: one pass for every language and rule"""
+
         data[token_column_name] = [[] for _ in data.index]
 
         for language in self.languages:
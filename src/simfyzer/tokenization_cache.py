@@ -0,0 +1,96 @@
+import sys
+import numpy as np
+from pathlib import Path
+from typing import Callable
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.hashed_cache import HashedCache, key_hashes
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+
+
+class TokenizationCache(HashedCache):
+    """
+    On-disk cache of tokenization results: (word, weight) pairs of strings
+    (see HashedCache). Words of the cached tokens are kept once in a vocabulary.
+
+    - directory - directory of cache files
+    - key - tokenizer config key (see tokenizer.config_key)
+    """
+
+    PREFIX = "tokens"
+
+    def __init__(self, directory: str | Path, key: str) -> None:
+        self.tokens = TokenArrays([0], [], [])
+        self.words = TokenVocabulary()
+        super().__init__(directory, key)
+
+    def _load_payload(self, data: np.lib.npyio.NpzFile) -> None:
+        self.tokens = TokenArrays(data["offsets"], data["ids"], data["weights"])
+        words = data["words"].tobytes().decode("utf-8")
+        self.words = TokenVocabulary(words.split("\n") if words else [])
+
+    def _payload(self) -> dict[str, np.ndarray]:
+        words = "\n".join(self.words.values).encode("utf-8")
+        return {
+            "offsets": self.tokens.offsets,
+            "ids": self.tokens.ids,
+            "weights": self.tokens.weights,
+            "words": np.frombuffer(words, dtype=np.uint8),
+        }
+
+    def _pairs(self, position: int) -> list[tuple[str, float]]:
+        ids, weights = self.tokens.row(position)
+        return [
+            (self.words[word_id], weight)
+            for word_id, weight in zip(ids.tolist(), weights.tolist())
+        ]
+
+    def _add_payload(
+        self, rows: list[list[tuple[str, float]]], order: np.ndarray
+    ) -> None:
+        """Add rows of pairs (words shouldn't contain line breaks)"""
+
+        added = TokenArrays.from_pairs(rows, self.words)
+        tokens = TokenArrays(
+            np.concatenate(
+                [self.tokens.offsets, added.offsets[1:] + self.tokens.offsets[-1]]
+            ),
+            np.concatenate([self.tokens.ids, added.ids]),
+            np.concatenate([self.tokens.weights, added.weights]),
+        )
+        self.tokens = tokens.take(order)
+
+    def words_of(
+        self,
+        values: list[str],
+        tokenize: Callable[[list[str]], list[list[tuple[str, float]]]],
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Return (word, weight) pairs of every value: cached values are taken
+        from the cache, other values are tokenized by tokenize and cached.
+        """
+
+        keys = key_hashes([str(value) for value in values])
+        positions, found = self._find(keys)
+
+        rows = [None] * len(values)
+        for index in np.flatnonzero(found).tolist():
+            rows[index] = self._pairs(positions[index])
+
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            tokenized = tokenize([values[index] for index in missing.tolist()])
+            for index, pairs in zip(missing.tolist(), tokenized):
+                rows[index] = pairs
+
+            # words with line breaks can't be saved
+            cached = [
+                index
+                for index, pairs in enumerate(tokenized)
+                if not any("\n" in word for word, _ in pairs)
+            ]
+            self._add(keys[missing[cached]], [tokenized[index] for index in cached])
+
+        return rows
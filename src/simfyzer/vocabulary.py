@@ -0,0 +1,200 @@
+import numpy as np
+from typing import Iterable
+
+
+class TokenVocabulary(object):
+    """
+    Vocabulary of lowercase token values.
+    Every value is interned once and gets integer id.
+
+    - values - list of values (index is token id)
+    """
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: list[str] = []
+        self._ids: dict[str, int] = {}
+
+        for value in values:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, token_id: int) -> str:
+        return self.values[token_id]
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._ids
+
+    def intern(self, value: str) -> int:
+        token_id = self._ids.get(value)
+        if token_id is None:
+            token_id = len(self.values)
+            self._ids[value] = token_id
+            self.values.append(value)
+        return token_id
+
+    def get(self, value: str, default: int = -1) -> int:
+        return self._ids.get(value, default)
+
+    def lengths(self) -> np.ndarray:
+        """Return lengths of values by token id"""
+
+        return np.fromiter(map(len, self.values), dtype=np.int64, count=len(self))
+
+
+class TokenArrays(object):
+    """
+    CSR-style storage of tokens rows.
+    Tokens of row i are ids[offsets[i] : offsets[i + 1]]
+    with weights[offsets[i] : offsets[i + 1]].
+
+    - offsets - rows boundaries (len = rows + 1)
+    - ids - token ids in TokenVocabulary
+    - weights - custom weights of tokens
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        ids: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    @classmethod
+    def from_pairs(
+        cls,
+        rows: Iterable[list[tuple[str, float]]],
+        vocabulary: TokenVocabulary,
+    ) -> "TokenArrays":
+        """Create arrays from rows of (value, weight) pairs"""
+
+        offsets = [0]
+        ids = []
+        weights = []
+
+        for row in rows:
+            for value, weight in row:
+                ids.append(vocabulary.intern(value.lower()))
+                weights.append(abs(weight))
+            offsets.append(len(ids))
+
+        return cls(offsets, ids, weights)
+
+    @classmethod
+    def from_tokens(
+        cls,
+        rows: Iterable[list],
+        vocabulary: TokenVocabulary,
+    ) -> "TokenArrays":
+        """Create arrays from rows of Token objects"""
+
+        pairs = (
+            [(token.value, token.custom_weight) for token in tokens] for tokens in rows
+        )
+        return cls.from_pairs(pairs, vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def copy(self) -> "TokenArrays":
+        return TokenArrays(self.offsets.copy(), self.ids.copy(), self.weights.copy())
+
+    def row(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return self.ids[start:stop], self.weights[start:stop]
+
+    def rows(self, start: int, stop: int) -> "TokenArrays":
+        """Return arrays of rows from start to stop"""
+
+        begin, end = self.offsets[start], self.offsets[stop]
+        return TokenArrays(
+            self.offsets[start : stop + 1] - begin,
+            self.ids[begin:end],
+            self.weights[begin:end],
+        )
+
+    def positions(self, indices: np.ndarray) -> np.ndarray:
+        """Return positions of tokens of rows by indices"""
+
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = self.counts()[indices]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return np.arange(offsets[-1]) + np.repeat(
+            self.offsets[indices] - offsets[:-1], counts
+        )
+
+    def take(self, indices: np.ndarray) -> "TokenArrays":
+        """Return arrays of rows by indices (rows may repeat)"""
+
+        indices = np.asarray(indices, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(self.counts()[indices])])
+        positions = self.positions(indices)
+        return TokenArrays(offsets, self.ids[positions], self.weights[positions])
+
+    def put(self, indices: np.ndarray, rows: "TokenArrays") -> "TokenArrays":
+        """
+        Return copy of arrays where rows by indices are replaced by rows
+        (counts of tokens of replaced rows should be the same)
+        """
+
+        positions = self.positions(indices)
+        ids = self.ids.copy()
+        weights = self.weights.copy()
+        ids[positions] = rows.ids
+        weights[positions] = rows.weights
+        return TokenArrays(self.offsets, ids, weights)
+
+    def counts(self) -> np.ndarray:
+        """Return count of tokens in every row"""
+
+        return np.diff(self.offsets)
+
+    def rows_index(self) -> np.ndarray:
+        """Return row number for every token"""
+
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.counts())
+
+    def mask(self, keep: np.ndarray) -> "TokenArrays":
+        """Return arrays only with tokens where keep is True"""
+
+        kept = np.concatenate([[0], np.cumsum(keep, dtype=np.int64)])
+        return TokenArrays(kept[self.offsets], self.ids[keep], self.weights[keep])
+
+    def unique(self) -> "TokenArrays":
+        """Drop duplicated ids in every row (first one is kept)"""
+
+        if len(self.ids) == 0:
+            return self
+
+        key = self.rows_index() * (int(self.ids.max()) + 1) + self.ids
+        _, first = np.unique(key, return_index=True)
+
+        keep = np.zeros(len(self.ids), dtype=bool)
+        keep[first] = True
+        return self.mask(keep)
+
+    def to_pairs(
+        self,
+        vocabulary: TokenVocabulary,
+    ) -> list[list[tuple[str, float]]]:
+        """Return rows of (value, weight) pairs"""
+
+        values = vocabulary.values
+        weights = self.weights.tolist()
+        ids = self.ids.tolist()
+        offsets = self.offsets.tolist()
+
+        return [
+            [
+                (values[ids[position]], weights[position])
+                for position in range(offsets[index], offsets[index + 1])
+            ]
+            for index in range(len(self))
+        ]
+
+    def __repr__(self) -> str:
+        return f"<TokenArrays: rows {len(self)}, tokens {len(self.ids)}>"
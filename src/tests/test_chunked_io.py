@@ -0,0 +1,75 @@
+import os
+import sys
+import pandas as pd
+from pathlib import Path
+from openpyxl import Workbook
+
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.chunked_io import (
+    read_table,
+    read_chunks,
+    count_rows,
+    ChunkWriter,
+)
+from src.functool.file_preview import FilePreview
+from src.tests.common_test import CLIENT_PRODUCT, SOURCE_PRODUCT, FuzzyDataSet
+
+
+class TestTableFormats(object):
+    def test_round_trip(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:1000].reset_index(drop=True)
+        columns = [SOURCE_PRODUCT, CLIENT_PRODUCT]
+
+        for file_type in ["csv", "xlsx", "parquet", "feather"]:
+            path = tmp_path / f"data.{file_type}"
+            with ChunkWriter(path) as writer:
+                for start in range(0, len(data), 300):
+                    writer.write(data.iloc[start : start + 300])
+
+            assert read_table(path).equals(data)
+
+            chunks = list(read_chunks(path, 400, columns))
+            assert [len(chunk) for chunk in chunks] == [400, 400, 200]
+            assert pd.concat(chunks).equals(data[[CLIENT_PRODUCT, SOURCE_PRODUCT]])
+
+    def test_excel_equals_pandas(self, tmp_path):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["a", None, "c"])
+        sheet.append([1, "x", None])
+        sheet.append([None, None, None])
+        sheet.append([3.5, None, "y"])
+        sheet.cell(row=10, column=2).number_format = "0.00"
+        workbook.save(tmp_path / "data.xlsx")
+
+        expected = pd.read_excel(tmp_path / "data.xlsx")
+        data = read_table(tmp_path / "data.xlsx")
+        chunks = list(read_chunks(tmp_path / "data.xlsx", 2))
+
+        assert data.equals(expected)
+        assert pd.concat(chunks).infer_objects().equals(expected)
+        assert count_rows(tmp_path / "data.xlsx") == len(data)
+
+
+class TestFilePreview(object):
+    def test_file_preview(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:1000].reset_index(drop=True)
+        preview = FilePreview(rows=5)
+
+        for file_type in ["csv", "xlsx", "parquet", "feather"]:
+            path = tmp_path / f"data.{file_type}"
+            with ChunkWriter(path) as writer:
+                writer.write(data)
+
+            assert preview.preview(path).equals(data.iloc[:5])
+            assert preview.preview(path) is preview.preview(path)
+            assert preview.count_rows(path) == len(data)
+
+            with ChunkWriter(path) as writer:
+                writer.write(data.iloc[:300])
+            os.utime(path, ns=(0, 0))
+
+            assert preview.count_rows(path) == 300
@@ -0,0 +1,83 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+import cli
+from src.simfyzer.main import setup_SimFyzer
+from src.notation import JAKKAR
+from src.tests.common_test import (
+    FUZZY_CONFIG,
+    CLIENT_PRODUCT,
+    IS_EQUAL,
+    SOURCE_PRODUCT,
+    FuzzyDataSet,
+)
+
+
+class TestCLI(object):
+    def test_simfyzer(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:500]
+        data.to_csv(tmp_path / "input.csv", index=False)
+        expected = setup_SimFyzer(FUZZY_CONFIG, 0.75, 0.5).validate(
+            data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT
+        )
+
+        code = cli.main(
+            [
+                "simfyzer",
+                "-i",
+                str(tmp_path / "input.csv"),
+                "-o",
+                str(tmp_path / "output.csv"),
+                "--client-column",
+                CLIENT_PRODUCT,
+                "--source-column",
+                SOURCE_PRODUCT,
+                "--workers",
+                "1",
+            ]
+        )
+        output = pd.read_csv(tmp_path / "output.csv")
+
+        assert code == 0
+        assert output[JAKKAR.VALIDATED].tolist() == (
+            expected[JAKKAR.VALIDATED].tolist()
+        )
+
+        wrong_file = ["-i", str(tmp_path / "input.txt")]
+        columns = ["--client-column", "a", "--source-column", "b"]
+        assert cli.main(["simfyzer", *wrong_file, *columns]) == 1
+
+        chunks = ["-i", str(tmp_path / "input.csv"), "--chunk-size", "100"]
+        columns = ["--client-column", CLIENT_PRODUCT, "--source-column", SOURCE_PRODUCT]
+        assert cli.main(["simfyzer", *chunks, *columns, "--decision-only"]) == 1
+
+    def test_simfyzer_parquet(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:500]
+        data.to_parquet(tmp_path / "input.parquet", index=False)
+
+        code = cli.main(
+            [
+                "simfyzer",
+                "-i",
+                str(tmp_path / "input.parquet"),
+                "-o",
+                str(tmp_path / "output.feather"),
+                "--client-column",
+                CLIENT_PRODUCT,
+                "--source-column",
+                SOURCE_PRODUCT,
+                "--workers",
+                "1",
+                "--only-columns",
+            ]
+        )
+        output = pd.read_feather(tmp_path / "output.feather")
+
+        assert code == 0
+        assert IS_EQUAL not in output.columns
+        assert output[CLIENT_PRODUCT].tolist() == data[CLIENT_PRODUCT].tolist()
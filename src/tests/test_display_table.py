@@ -0,0 +1,42 @@
+import sys
+import numpy as np
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_DIR))
+
+from src.functool.display_table import DisplayTable
+from src.tests.common_test import CLIENT_PRODUCT, FuzzyDataSet
+
+
+class TestDisplayTable(object):
+    def test_cells(self):
+        data = FuzzyDataSet.small().iloc[100:1100]
+        table = DisplayTable(data, block_size=64, cache_blocks=4)
+
+        for row in [0, 63, 64, 500, 999, 3]:
+            for column in range(data.shape[1]):
+                assert table.cell(row, column) == str(data.iloc[row, column])
+            assert table.row_label(row) == str(data.index[row])
+
+        assert len(table._blocks) == 4
+
+    def test_sort_filter(self):
+        data = FuzzyDataSet.small().iloc[:1000].reset_index(drop=True)
+        table = DisplayTable(data)
+        column = data.columns.get_loc(CLIENT_PRODUCT)
+
+        table.set_order(table.sorted_order(column, descending=True))
+        expected = data[CLIENT_PRODUCT].sort_values(ascending=False, kind="stable")
+        assert [table.cell(row, column) for row in range(len(table))] == (
+            expected.astype(str).tolist()
+        )
+
+        text = data[CLIENT_PRODUCT].iloc[0].split()[0].upper()
+        table.set_order(table.filtered_order(text))
+        expected = [
+            data[name].astype(str).str.contains(text, case=False, regex=False)
+            for name in data.columns
+        ]
+        assert len(table) == np.logical_or.reduce(expected).sum() > 0
@@ -25,6 +25,7 @@ from src.feature_flow.main import (
     FeatureGenerator,
     FEATURES,
 )
+from src.functool.compiled_config import compile_config
 
 
 class BaseTestFeatureFlow(object):
@@ -80,6 +81,20 @@ class TestFeatureFlowCustom(BaseTestFeatureFlow):
         self.run_validation_test(data, self.validator())
 
 
+class TestFeatureFlowCompiledConfig(BaseTestFeatureFlow):
+    def validator(self):
+        features = compile_config(MEASURES_CONFIG).features()
+        return FeatureFlow(
+            CLIENT_PRODUCT,
+            SOURCE_PRODUCT,
+            features,
+        )
+
+    def test_compiled_feature_validation(self):
+        data = CustomFeatureFlowData.get_data()
+        self.run_validation_test(data, self.validator())
+
+
 class FeatureFlowGenericsTestsDebug(TestFeatureFlowGenerics):
     def __init__(self) -> None:
         super().__init__()
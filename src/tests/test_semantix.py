@@ -1,8 +1,11 @@
 import sys
+import copy
 import pytest
+import multiprocessing
 import regex as re
 import pandas as pd
 from pathlib import Path
+from decimal import Decimal
 
 
 PROJECT_DIR = Path(__file__).parent.parent.parent
@@ -11,6 +14,7 @@ sys.path.append(str(PROJECT_DIR))
 from common_test import (
     NumericDataSet,
     StringDataSet,
+    FuzzyDataSet,
     UncreationDataSet,
     CLIENT_PRODUCT,
     SOURCE_PRODUCT,
@@ -22,6 +26,19 @@ from common_test import (
     DataTypes,
 )
 from src.semantix.measures_extraction import MeasureExtractor, MeasuresExtractor
+from src.semantix.common import Measures, MeasuresGracefullExit
+from src.semantix.regex_cache import RegexCache
+from src.semantix.cross_semantic import (
+    CrosserPro,
+    LanguageRules,
+    CrosserGracefullExit,
+)
+from src.functool.compiled_config import (
+    CompiledConfig,
+    ConfigGracefullExit,
+    compile_config,
+    config_key,
+)
 from custom_data import CustomData, CustomUncreationData
 
 EMPTY = "_test_empty"
@@ -247,6 +264,246 @@ class TestSemantixUncreation(BaseTestSemantix):
         )
 
 
+class TestUnitsScanner(BaseTestSemantix):
+    def test_equals_units_extract(self):
+        data = pd.concat([NumericDataSet.all(), StringDataSet.all()])
+        strings = ("  " + data[SOURCE_PRODUCT].astype(str) + "  ").tolist()
+        strings += ["", "1 л\n2 л", "№10 5 шт 3 упак"]
+
+        measures = Measures(MEASURES_CONFIG)
+        extracted = measures.scanner.scan(strings)
+
+        assert len(extracted) == len(measures.scanner.units) > 0
+        for unit, values in zip(measures.scanner.units, extracted):
+            assert values == unit.extract(strings)
+
+
+class TestUnitsConverter(BaseTestSemantix):
+    def test_decimal_comma_and_zero(self):
+        data = pd.DataFrame({CLIENT_PRODUCT: ["Вода 0,5 л", "Вода 0 л"]})
+        data = MeasuresExtractor(MEASURES_CONFIG).extract(data, CLIENT_PRODUCT)
+
+        regex = data["Regex"].tolist()
+        assert re.search(regex[0], "  вода 500 мл  ", flags=re.IGNORECASE)
+        assert not re.search(regex[0], "  вода 5 л  ", flags=re.IGNORECASE)
+        assert re.search(regex[1], "  вода 0 мл  ", flags=re.IGNORECASE)
+
+    def test_cache_size(self):
+        measure = Measures(MEASURES_CONFIG)["Объем"]
+        converter = measure.converter
+        converter.cache_size = 3
+        unit = measure.units[0]
+
+        expected = [converter.to_regex(unit, Decimal(value)) for value in range(5)]
+        assert len(converter._cache) == 3
+        assert [
+            converter.to_regex(unit, Decimal(value)) for value in range(5)
+        ] == expected
+        assert converter.to_regex(unit, Decimal("1.50")) == converter.to_regex(
+            unit, Decimal("1.5")
+        )
+
+
+class TestConcatRegex(BaseTestSemantix):
+    def test_concat(self):
+        data = pd.DataFrame({CLIENT_PRODUCT: ["  5 шт 1 кг  ", "  1 кг  ", "  x  "]})
+        measures = Measures(MEASURES_CONFIG)
+        data = measures.extract_all(data, CLIENT_PRODUCT)
+
+        exclude = [name for name in measures.used_units_names if "Исключ." in name]
+        units = [name for name in measures.used_units_names if name not in exclude]
+        expected = []
+        for _, row in data.iterrows():
+            regex = "^" if any(row[name] for name in exclude) else ""
+            for name in exclude:
+                regex += row[name].replace("^(?!.*(", "(?!.*(", 1)
+            expected.append(regex + "".join(row[name] for name in units))
+
+        data = measures.concat_regex(data, delete_units_columns=True)
+        assert data["Regex"].tolist() == expected
+        assert list(data.columns) == [CLIENT_PRODUCT] + exclude + ["Regex"]
+        assert [bool(value) for value in data[exclude[0]]] == [False, True, True]
+
+
+class TestUniqueNames(BaseTestSemantix):
+    def data(self) -> pd.DataFrame:
+        data = pd.concat([NumericDataSet.all(), StringDataSet.all()])
+        data = data[[SOURCE_PRODUCT]].astype(str)
+        return pd.concat([data, data.iloc[::-1]], ignore_index=True)
+
+    def test_equals_rows(self):
+        data = self.data()
+
+        expected = data.copy()
+        expected[SOURCE_PRODUCT] = "  " + expected[SOURCE_PRODUCT] + "  "
+        measures = Measures(MEASURES_CONFIG)
+        expected = measures.extract_all(expected, SOURCE_PRODUCT)
+        expected = measures.concat_regex(expected)
+        expected[SOURCE_PRODUCT] = expected[SOURCE_PRODUCT].str.strip()
+
+        extracted = MeasuresExtractor(MEASURES_CONFIG).extract(
+            data.copy(), SOURCE_PRODUCT
+        )
+        assert extracted.equals(expected)
+
+    def test_cache(self, tmp_path):
+        data = self.data()
+        expected = MeasuresExtractor(MEASURES_CONFIG).extract(
+            data.copy(), SOURCE_PRODUCT
+        )
+
+        extractor = MeasuresExtractor(MEASURES_CONFIG, regex_cache=tmp_path)
+        assert extractor.extract(data.copy(), SOURCE_PRODUCT).equals(expected)
+
+        cache = RegexCache(tmp_path, extractor.config_key())
+        assert len(cache) == data[SOURCE_PRODUCT].nunique()
+
+        called = []
+        extract_all = extractor.enginge.extract_all
+
+        def extract_counted(data: pd.DataFrame, column: str) -> pd.DataFrame:
+            called.append(len(data))
+            return extract_all(data, column)
+
+        extractor.enginge.extract_all = extract_counted
+        assert extractor.extract(data.copy(), SOURCE_PRODUCT).equals(expected)
+
+        new_data = pd.concat(
+            [data.iloc[:10], pd.DataFrame({SOURCE_PRODUCT: ["Вода 0.5 л новая"]})],
+            ignore_index=True,
+        )
+        extracted = extractor.extract(new_data.copy(), SOURCE_PRODUCT)
+        new_expected = MeasuresExtractor(MEASURES_CONFIG).extract(
+            new_data.copy(), SOURCE_PRODUCT
+        )
+        assert extracted.equals(new_expected)
+        assert called == [1]
+
+
+class TestCompiledConfig(BaseTestSemantix):
+    def test_equals_config(self, tmp_path):
+        data = pd.concat([NumericDataSet.all(), StringDataSet.all()])
+        data = data[[SOURCE_PRODUCT]].astype(str)
+        expected = MeasuresExtractor(MEASURES_CONFIG).extract(
+            data.copy(), SOURCE_PRODUCT
+        )
+
+        compiled = compile_config(MEASURES_CONFIG, tmp_path)
+        assert list(tmp_path.iterdir()) == [tmp_path / f"measures_{compiled.key}.pkl"]
+
+        loaded = compile_config(MEASURES_CONFIG, tmp_path)
+        for config in [compiled, loaded]:
+            extractor = MeasuresExtractor(config)
+            assert extractor.extract(data.copy(), SOURCE_PRODUCT).equals(expected)
+            assert (
+                extractor.config_key()
+                == MeasuresExtractor(MEASURES_CONFIG).config_key()
+            )
+
+    def test_wrong_config(self):
+        config = copy.deepcopy(MEASURES_CONFIG)
+        del config["numeric_measures"]["measures"][0]["measure_data"]["units"][0][
+            "symbol"
+        ]
+        with pytest.raises(ConfigGracefullExit, match="symbol"):
+            CompiledConfig(config)
+
+        config = copy.deepcopy(MEASURES_CONFIG)
+        config["numeric_measures"]["measures"][0]["measure_data"]["units"][0][
+            "symbol"
+        ] = "мл|(мг"
+        with pytest.raises(ConfigGracefullExit, match="regex"):
+            CompiledConfig(config)
+
+    def test_built_once(self):
+        compiled = CompiledConfig(MEASURES_CONFIG)
+        first, second = compiled.measures(), compiled.measures()
+        first.stop_callback()
+
+        assert first.measures is second.measures
+        assert not second._stopped
+        assert compiled.features() is compiled.features()
+
+    def test_stale_artifact(self, tmp_path):
+        path = tmp_path / f"measures_{config_key(MEASURES_CONFIG)}.pkl"
+        path.write_bytes(b"c_removed_module\nCompiledConfig\n.")
+
+        assert CompiledConfig.load(path) is None
+        assert compile_config(MEASURES_CONFIG, tmp_path).config == MEASURES_CONFIG
+        assert CompiledConfig.load(path) is not None
+
+
+class TestProcessPool(BaseTestSemantix):
+    def test_measures_pool_equals_sequential(self, monkeypatch):
+        monkeypatch.setattr(MeasuresExtractor, "BLOCK_SIZE", 100)
+        data = pd.concat([NumericDataSet.all(), StringDataSet.all()])
+        data = data[[SOURCE_PRODUCT]].astype(str).reset_index(drop=True)
+
+        sequential = MeasuresExtractor(MEASURES_CONFIG).extract(
+            data.copy(), SOURCE_PRODUCT
+        )
+        with multiprocessing.Pool(2) as process_pool:
+            pooled = MeasuresExtractor(MEASURES_CONFIG).extract(
+                data.copy(), SOURCE_PRODUCT, process_pool=process_pool
+            )
+
+        assert sequential.equals(pooled)
+
+    def crosser(self) -> CrosserPro:
+        rules = [
+            LanguageRules(
+                language,
+                check_letters=True,
+                with_numbers=True,
+                min_lenght=3,
+                stemming=True,
+                symbols="",
+            )
+            for language in ["russian", "english"]
+        ]
+        return CrosserPro(rules, delete_rx=True, process_nearest=250)
+
+    def test_crosser_pool_equals_sequential(self):
+        data = FuzzyDataSet.small()[[CLIENT_PRODUCT]].iloc[:1000].copy()
+        data = MeasuresExtractor(MEASURES_CONFIG).extract(data, CLIENT_PRODUCT)
+
+        sequential = self.crosser().extract(data.copy(), CLIENT_PRODUCT)
+        with multiprocessing.Pool(2) as process_pool:
+            pooled = self.crosser().extract(data.copy(), CLIENT_PRODUCT, process_pool)
+
+        assert sequential.equals(pooled)
+
+    def test_stop(self, monkeypatch):
+        monkeypatch.setattr(MeasuresExtractor, "BLOCK_SIZE", 100)
+        data = pd.concat([NumericDataSet.all(), StringDataSet.all()])
+        data = data[[SOURCE_PRODUCT]].astype(str).reset_index(drop=True)
+        crosser = self.crosser()
+
+        def progress_callback(progress: int) -> None:
+            if progress > 0:
+                extractor.stop_callback()
+                crosser.stop_callback()
+
+        extractor = MeasuresExtractor(
+            MEASURES_CONFIG, progress_callback=progress_callback
+        )
+        crosser.progress_callback = progress_callback
+
+        with multiprocessing.Pool(2) as process_pool:
+            with pytest.raises(MeasuresGracefullExit):
+                extractor.extract(
+                    data.copy(), SOURCE_PRODUCT, process_pool=process_pool
+                )
+            # no tasks are left in the pool after stop
+            assert not process_pool._cache
+
+            data = FuzzyDataSet.small()[[CLIENT_PRODUCT]].iloc[:3000].copy()
+            data = MeasuresExtractor(MEASURES_CONFIG).extract(data, CLIENT_PRODUCT)
+            with pytest.raises(CrosserGracefullExit):
+                crosser.extract(data, CLIENT_PRODUCT, process_pool)
+            assert not process_pool._cache
+
+
 class AutosemUncreationTestsDebug(TestSemantixUncreation):
     def __init__(self) -> None:
         super().__init__()
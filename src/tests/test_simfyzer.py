@@ -1,10 +1,14 @@
 import sys
+import random
 import pytest
 import time
 import multiprocessing
 import regex as re
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from fuzzywuzzy import process as fuzz_process
+from rapidfuzz import process
 
 import cProfile
 
@@ -12,8 +16,22 @@ import cProfile
 PROJECT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(PROJECT_DIR))
 
-from src.simfyzer.main import setup_SimFyzer, SimFyzer
-from src.notation import JAKKAR
+from src.simfyzer.main import setup_SimFyzer, SimFyzer, SimFyzerGracefullExit
+from src.simfyzer.tokenization import Token
+from src.simfyzer.vocabulary import TokenVocabulary, TokenArrays
+from src.simfyzer.ratio import MarksCounter, MarksMode, RateFunction
+from src.simfyzer.fuzzy_scorer import FuzzyScorer, setup_scorer
+from src.simfyzer.fuzzy_search import FuzzyMode
+from src.simfyzer.canonicalization import VocabularyCanonicalizer
+from src.simfyzer.candidates import CandidateIndex, CandidateMode
+from src.simfyzer.minhash import MinHashIndex
+from src.simfyzer.ratio_store import TokenRatioStore, RatioStoreMode
+from src.simfyzer.tokenization_cache import TokenizationCache
+from src.functool.bk_tree import BKTree, EditMetric
+from src.functool.shared_arrays import SharedArrays
+from src.functool.task_window import TaskWindow
+from src.notation import JAKKAR, SWEEP
+from config.simfyzer_config.config_parser import CONFIG, RATIO
 from src.tests.common_test import (
     FUZZY_CONFIG,
     CLIENT_PRODUCT,
@@ -80,6 +98,667 @@ class TestFuzzyVGenerics(BaseTestFuzzyV):
         )
 
 
+class TestTokenScanner(BaseTestFuzzyV):
+    def tokens_values(self, tokens: list[list[Token]]) -> list:
+        return [[(t.original_value, t.custom_weight) for t in row] for row in tokens]
+
+    def test_scanner_equals_extraction(self):
+        data = FuzzyDataSet.small()
+        data.loc[len(data)] = [
+            "ВОДА вода Вода 10 10kg abc_def АбВ aBC Ёлка мixed XYZ-abc",
+            "Coca-Cola 0.5л, 1.5L; iPhone 13 Pro 128GB",
+            False,
+        ]
+        tokenizer = self.validator().tokenizer
+
+        for column in [CLIENT_PRODUCT, SOURCE_PRODUCT]:
+            extracted = tokenizer._extract(data[[column]].copy(), column, "tokens")
+            scanned = tokenizer._scan(data[[column]].copy(), column, "tokens")
+
+            assert self.tokens_values(extracted["tokens"]) == self.tokens_values(
+                scanned["tokens"]
+            )
+
+
+class TestMarksArrays(BaseTestFuzzyV):
+    def test_marks_arrays_equal_sets(self):
+        vocabulary = TokenVocabulary()
+        left = TokenArrays.from_pairs(
+            [[("a", 1), ("b", 0.5), ("c", 2)], [("a", 3)], [], [("x", 1)]],
+            vocabulary,
+        )
+        right = TokenArrays.from_pairs(
+            [[("a", 2), ("c", 1)], [("a", 0.5), ("b", 1)], [("a", 1)], []],
+            vocabulary,
+        )
+        # dyadic rates: sums are exact in any order of set iteration
+        ratio = {"a": 0.25, "b": 0.5, "c": 0.125, "x": 0.75}
+
+        data = pd.DataFrame(index=range(len(left)))
+        for column, tokens in [("left", left), ("right", right)]:
+            data[column] = [
+                set(Token(value, weight) for value, weight in row)
+                for row in tokens.to_pairs(vocabulary)
+            ]
+
+        counter = MarksCounter(MarksMode.MULTIPLE)
+        expected = counter.count_marks(ratio, data.copy(), "left", "right")
+        result = counter.count_marks_arrays(ratio, vocabulary, data.copy(), left, right)
+
+        for mode in [MarksMode.UNION, MarksMode.CLIENT, MarksMode.SOURCE]:
+            assert expected[mode].to_list() == result[mode].to_list()
+
+
+class TestFuzzyScorer(BaseTestFuzzyV):
+    def test_wratio_equals_extract_one(self):
+        generator = random.Random(0)
+        symbols = "abcdeklmnorst" + "абвгде" + "1-_ "
+        word = lambda: "".join(
+            generator.choice(symbols) for _ in range(generator.randint(1, 14))
+        )
+
+        rows = []
+        for _ in range(200):
+            queries = [word() for _ in range(generator.randint(0, 5))]
+            choices = [word() for _ in range(generator.randint(0, 6))]
+            choices += [q[: generator.randint(1, len(q))] for q in queries[:2]]
+            rows.append((queries, choices))
+
+        scorer = setup_scorer(FuzzyScorer.WRATIO)
+        for threshold in [0, 60, 75, 90]:
+            expected = []
+            offset = 0
+            for queries, choices in rows:
+                for query in queries:
+                    value, score = fuzz_process.extractOne(query, choices)
+                    if score >= threshold:
+                        expected.append(offset + choices.index(value))
+                    else:
+                        expected.append(-1)
+                offset += len(choices)
+
+            matches = scorer.best_matches(
+                [scorer.process(q) for queries, _ in rows for q in queries],
+                [len(queries) for queries, _ in rows],
+                [scorer.process(c) for _, choices in rows for c in choices],
+                [len(choices) for _, choices in rows],
+                threshold,
+            )
+            # extractOne returns value: take its first position
+            result = []
+            offset = 0
+            for queries, choices in rows:
+                for index in matches[len(result) : len(result) + len(queries)]:
+                    if index >= 0:
+                        index = offset + choices.index(choices[index - offset])
+                    result.append(index)
+                offset += len(choices)
+
+            assert expected == result
+
+
+class TestBKTree(object):
+    def words(self) -> list[str]:
+        generator = random.Random(1)
+        return [
+            "".join(generator.choice("абвгдеж") for _ in range(generator.randint(1, 8)))
+            for _ in range(500)
+        ]
+
+    def test_within_equals_brute_force(self):
+        words = self.words()
+        for metric in [EditMetric.LEVENSHTEIN, EditMetric.INDEL]:
+            tree = BKTree(words[:250], metric=metric)
+            tree.extend(words[250:])
+            distance = EditMetric.metrics[metric].distance
+            similarity = EditMetric.metrics[metric].normalized_similarity
+
+            for query in ["абв", "гдежа", "ж"]:
+                expected = sorted(
+                    (distance(query, word), tree.words.index(word))
+                    for word in set(words)
+                    if distance(query, word) <= 2
+                )
+                result = [(d, word_id) for _, d, word_id in tree.within(query, 2)]
+                assert expected == result
+
+                best = max(tree.words, key=lambda word: similarity(query, word))
+                assert tree.best_match(query, 50)[0] == best
+
+    def test_save_load(self, tmp_path):
+        tree = BKTree(self.words(), metric=EditMetric.INDEL)
+        tree.save(tmp_path / "tree.json")
+
+        loaded = BKTree.load(tmp_path / "tree.json")
+        loaded.insert("абвгдежабв")
+
+        assert loaded.words[:-1] == tree.words
+        assert loaded.within("абв", 3)[:10] == tree.within("абв", 3)[:10]
+        assert loaded.best_match("абвгдежаб", 90)[0] == "абвгдежабв"
+
+
+class TestVocabularyCanonicalizer(BaseTestFuzzyV):
+    def test_clusters(self):
+        scorer = setup_scorer(FuzzyScorer.RATIO)
+        strings = ["абхазкий", "абхазский", "грейпфрут", "грейпфрукт", "вода"]
+        counts = np.array([1, 5, 3, 3, 1])
+
+        for use_index in [False, True]:
+            canonicalizer = VocabularyCanonicalizer(
+                scorer, 75, block_cells=4, use_index=use_index
+            )
+            clusters = canonicalizer.clusters(strings, counts)
+
+            assert clusters.tolist() == [1, 1, 2, 2, 4]
+
+    def test_global_mode_scored_pairs(self, monkeypatch):
+        generator = random.Random(5)
+        letters = "абвгдежзиклмнопрстуфхцчшэюя"
+        words = {
+            "".join(generator.choices(letters, k=generator.randint(3, 12)))
+            for _ in range(500)
+        }
+        vocabulary = TokenVocabulary(sorted(words))
+        counts = np.ones(len(vocabulary), dtype=np.int64)
+
+        cdist = process.cdist
+        scored = []
+
+        def counting_cdist(queries, choices, **kwargs):
+            scored.append(len(queries) * len(choices))
+            return cdist(queries, choices, **kwargs)
+
+        monkeypatch.setattr(process, "cdist", counting_cdist)
+        validator = setup_SimFyzer(
+            FUZZY_CONFIG,
+            fuzzy_threshold=0.75,
+            validation_threshold=0.5,
+            fuzzy_mode=FuzzyMode.GLOBAL,
+        )
+        canonical = validator.fuzzy.canonical_ids(vocabulary, counts)
+        assert sum(scored) < len(vocabulary) ** 2
+
+        monkeypatch.setattr(process, "cdist", cdist)
+        canonicalizer = VocabularyCanonicalizer(setup_scorer(FuzzyScorer.RATIO), 75)
+        clusters = canonicalizer.clusters(vocabulary.values, counts)
+        assert canonical.tolist() == clusters.tolist()
+
+    def test_global_mode(self):
+        data = FuzzyDataSet.small()
+        validator = setup_SimFyzer(
+            FUZZY_CONFIG,
+            fuzzy_threshold=0.75,
+            validation_threshold=0.5,
+            fuzzy_mode=FuzzyMode.GLOBAL,
+        )
+        data = validator.validate(data, CLIENT_PRODUCT, SOURCE_PRODUCT)
+        assert self.checkout(data)
+
+
+class TestCandidateIndex(BaseTestFuzzyV):
+    def tokens(self, generator: random.Random, rows: int) -> TokenArrays:
+        pairs = [
+            [(str(generator.randint(0, 30)), 1) for _ in range(generator.randint(0, 6))]
+            for _ in range(rows)
+        ]
+        return TokenArrays.from_pairs(pairs, self.vocabulary)
+
+    def test_candidates_equal_brute_force(self):
+        generator = random.Random(2)
+        self.vocabulary = TokenVocabulary(str(value) for value in range(31))
+        client_tokens = self.tokens(generator, 40).unique()
+        source_tokens = self.tokens(generator, 200).unique()
+        ratio_by_id = np.array([2.0 ** -generator.randint(0, 4) for _ in range(31)])
+
+        expected = []
+        for row in range(len(client_tokens)):
+            client_ids = set(client_tokens.row(row)[0].tolist())
+            scores = []
+            for source in range(len(source_tokens)):
+                common = client_ids & set(source_tokens.row(source)[0].tolist())
+                scores.append((-ratio_by_id[list(common)].sum(), source))
+            expected += [(row, source) for score, source in sorted(scores)[:3] if score]
+
+        for dense_ratio in [0, 10**6]:
+            index = CandidateIndex(source_tokens, ratio_by_id, chunk_postings=50)
+            index.dense_ratio = dense_ratio
+            client_rows, source_rows, _ = index.candidates(client_tokens, 3)
+            assert list(zip(client_rows.tolist(), source_rows.tolist())) == expected
+
+    def test_match(self):
+        data = FuzzyDataSet.small()
+        client_data = data[[CLIENT_PRODUCT]].drop_duplicates().iloc[:300]
+        source_data = data[[SOURCE_PRODUCT]].sample(frac=1, random_state=0)
+        source_data = pd.concat(
+            [source_data, client_data.set_axis([SOURCE_PRODUCT], axis=1)]
+        )
+
+        for candidate_mode in [CandidateMode.POSTINGS, CandidateMode.MINHASH]:
+            matched = self.validator().match(
+                client_data,
+                source_data,
+                CLIENT_PRODUCT,
+                SOURCE_PRODUCT,
+                top_k=3,
+                candidate_mode=candidate_mode,
+            )
+            best = matched[matched[JAKKAR.CANDIDATE_RANK] == 1]
+
+            assert len(best) == len(client_data)
+            assert (best[CLIENT_PRODUCT] == best[SOURCE_PRODUCT]).all()
+            assert (best[MarksMode.UNION] == 1).all()
+            assert (matched[JAKKAR.CANDIDATE_RANK] <= 3).all()
+
+
+class TestMinHashIndex(object):
+    def tokens(self) -> tuple[TokenVocabulary, TokenArrays]:
+        generator = random.Random(3)
+        rows = [
+            [
+                (str(generator.randint(0, 300)), 1)
+                for _ in range(generator.randint(0, 8))
+            ]
+            for _ in range(1000)
+        ]
+        # near-duplicates of the first 200 rows: the last token is replaced
+        rows += [row[:-1] + [("x", 1)] for row in rows[:200]]
+
+        vocabulary = TokenVocabulary()
+        return vocabulary, TokenArrays.from_pairs(rows, vocabulary).unique()
+
+    def jaccard(self, tokens: TokenArrays, left: int, right: int) -> float:
+        left = set(tokens.row(left)[0].tolist())
+        right = set(tokens.row(right)[0].tolist())
+        return len(left & right) / max(len(left | right), 1)
+
+    def test_duplicates(self):
+        vocabulary, tokens = self.tokens()
+        index = MinHashIndex(permutations=64, bands=16, chunk_cells=2**10)
+        index.fit(index.minhash(vocabulary, tokens))
+
+        left, right, similarity = index.duplicates(threshold=0.5)
+        found = set(zip(left.tolist(), right.tolist()))
+
+        assert (left < right).all()
+        assert (similarity >= 0.5).all()
+        for original in range(200):
+            if self.jaccard(tokens, original, original + 1000) >= 0.7:
+                assert (original, original + 1000) in found
+
+    def test_save_load(self, tmp_path):
+        vocabulary, tokens = self.tokens()
+        index = MinHashIndex(permutations=32, bands=8)
+        index.fit(index.minhash(vocabulary, tokens))
+        index.save(tmp_path / "minhash.npz")
+
+        loaded = MinHashIndex.load(tmp_path / "minhash.npz")
+        queries = TokenArrays.from_pairs([[("x", 1), ("7", 1)], []], vocabulary)
+
+        assert loaded.bands == 8
+        assert (loaded.signatures == index.signatures).all()
+        assert [
+            rows.tolist() for rows in loaded.candidates(vocabulary, queries, 5)
+        ] == [rows.tolist() for rows in index.candidates(vocabulary, queries, 5)]
+
+
+class TestValidateFile(BaseTestFuzzyV):
+    def test_equals_validate(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:3000]
+        columns = [MarksMode.UNION, MarksMode.CLIENT, MarksMode.SOURCE]
+
+        for file_type in ["csv", "xlsx"]:
+            input_path = tmp_path / f"input.{file_type}"
+            output_path = tmp_path / f"output.{file_type}"
+            if file_type == "csv":
+                data.to_csv(input_path, index=False)
+            else:
+                data.to_excel(input_path, index=False)
+
+            for fuzzy_mode in [FuzzyMode.PAIRWISE, FuzzyMode.GLOBAL]:
+                validator = setup_SimFyzer(
+                    FUZZY_CONFIG, 0.75, 0.5, fuzzy_mode=fuzzy_mode
+                )
+                expected = validator.validate(
+                    data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT
+                )
+
+                validator = setup_SimFyzer(
+                    FUZZY_CONFIG, 0.75, 0.5, fuzzy_mode=fuzzy_mode
+                )
+                validator.validate_file(
+                    input_path,
+                    output_path,
+                    CLIENT_PRODUCT,
+                    SOURCE_PRODUCT,
+                    chunk_size=700,
+                )
+                if file_type == "csv":
+                    result = pd.read_csv(output_path)
+                else:
+                    result = pd.read_excel(output_path)
+
+                assert list(result.columns) == list(expected.columns)
+                assert np.allclose(result[columns], expected[columns])
+                assert (result[JAKKAR.VALIDATED] == expected[JAKKAR.VALIDATED]).all()
+
+
+class TestTokenRatioStore(BaseTestFuzzyV):
+    def test_update_load(self, tmp_path):
+        store = TokenRatioStore(tmp_path / "store")
+        store.update(TokenVocabulary(["b", "a", "c"]), np.array([1, 2, 0]))
+        store.update(TokenVocabulary(["d", "a"]), np.array([4, 3]))
+
+        loaded = TokenRatioStore(tmp_path / "store")
+        counts = loaded.counts(TokenVocabulary(["a", "b", "c", "d", "e"]))
+
+        assert loaded.updates == 2
+        assert len(loaded) == 3
+        assert counts.tolist() == [5, 1, 0, 4, 0]
+
+    def test_store_ratio(self, tmp_path):
+        data = FuzzyDataSet.small()
+        sample = data.iloc[:1000]
+
+        validator = setup_SimFyzer(
+            FUZZY_CONFIG,
+            0.75,
+            0.5,
+            ratio_store=tmp_path / "store",
+            update_ratio_store=True,
+        )
+        validator.validate(data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+        corpus_ratio = validator.ratio
+
+        validator = setup_SimFyzer(
+            FUZZY_CONFIG,
+            0.75,
+            0.5,
+            ratio_store=tmp_path / "store",
+            ratio_store_mode=RatioStoreMode.STORE,
+        )
+        validator.validate(sample.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+
+        assert TokenRatioStore(tmp_path / "store").updates == 1
+        assert validator.ratio == {
+            value: corpus_ratio[value] for value in validator.ratio
+        }
+
+
+class TestTokenizationCache(BaseTestFuzzyV):
+    def test_unique_equals_rows(self):
+        data = FuzzyDataSet.small().iloc[:500]
+        data = pd.concat([data, data.iloc[::-1]], ignore_index=True)
+        tokenizer = self.validator().tokenizer
+
+        for scanner in [tokenizer.scanner, None]:
+            tokenizer.scanner = scanner
+            rows = [
+                tokenizer.tokenize_words([value])[0] for value in data[CLIENT_PRODUCT]
+            ]
+
+            expected_vocabulary = TokenVocabulary()
+            expected = TokenArrays.from_pairs(rows, expected_vocabulary)
+            vocabulary = TokenVocabulary()
+            tokens = tokenizer.tokenize_arrays(data, CLIENT_PRODUCT, vocabulary)
+
+            assert vocabulary.values == expected_vocabulary.values
+            assert tokens.offsets.tolist() == expected.offsets.tolist()
+            assert tokens.ids.tolist() == expected.ids.tolist()
+            assert tokens.weights.tolist() == expected.weights.tolist()
+
+    def test_cache(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:1000]
+        tokenizer = self.validator().tokenizer
+
+        cache = TokenizationCache(tmp_path, tokenizer.config_key())
+        first = tokenizer.tokenize_arrays(data, CLIENT_PRODUCT, TokenVocabulary())
+        cached = tokenizer.tokenize_arrays(
+            data, CLIENT_PRODUCT, TokenVocabulary(), cache=cache
+        )
+        cache.save()
+
+        loaded = TokenizationCache(tmp_path, tokenizer.config_key())
+        called = []
+        tokenize_words = tokenizer.tokenize_words
+
+        def tokenize_counted(values: list) -> list:
+            called.append(values)
+            return tokenize_words(values)
+
+        tokenizer.tokenize_words = tokenize_counted
+        vocabulary = TokenVocabulary()
+        second = tokenizer.tokenize_arrays(
+            data, CLIENT_PRODUCT, vocabulary, cache=loaded
+        )
+
+        assert len(loaded) == data[CLIENT_PRODUCT].nunique()
+        assert called == []
+        for tokens in [cached, second]:
+            assert tokens.offsets.tolist() == first.offsets.tolist()
+            assert tokens.ids.tolist() == first.ids.tolist()
+            assert tokens.weights.tolist() == first.weights.tolist()
+
+    def test_validate(self, tmp_path):
+        data = FuzzyDataSet.small().iloc[:1000]
+        expected = self.validator().validate(
+            data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT
+        )
+
+        for _ in range(2):
+            validator = setup_SimFyzer(
+                FUZZY_CONFIG, 0.75, 0.5, tokenization_cache=tmp_path
+            )
+            validated = validator.validate(data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+            assert validated.equals(expected)
+
+
+class TestDecisionOnly(BaseTestFuzzyV):
+    def test_equals_validate(self):
+        data = FuzzyDataSet.small()
+
+        for threshold in [0.3, 0.5, 0.7]:
+            validator = setup_SimFyzer(FUZZY_CONFIG, 0.75, threshold)
+            expected = validator.validate(data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+
+            validator = setup_SimFyzer(FUZZY_CONFIG, 0.75, threshold)
+            validated = validator.validate(
+                data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT, decision_only=True
+            )
+            assert validated[JAKKAR.VALIDATED].tolist() == (
+                expected[JAKKAR.VALIDATED].tolist()
+            )
+
+    def test_undecided_rows(self):
+        data = FuzzyDataSet.small()
+        validator = setup_SimFyzer(FUZZY_CONFIG, 0.75, 0.5)
+        validator.vocabulary = TokenVocabulary()
+
+        tokens = validator._process_tokenization(
+            validator._create_working_rows(data, CLIENT_PRODUCT, SOURCE_PRODUCT)
+        )
+        tokens = validator._process_preprocessing(*tokens)
+        rows, _ = validator._process_decisions(*tokens)
+
+        assert 0 < len(rows) < len(data)
+
+    def test_decided_rows_marks(self):
+        # rate is 1 / count: fuzzy match of "апельсинн" changes rate
+        # of "апельсин", so ratio after fuzzy isn't the pruning ratio
+        config = dict(FUZZY_CONFIG)
+        config[CONFIG.RATIO] = {
+            RATIO.MIN_RATIO: 0,
+            RATIO.MAX_RATIO: 1,
+            RATIO.MIN_APPEARANCE: 0,
+            RATIO.MIN_APPEARANCE_PENALTY: 0,
+            RATIO.RATE_FUNC: "default",
+        }
+        data = pd.DataFrame(
+            [("апельсин сладкий", "апельсин сладкий")] * 3
+            + [("апельсин сладкий сочный", "апельсин сладкий")] * 2
+            + [("апельсинн сладкий", "апельсин сладкий")] * 2
+            + [("сочный", "сочный")] * 5
+            + [("грейпфрут", "вода")] * 2,
+            columns=[CLIENT_PRODUCT, SOURCE_PRODUCT],
+        )
+
+        validator = setup_SimFyzer(config, 0.75, 0.5)
+        expected = validator.validate(data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+
+        validator = setup_SimFyzer(config, 0.75, 0.5)
+        validated = validator.validate(
+            data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT, decision_only=True
+        )
+        column = validator.marks_counter.validation_column
+
+        # rows 3 and 4 are decided by exact matches: their marks are counted
+        # by ratio of exact matches (апельсин 1/12, сладкий 1/14, сочный 1/12)
+        exact_mark = (1 / 12 + 1 / 14) / (2 / 12 + 1 / 14)
+        assert validated[column].iloc[3:5].tolist() == pytest.approx([exact_mark] * 2)
+        assert expected[column].iloc[3] != pytest.approx(exact_mark)
+        assert validated[JAKKAR.VALIDATED].tolist() == (
+            expected[JAKKAR.VALIDATED].tolist()
+        )
+
+
+class TestSweep(BaseTestFuzzyV):
+    def test_equals_validate(self):
+        data = FuzzyDataSet.small().iloc[:2000]
+        fuzzy_thresholds = [0.6, 0.9]
+        validation_thresholds = [0.3, 0.5, 0.7]
+        rate_functions = ["default", "log"]
+
+        config = dict(FUZZY_CONFIG)
+        validator = setup_SimFyzer(config, 0.75, 0.5)
+        metrics = validator.sweep(
+            data.copy(),
+            CLIENT_PRODUCT,
+            SOURCE_PRODUCT,
+            IS_EQUAL,
+            fuzzy_thresholds,
+            validation_thresholds,
+            rate_functions,
+        )
+        assert len(metrics) == 12
+
+        for row in metrics.itertuples(index=False):
+            row = row._asdict()
+            validator = setup_SimFyzer(
+                config,
+                row[SWEEP.FUZZY_THRESHOLD],
+                row[SWEEP.VALIDATION_THRESHOLD],
+            )
+            validator.rate_counter.rate_function = RateFunction.map(
+                row[SWEEP.RATE_FUNCTION]
+            )
+            validated = validator.validate(data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT)
+
+            labels = data[IS_EQUAL].astype(bool)
+            decisions = validated[JAKKAR.VALIDATED].astype(bool)
+            assert row[SWEEP.TP] == (labels & decisions).sum()
+            assert row[SWEEP.FP] == (~labels & decisions).sum()
+            assert row[SWEEP.FN] == (labels & ~decisions).sum()
+            assert row[SWEEP.ACCURACY] == (labels == decisions).mean()
+
+
+def attached_blocks_func(_) -> int:
+    return len(SharedArrays._attached)
+
+
+def sleeping_func(value: int) -> int:
+    time.sleep(0.01)
+    return value
+
+
+class TestSharedArrays(BaseTestFuzzyV):
+    def test_attach(self):
+        arrays = {
+            "ids": np.arange(7, dtype=np.int32),
+            "weights": np.linspace(0, 1, 5),
+            "codes": np.frombuffer("абв".encode("utf-32-le"), dtype=np.uint32),
+        }
+        shared = SharedArrays(arrays)
+        try:
+            attached = SharedArrays.attach(shared.descriptor)
+            for key, array in arrays.items():
+                assert attached[key].dtype == array.dtype
+                assert attached[key].tolist() == array.tolist()
+        finally:
+            SharedArrays.detach()
+            shared.close()
+
+    def test_pool_equals_sequential(self):
+        data = FuzzyDataSet.small().iloc[:1000]
+        columns = [
+            MarksMode.UNION,
+            MarksMode.CLIENT,
+            MarksMode.SOURCE,
+            JAKKAR.VALIDATED,
+        ]
+
+        sequential = self.validator().validate(
+            data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT
+        )
+        with multiprocessing.Pool(2) as process_pool:
+            pooled = self.validator().validate(
+                data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT, process_pool
+            )
+
+        assert sequential[columns].equals(pooled[columns])
+
+    def test_workers_detach(self):
+        data = FuzzyDataSet.small().iloc[:1000]
+
+        with multiprocessing.Pool(2) as process_pool:
+            self.validator().validate(
+                data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT, process_pool
+            )
+            attached = process_pool.map(attached_blocks_func, range(4), chunksize=1)
+
+        assert attached == [0, 0, 0, 0]
+
+    def test_stop(self):
+        data = FuzzyDataSet.small().iloc[:3000]
+        validator = self.validator()
+
+        def progress_callback(progress: int) -> None:
+            if progress > 0:
+                validator.stop_callback()
+
+        validator.progress_callback = progress_callback
+        with multiprocessing.Pool(2) as process_pool:
+            with pytest.raises(SimFyzerGracefullExit):
+                validator.validate(
+                    data.copy(), CLIENT_PRODUCT, SOURCE_PRODUCT, process_pool
+                )
+
+            # no tasks are left in the pool after stop
+            assert not process_pool._cache
+            attached = process_pool.map(attached_blocks_func, range(4), chunksize=1)
+
+        assert attached == [0, 0, 0, 0]
+
+    def test_task_window(self):
+        pulled = []
+
+        def tasks():
+            for value in range(100):
+                pulled.append(value)
+                yield value
+
+        with multiprocessing.Pool(2) as process_pool:
+            assert list(TaskWindow(process_pool, sleeping_func, range(10))) == list(
+                range(10)
+            )
+
+            with TaskWindow(process_pool, sleeping_func, tasks(), 4) as window:
+                for value in window:
+                    if value == 2:
+                        break
+
+            assert len(pulled) == 6
+            assert not window._pending
+
+
 class FuzzyVGenericsTestsDebug(TestFuzzyVGenerics):
     def __init__(self) -> None:
         super().__init__()